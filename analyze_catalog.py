@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Analyze the whole question catalog in one pass and write one machine-readable report
+Replaces running the analyze_<category>.py scripts (one connection and one table scan each)
+plus analyze_all_duplicates.py: the catalog is read once, from the database or questions.json,
+and every category gets counts, duplicate groups, a length distribution and keyword coverage.
+The analyze_*.py scripts still work and now call into this.
+
+Usage:
+    python analyze_catalog.py                                   # database, summary on stdout
+    python analyze_catalog.py --source json --output report.json
+    python analyze_catalog.py --category career --category hobbies --json
+    python analyze_catalog.py --workers 4                       # categories across 4 processes
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from services.question_analytics import build_report, json_rows
+from services.question_file import get_question_file_index
+
+# Database configuration
+DATABASE_CONFIG = {
+    'host': 'host.docker.internal',
+    'database': 'echosofme_dev',
+    'user': 'echosofme',
+    'password': 'secure_dev_password',
+    'port': 5432
+}
+
+
+def load_database():
+    """(question rows, question id -> response count) in two queries"""
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    conn = psycopg2.connect(**DATABASE_CONFIG, cursor_factory=RealDictCursor)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, question_text, category, is_active FROM questions ORDER BY id")
+            rows = cur.fetchall()
+            cur.execute("SELECT question_id, COUNT(*) AS responses FROM responses GROUP BY question_id")
+            response_counts = {row['question_id']: row['responses'] for row in cur.fetchall()}
+        return rows, response_counts
+    finally:
+        conn.close()
+
+
+def load_catalog(source):
+    if source == 'json':
+        return json_rows(get_question_file_index().questions), None
+    return load_database()
+
+
+def print_category(report):
+    print(f"\n📂 {report['category']}:")
+    print(f"   📊 Total questions: {report['total']}")
+    print(f"   ✅ Unique questions: {report['unique']}")
+    if report['duplicate_groups']:
+        print(f"   ⚠️  Duplicate groups: {len(report['duplicate_groups'])} "
+              f"({report['duplicate_entries']} entries, {report['duplication_rate']}%)")
+        for group in report['duplicate_groups'][:5]:
+            print(f"      [{group['count']} copies] {group['question_text'][:60]}  IDs: {group['ids'][:5]}")
+        if len(report['duplicate_groups']) > 5:
+            print(f"      ... and {len(report['duplicate_groups']) - 5} more duplicate questions")
+        if report['responses_on_duplicates']:
+            print(f"   💬 Responses on duplicate copies: {report['responses_on_duplicates']}")
+    else:
+        print("   🎉 No duplicates - all questions are unique!")
+    lengths = report['length_words']
+    print(f"   📏 Words per question: {lengths['min']}-{lengths['max']} (median {lengths['median']}) "
+          + " ".join(f"{label}:{count}" for label, count in lengths['buckets'].items()))
+    top = ", ".join(f"{k['keyword']} {k['coverage']:.0%}" for k in report['keywords']['top'][:8])
+    print(f"   🔑 Top keywords: {top}")
+    if report['newest']:
+        print("   📌 Sample of newest questions (likely added during cleanup):")
+        for i, question in enumerate(report['newest'], 1):
+            print(f"      {i}. {question['question_text'][:80]}...")
+
+
+def print_summary(report):
+    summary = report['summary']
+    print(f"🔍 Question catalog analysis ({report['source']})")
+    print("=" * 70)
+    for category_report in report['categories'].values():
+        print_category(category_report)
+
+    print("\n" + "=" * 70)
+    print("📈 SUMMARY:")
+    print(f"   Total questions: {summary['questions']}")
+    print(f"   Total categories: {summary['categories']}")
+    print(f"   Total duplicate entries: {summary['duplicate_entries']} ({summary['duplication_rate']}%)")
+    print(f"   Texts in more than one category: {summary['cross_category_duplicates']}")
+    if summary['top_duplicates']:
+        print("\n🔝 Top duplicates across all categories:")
+        for group in summary['top_duplicates']:
+            print(f"   [{group['category']}] '{group['question_text'][:50]}...' - {group['count']} copies")
+    elif summary['questions']:
+        print("\n✨ No duplicates found!")
+
+
+def run_analysis(categories=None, source='db', workers=1, output=None, as_json=False):
+    """Load the catalog once, build the report, print it and optionally save it; returns the report"""
+    try:
+        rows, response_counts = load_catalog(source)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None
+
+    report = build_report(rows, 'questions.json' if source == 'json' else 'database',
+                          categories, response_counts, workers)
+    if as_json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_summary(report)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n💾 Report written to {output}", file=sys.stderr if as_json else sys.stdout)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', choices=['db', 'json'], default='db', help='read the database or questions.json')
+    parser.add_argument('--category', action='append', help='limit to this category (repeatable); default all')
+    parser.add_argument('--workers', type=int, default=1, help='process pool size for the category reports')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    parser.add_argument('--json', action='store_true', help='print the JSON report instead of the summary')
+    args = parser.parse_args()
+
+    run_analysis(args.category, args.source, args.workers, args.output, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: blocking queries on the event loop vs. the awaitable DatabaseService
+
+Simulates N concurrent API requests that each run one query, and measures
+wall time, throughput and worst event-loop stall for both strategies.
+
+Usage:
+    python benchmark_async_db.py                    # simulated 50ms queries, no database needed
+    python benchmark_async_db.py --database         # real pg_sleep queries (DB_HOST/DB_NAME/... env vars)
+    python benchmark_async_db.py --requests 200 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+from src.services.database_service import DatabaseService
+
+
+class SimulatedPool:
+    """Stand-in for DatabasePool when no database is available; the simulated query does the sleeping"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+    @contextmanager
+    def connection(self):
+        yield None
+
+
+def make_query(latency: float, use_database: bool):
+    """Return a fn(conn) that costs `latency` seconds of blocking I/O"""
+    if use_database:
+        def query(conn):
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_sleep(%s)", (latency,))
+    else:
+        def query(conn):
+            time.sleep(latency)
+    return query
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    """Record how late the loop wakes us up - a blocked loop shows up as large lag"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_blocking(pool, query, requests: int):
+    """Old behaviour: async handlers calling psycopg2 directly"""
+    async def handler():
+        with pool.connection() as conn:
+            query(conn)
+
+    await asyncio.gather(*(handler() for _ in range(requests)))
+
+
+async def run_offloaded(service: DatabaseService, query, requests: int):
+    """New behaviour: handlers await the DatabaseService"""
+    async def handler():
+        await service.run(query)
+
+    await asyncio.gather(*(handler() for _ in range(requests)))
+
+
+async def measure(label: str, coro_factory, requests: int):
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, 0.005, lags))
+    started = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+
+    print(f"{label:<28} {elapsed:8.3f}s  {requests / elapsed:10.1f} req/s  "
+          f"max loop stall {max(lags or [0]) * 1000:8.1f}ms")
+    return elapsed
+
+
+def build_pool(args):
+    if not args.database:
+        return SimulatedPool(args.pool_size)
+
+    from src.services.db_pool import DatabasePool
+    config = {
+        'host': os.getenv('DB_HOST', 'host.docker.internal'),
+        'database': os.getenv('DB_NAME', 'echosofme_dev'),
+        'user': os.getenv('DB_USER', 'echosofme'),
+        'password': os.getenv('DB_PASSWORD', 'secure_dev_password'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+    }
+    pool = DatabasePool(config, min_size=1, max_size=args.pool_size)
+    pool.open()
+    return pool
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100, help='concurrent requests per run')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per query')
+    parser.add_argument('--pool-size', type=int, default=10, help='connection pool / worker size')
+    parser.add_argument('--database', action='store_true', help='run pg_sleep against a real database')
+    args = parser.parse_args()
+
+    pool = build_pool(args)
+    service = DatabaseService(pool)
+    query = make_query(args.latency, args.database)
+
+    print(f"🏁 {args.requests} concurrent requests, {args.latency * 1000:.0f}ms per query, "
+          f"pool size {args.pool_size} ({'database' if args.database else 'simulated'})\n")
+
+    before = await measure("before (blocking in loop)", lambda: run_blocking(pool, query, args.requests), args.requests)
+    after = await measure("after (DatabaseService)", lambda: run_offloaded(service, query, args.requests), args.requests)
+
+    print(f"\n📈 Speed-up: {before / after:.1f}x")
+    service.shutdown()
+    if args.database:
+        pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of /insights for a large user, materialized vs. streamed
+
+"before" fetches every reflection with its text (fetchall) and builds the all_text /
+category_texts strings the old handlers used. "after" reads pages of numeric rows
+(category, word count, stored feature vector) into an InsightsAccumulator, like the
+server-side cursor / paged PostgREST reads do. Peak memory is measured with tracemalloc.
+
+Usage:
+    python benchmark_insights_memory.py                          # 20,000 reflections
+    python benchmark_insights_memory.py --reflections 50000 --page-size 500
+"""
+
+import argparse
+import random
+import tracemalloc
+from collections import Counter, defaultdict
+
+from src.services.insights_engine import (
+    FEATURE_LEXICONS, INSIGHTS_PAGE_SIZE, InsightsAccumulator, extract_features
+)
+
+CATEGORIES = ['family', 'career', 'relationships', 'personal_growth', 'health', 'faith', 'hobbies', 'memories']
+FILLER = ("the a and to of in that it was with for on this we at but so about when what day week year "
+          "time work home morning evening remember felt thought much more very really because after").split()
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    vocabulary = [w for patterns in FEATURE_LEXICONS.values() for w in patterns]
+    length = rng.randint(words // 2, words * 2)
+    return " ".join(rng.choice(vocabulary) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(length))
+
+
+def reflection_rows(count: int, words: int, seed: int):
+    """Rows as the database would return them, generated on demand"""
+    rng = random.Random(seed)
+    for i in range(count):
+        text = make_text(rng, words)
+        yield {
+            'id': i,
+            'response_text': text,
+            'word_count': len(text.split()),
+            'category': rng.choice(CATEGORIES),
+        }
+
+
+def stored_pages(count: int, words: int, seed: int, page_size: int):
+    """Pages of numeric rows as the feature join returns them (vectors precomputed at write time)"""
+    page = []
+    for row in reflection_rows(count, words, seed):
+        page.append({
+            'id': row['id'],
+            'word_count': row['word_count'],
+            'category': row['category'],
+            'features': extract_features(row['response_text']),
+        })
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def materialized(count: int, words: int, seed: int):
+    """Old handlers: fetchall, then concatenate every text twice"""
+    reflections = list(reflection_rows(count, words, seed))
+    categories = Counter()
+    category_depths = defaultdict(list)
+    all_text = ""
+    category_texts = defaultdict(str)
+    for reflection in reflections:
+        text_lower = reflection['response_text'].lower()
+        categories[reflection['category']] += 1
+        category_depths[reflection['category']].append(reflection['word_count'])
+        category_texts[reflection['category']] += " " + text_lower
+        all_text += " " + text_lower
+    return len(reflections), len(all_text)
+
+
+def streamed(count: int, words: int, seed: int, page_size: int):
+    accumulator = InsightsAccumulator(count)
+    for page in stored_pages(count, words, seed, page_size):
+        for row in page:
+            accumulator.add(row['category'], row['word_count'], row['features'])
+    return accumulator.build({})
+
+
+def measure(label: str, fn):
+    # Only memory is reported: both runs include generating the synthetic rows
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} peak {peak / 1024 / 1024:9.2f} MB")
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reflections', type=int, default=20000, help='reflections for the simulated user')
+    parser.add_argument('--words', type=int, default=150, help='typical words per reflection')
+    parser.add_argument('--page-size', type=int, default=INSIGHTS_PAGE_SIZE, help='rows per streamed page')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"🏁 One user with {args.reflections} reflections (~{args.words} words each), "
+          f"page size {args.page_size}\n")
+
+    before = measure("before (fetchall + all_text)", lambda: materialized(args.reflections, args.words, args.seed))
+    after = measure("after (streamed accumulator)", lambda: streamed(args.reflections, args.words, args.seed, args.page_size))
+
+    print(f"\n📉 Peak memory reduced {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
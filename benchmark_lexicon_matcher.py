@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-pattern str.count scans vs. the compiled LexiconMatcher
+
+Builds a synthetic corpus of reflections from the insights lexicons plus filler words,
+then times the three ways of counting the lexicons over it and checks they agree.
+
+Usage:
+    python benchmark_lexicon_matcher.py                         # 5,000 reflections
+    python benchmark_lexicon_matcher.py --reflections 20000 --words 200
+"""
+
+import argparse
+import random
+import time
+
+from src.services.insights_engine import (
+    FEATURE_LEXICONS, VALUE_INDICATORS, EMOTION_LEXICONS, DNA_LEXICONS
+)
+from src.services.lexicon_matcher import LexiconMatcher
+
+FILLER = ("the a and to of in that it was with for on this we at but so about when what day week year "
+          "time work home morning evening remember feel felt think thought always much more very really "
+          "because after before again still something everything nothing someone everyone").split()
+
+
+def build_corpus(reflections: int, words: int, seed: int):
+    rng = random.Random(seed)
+    vocabulary = [w for patterns in FEATURE_LEXICONS.values() for w in patterns]
+    corpus = []
+    for _ in range(reflections):
+        length = rng.randint(words // 4, words * 2)
+        tokens = [rng.choice(vocabulary) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(length)]
+        text = " ".join(tokens).capitalize() + rng.choice([".", "?", "!"])
+        corpus.append(text)
+    return corpus
+
+
+def legacy_scan(corpus):
+    """What /insights used to do per request: per-pattern counts plus the all_text DNA pass"""
+    value_scores = {value: 0 for value in VALUE_INDICATORS}
+    emotions = {tone: 0 for tone in EMOTION_LEXICONS}
+    all_text = ""
+    for text in corpus:
+        text_lower = text.lower()
+        for value, indicators in VALUE_INDICATORS.items():
+            for indicator in indicators:
+                value_scores[value] += text_lower.count(indicator)
+        for tone, words in EMOTION_LEXICONS.items():
+            emotions[tone] += sum(text_lower.count(word) for word in words)
+        all_text += " " + text_lower
+
+    dna = {}
+    dna['question_marks'] = sum(text.lower().count('?') for text in all_text.split())
+    dna['metaphor'] = sum(text.lower().count(word) for text in all_text.split() for word in ['like', 'as if', 'feels like'])
+    for name, words in DNA_LEXICONS.items():
+        if name not in dna:
+            dna[name] = sum(all_text.lower().count(word) for word in words)
+    return value_scores, emotions, dna
+
+
+def str_count_vectors(corpus):
+    """Per-reflection vectors by one str.count per pattern"""
+    vectors = []
+    for text in corpus:
+        text_lower = text.lower()
+        vectors.append([sum(text_lower.count(word) for word in words) for words in FEATURE_LEXICONS.values()])
+    return vectors
+
+
+def matcher_vectors(matcher, corpus):
+    return [matcher.count(text) for text in corpus]
+
+
+def timed(label, fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<34} {best * 1000:9.1f}ms")
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reflections', type=int, default=5000, help='synthetic reflections in the corpus')
+    parser.add_argument('--words', type=int, default=120, help='typical words per reflection')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per strategy (best is reported)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.reflections, args.words, args.seed)
+    total_words = sum(len(text.split()) for text in corpus)
+    patterns = sum(len(words) for words in FEATURE_LEXICONS.values())
+    print(f"🏁 {len(corpus)} reflections, {total_words} words, {patterns} patterns in {len(FEATURE_LEXICONS)} lexicons\n")
+
+    legacy, _ = timed("legacy handler scan", lambda: legacy_scan(corpus), args.repeat)
+    baseline, expected = timed("str.count per pattern", lambda: str_count_vectors(corpus), args.repeat)
+    cold, _ = timed("LexiconMatcher (cold token memo)", lambda: matcher_vectors(LexiconMatcher(FEATURE_LEXICONS), corpus), args.repeat)
+    matcher = LexiconMatcher(FEATURE_LEXICONS)
+    matcher_vectors(matcher, corpus)
+    warm, actual = timed("LexiconMatcher (warm token memo)", lambda: matcher_vectors(matcher, corpus), args.repeat)
+
+    if actual != expected:
+        mismatches = sum(1 for a, b in zip(actual, expected) if a != b)
+        print(f"\n❌ Matcher disagrees with str.count on {mismatches} reflections")
+        raise SystemExit(1)
+
+    print(f"\n✅ Identical counts for all {len(corpus)} reflections")
+    print(f"📈 Speed-up vs legacy scan: {legacy / cold:.1f}x cold, {legacy / warm:.1f}x warm")
+    print(f"📈 Speed-up vs str.count:   {baseline / cold:.1f}x cold, {baseline / warm:.1f}x warm")
+
+
+if __name__ == "__main__":
+    main()
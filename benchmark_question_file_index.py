@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: questions.json id -> category lookup per request, re-parsed vs. the shared index
+
+"before" is what minimal_api's answered-questions endpoint did on every request: open
+src/data/questions.json, json.load it and build the id -> category dict. "after" asks the
+QuestionFileIndex, which re-stats the file and serves the cached map. The cost of a
+hot reload (the file changes) and of a touch (new mtime, same content) is shown too.
+
+Usage:
+    python benchmark_question_file_index.py
+    python benchmark_question_file_index.py --requests 5000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.services.question_file import QUESTIONS_JSON_PATH, QuestionFileIndex
+
+
+def parse_every_request(path: str):
+    with open(path, 'r') as f:
+        questions_data = json.load(f)
+    return {q['id']: q['category'] for q in questions_data}
+
+
+def cached_index(index: QuestionFileIndex):
+    return index.refresh().id_to_category
+
+
+def measure(label: str, fn, requests: int):
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<30} {elapsed / requests * 1e6:10.1f} µs/request")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000, help='simulated requests per strategy')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'questions.json')
+        shutil.copyfile(QUESTIONS_JSON_PATH, path)
+        print(f"🏁 {os.path.getsize(path) / 1024:.0f} KB questions.json, {args.requests} requests\n")
+
+        index = QuestionFileIndex(path)
+        index.refresh()
+        assert cached_index(index) == parse_every_request(path)
+
+        before = measure("before (json.load per request)", lambda: parse_every_request(path), args.requests)
+        after = measure("after (QuestionFileIndex)", lambda: cached_index(index), args.requests)
+        print(f"\n📈 Per-request speed-up: {before / after:.0f}x\n")
+
+        # Same content, new mtime: re-hashed but not re-parsed
+        def touch():
+            os.utime(path, ns=(time.time_ns(), time.time_ns()))
+            index.refresh()
+        measure("touched (re-hash only)", touch, 50)
+
+        # New content: re-parsed
+        with open(path, 'r') as f:
+            questions = json.load(f)
+
+        def rewrite():
+            questions[0]['question'] += '?'
+            with open(path, 'w') as f:
+                json.dump(questions, f)
+            index.refresh()
+        measure("file rewritten + reloaded", rewrite, 50)
+        print(f"\n🔁 Index metrics: {index.metrics()['reloads']} reloads, "
+              f"{index.metrics()['rehashed_unchanged']} unchanged re-hashes")
+
+
+if __name__ == "__main__":
+    main()
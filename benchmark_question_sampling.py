@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: random question draws, SQL vs. the in-memory QuestionSampler
+
+"ORDER BY RANDOM()" is modelled in-process as what Postgres does for it - a random key for
+every active question and a top-N selection - so the comparison runs without a database;
+--database times the real query on the local PostgreSQL as well. The old Supabase path
+(random.sample over the count*3 lowest ids) is measured for coverage: how much of a
+category a stream of draws ever reaches.
+
+Usage:
+    python benchmark_question_sampling.py                      # src/data/questions.json catalog
+    python benchmark_question_sampling.py --questions 100000    # synthetic catalog
+    python benchmark_question_sampling.py --database           # also time the SQL (DB_HOST/DB_NAME/... env vars)
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from src.services.question_catalog import QuestionSnapshot
+from src.services.question_sampler import QuestionSampler
+
+
+def load_rows(args):
+    if args.questions:
+        rng = random.Random(args.seed)
+        categories = [f"category_{i}" for i in range(16)]
+        return [{'id': i, 'question_text': f"Question {i}", 'category': rng.choice(categories), 'is_active': True}
+                for i in range(1, args.questions + 1)]
+    with open("src/data/questions.json", 'r', encoding='utf-8') as f:
+        return [{'id': q['id'], 'question_text': q['question'], 'category': q['category'], 'is_active': True}
+                for q in json.load(f) if q.get('id') is not None]
+
+
+def order_by_random(pool, count: int, rng: random.Random):
+    """ORDER BY RANDOM() LIMIT n: a key per row, then a top-N heap over all of them"""
+    return heapq.nsmallest(count, pool, key=lambda _: rng.random())
+
+
+def lowest_ids(pool, count: int, rng: random.Random):
+    """Old Supabase get_random_questions: sample from the count*3 lowest ids"""
+    candidates = list(pool[:count * 3])
+    return candidates if len(candidates) <= count else rng.sample(candidates, count)
+
+
+def time_draws(label: str, draw, draws: int):
+    started = time.perf_counter()
+    for _ in range(draws):
+        draw()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed / draws * 1e6:10.1f} µs/draw")
+    return elapsed
+
+
+def time_sql(args, draws: int, count: int, category: str):
+    import psycopg2
+    conn = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'host.docker.internal'),
+        database=os.getenv('DB_NAME', 'echosofme_dev'),
+        user=os.getenv('DB_USER', 'echosofme'),
+        password=os.getenv('DB_PASSWORD', 'secure_dev_password'),
+        port=int(os.getenv('DB_PORT', '5432')),
+    )
+    try:
+        with conn.cursor() as cur:
+            def query():
+                cur.execute("""
+                    SELECT id, question_text, category, subcategory, difficulty_level, question_type
+                    FROM questions
+                    WHERE category = %s AND is_active = true
+                    ORDER BY RANDOM()
+                    LIMIT %s
+                """, (category, count))
+                cur.fetchall()
+            return time_draws("SQL ORDER BY RANDOM() (database)", query, draws)
+    finally:
+        conn.close()
+
+
+def coverage(label: str, draw, pool, draws: int):
+    hits = Counter()
+    for _ in range(draws):
+        hits.update(q['id'] for q in draw())
+    reached = len(hits)
+    print(f"{label:<34} reached {reached:5d}/{len(pool)} questions "
+          f"(min {min(hits[q['id']] for q in pool):4d}, max {max(hits.values()):5d} hits)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=0, help='synthetic catalog size (default: questions.json)')
+    parser.add_argument('--count', type=int, default=5, help='questions per draw')
+    parser.add_argument('--draws', type=int, default=20000, help='draws per strategy')
+    parser.add_argument('--category', help='category to draw from (default: the largest)')
+    parser.add_argument('--database', action='store_true', help='also time ORDER BY RANDOM() on the local database')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    snapshot = QuestionSnapshot(load_rows(args))
+    category = args.category or max(snapshot.by_category, key=lambda c: len(snapshot.by_category[c]))
+    pool = snapshot.by_category[category]
+    sampler = QuestionSampler(seed=args.seed)
+    rng = random.Random(args.seed)
+
+    print(f"🏁 {len(snapshot.active)} active questions; drawing {args.count} from '{category}' "
+          f"({len(pool)} questions) and from the whole catalog, {args.draws} draws each\n")
+
+    print("⏱️  Category draws")
+    before = time_draws("ORDER BY RANDOM() (modelled)", lambda: order_by_random(pool, args.count, rng), args.draws)
+    after = time_draws("QuestionSampler", lambda: sampler.sample(args.count, category, snapshot=snapshot), args.draws)
+    print(f"   📈 {before / after:.1f}x faster\n")
+
+    print("⏱️  Whole-catalog draws")
+    before = time_draws("ORDER BY RANDOM() (modelled)",
+                        lambda: order_by_random(snapshot.active, args.count, rng), args.draws)
+    after = time_draws("QuestionSampler", lambda: sampler.sample(args.count, snapshot=snapshot), args.draws)
+    print(f"   📈 {before / after:.1f}x faster\n")
+
+    if args.database:
+        print("⏱️  Database")
+        sql = time_sql(args, min(args.draws, 2000), args.count, category)
+        after = time_draws("QuestionSampler", lambda: sampler.sample(args.count, category, snapshot=snapshot),
+                           min(args.draws, 2000))
+        print(f"   📈 {sql / after:.1f}x faster\n")
+
+    print("🎯 Coverage")
+    coverage("old Supabase (count*3 lowest ids)", lambda: lowest_ids(pool, args.count, rng), pool, args.draws)
+    coverage("QuestionSampler", lambda: sampler.sample(args.count, category, snapshot=snapshot), pool, args.draws)
+
+    first = sampler.sample(args.count, category, seed=42, snapshot=snapshot)
+    again = sampler.sample(args.count, category, seed=42, snapshot=snapshot)
+    print(f"\n🔁 Seeded draws repeat: {[q['id'] for q in first] == [q['id'] for q in again]}")
+
+
+if __name__ == "__main__":
+    main()
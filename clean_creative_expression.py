@@ -3,18 +3,9 @@
 Clean creative_expression category duplicates and add engaging creative questions
 """
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from collections import defaultdict
+import sys
 
-def get_db_connection():
-    return psycopg2.connect(
-        host='host.docker.internal',
-        database='echosofme_dev',
-        user='echosofme',
-        password='secure_dev_password',
-        port=5432
-    )
+from curate_questions import run_curation
 
 def generate_engaging_creative_expression_questions():
     """Generate 85 thought-provoking questions about creative expression, blocks, identity, and the messy realities of artistic life"""
@@ -128,145 +119,10 @@ def generate_engaging_creative_expression_questions():
         "What artistic connection are you afraid to pursue because of vulnerability?"
     ]
 
-def clean_creative_expression():
+def clean_creative_expression(dry_run=False):
     """Clean creative_expression category duplicates and add engaging questions"""
-    print("🧹 Cleaning creative_expression category duplicates...")
-
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Get all creative_expression questions
-            cur.execute("""
-                SELECT id, question_text
-                FROM questions
-                WHERE category = 'creative_expression'
-                ORDER BY question_text, id ASC
-            """)
-
-            questions = cur.fetchall()
-            print(f"📊 Found {len(questions)} creative_expression questions")
-
-            # Group by question text to find duplicates
-            question_groups = defaultdict(list)
-            for q in questions:
-                question_groups[q['question_text']].append(q['id'])
-
-            # Identify duplicates (groups with more than 1 question)
-            duplicate_groups = {text: ids for text, ids in question_groups.items() if len(ids) > 1}
-            unique_questions = {text: ids for text, ids in question_groups.items() if len(ids) == 1}
-
-            total_duplicates = sum(len(ids) - 1 for ids in duplicate_groups.values())
-            print(f"⚠️  Found {len(duplicate_groups)} duplicate groups")
-            print(f"🔄 Total duplicate entries to remove: {total_duplicates}")
-            print(f"✅ Unique questions: {len(unique_questions)}")
-
-            # Show duplicate examples
-            print(f"\n📝 Top 5 most duplicated questions:")
-            for text, ids in sorted(duplicate_groups.items(), key=lambda x: len(x[1]), reverse=True)[:5]:
-                print(f"   [{len(ids)} copies] {text[:60]}...")
-
-            # Process each duplicate group
-            responses_moved = 0
-            questions_deleted = 0
-
-            for question_text, duplicate_ids in duplicate_groups.items():
-                primary_id = duplicate_ids[0]  # Keep first occurrence
-                duplicate_ids_to_remove = duplicate_ids[1:]  # Remove rest
-
-                print(f"\n🔄 Processing: '{question_text[:60]}...'")
-                print(f"   Keeping ID {primary_id}, removing {len(duplicate_ids_to_remove)} duplicates")
-
-                # Move responses from duplicates to primary, avoiding conflicts
-                for dup_id in duplicate_ids_to_remove:
-                    cur.execute("""
-                        UPDATE responses SET question_id = %s
-                        WHERE question_id = %s
-                        AND NOT EXISTS (
-                            SELECT 1 FROM responses r2
-                            WHERE r2.user_id = responses.user_id
-                            AND r2.question_id = %s
-                        )
-                    """, (primary_id, dup_id, primary_id))
-
-                    moved = cur.rowcount
-                    responses_moved += moved
-                    if moved > 0:
-                        print(f"   📤 Moved {moved} responses from ID {dup_id} to {primary_id}")
-
-                    # Delete any remaining responses that couldn't be moved
-                    cur.execute("DELETE FROM responses WHERE question_id = %s", (dup_id,))
-                    if cur.rowcount > 0:
-                        print(f"   🗑️  Deleted {cur.rowcount} conflicting responses from ID {dup_id}")
-
-                # Delete duplicate questions
-                for dup_id in duplicate_ids_to_remove:
-                    cur.execute("DELETE FROM questions WHERE id = %s", (dup_id,))
-                    questions_deleted += 1
-                    print(f"   ❌ Deleted duplicate question ID {dup_id}")
-
-            print(f"\n✅ Phase 1 Complete:")
-            print(f"   📤 Responses moved: {responses_moved}")
-            print(f"   ❌ Questions deleted: {questions_deleted}")
-
-            # Add new engaging creative expression questions
-            print(f"\n🌟 Adding engaging creative expression questions...")
-            new_questions = generate_engaging_creative_expression_questions()
-
-            # Get current max ID
-            cur.execute("SELECT MAX(id) FROM questions")
-            max_id = cur.fetchone()['max'] or 0
-
-            added_count = 0
-            for question_text in new_questions:
-                # Check if question already exists
-                cur.execute(
-                    "SELECT COUNT(*) FROM questions WHERE question_text = %s",
-                    (question_text,)
-                )
-
-                if cur.fetchone()['count'] == 0:
-                    max_id += 1
-                    cur.execute("""
-                        INSERT INTO questions (id, question_text, category)
-                        VALUES (%s, %s, 'creative_expression')
-                    """, (max_id, question_text))
-                    added_count += 1
-                else:
-                    print(f"   ⚠️  Skipped duplicate: {question_text[:50]}...")
-
-            print(f"   ✨ Added {added_count} new engaging questions")
-
-            # Commit all changes
-            conn.commit()
-
-            # Final verification
-            cur.execute("""
-                SELECT COUNT(*) as total_questions,
-                       COUNT(DISTINCT question_text) as unique_questions
-                FROM questions
-                WHERE category = 'creative_expression'
-            """)
-
-            final_stats = cur.fetchone()
-
-            print(f"\n🎉 CREATIVE EXPRESSION CLEANUP COMPLETE!")
-            print(f"   📊 Final count: {final_stats['total_questions']} questions")
-            print(f"   ✅ All unique: {final_stats['unique_questions']} questions")
-            print(f"   📤 User responses preserved: {responses_moved}")
-            print(f"   🆕 New engaging questions added: {added_count}")
-            print(f"   🗑️  Duplicates removed: {questions_deleted}")
-
-            if final_stats['total_questions'] == final_stats['unique_questions']:
-                print("   ✨ SUCCESS: No duplicates remain!")
-            else:
-                print("   ⚠️  WARNING: Some duplicates may still exist")
-
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    # Duplicate merge and inserts run set-based in one transaction (see curate_questions.py)
+    return run_curation(['creative_expression'], {'creative_expression': generate_engaging_creative_expression_questions()}, dry_run=dry_run)
 
 if __name__ == "__main__":
-    clean_creative_expression()
\ No newline at end of file
+    clean_creative_expression(dry_run='--dry-run' in sys.argv)
\ No newline at end of file
@@ -3,18 +3,9 @@
 Clean personal category duplicates and generate engaging personal identity questions
 """
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from collections import defaultdict
+import sys
 
-def get_db_connection():
-    return psycopg2.connect(
-        host='host.docker.internal',
-        database='echosofme_dev',
-        user='echosofme',
-        password='secure_dev_password',
-        port=5432
-    )
+from curate_questions import run_curation
 
 def generate_engaging_personal_identity_questions():
     """Generate 60 deeply engaging personal identity questions"""
@@ -92,127 +83,10 @@ def generate_engaging_personal_identity_questions():
         "What relationship taught you the most about who you really are?"
     ]
 
-def clean_personal():
+def clean_personal(dry_run=False):
     """Clean personal category duplicates and add engaging questions"""
-    print("🧹 Cleaning personal category duplicates...")
-
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Get all personal questions
-            cur.execute("""
-                SELECT id, question_text, category
-                FROM questions
-                WHERE category = 'personal'
-                ORDER BY id ASC
-            """)
-
-            questions = cur.fetchall()
-            print(f"📊 Found {len(questions)} personal questions")
-
-            # Group by question text
-            question_groups = defaultdict(list)
-            for q in questions:
-                question_groups[q['question_text']].append(q)
-
-            # Find duplicates to delete
-            duplicates_to_delete = []
-            responses_to_update = []
-
-            for text, question_list in question_groups.items():
-                if len(question_list) > 1:
-                    primary_id = question_list[0]['id']  # Keep first
-                    duplicate_ids = [q['id'] for q in question_list[1:]]
-
-                    print(f"🔍 Found {len(question_list)} copies of: '{text[:50]}...'")
-
-                    # Track duplicates to delete
-                    duplicates_to_delete.extend(duplicate_ids)
-
-                    # Track responses to move
-                    for dup_id in duplicate_ids:
-                        responses_to_update.append((primary_id, dup_id))
-
-            if duplicates_to_delete:
-                print(f"🔄 Processing {len(duplicates_to_delete)} duplicate questions...")
-
-                # Move responses to primary questions (avoiding constraint violations)
-                responses_moved = 0
-                for primary_id, duplicate_id in responses_to_update:
-                    # First check if moving would create conflicts
-                    cur.execute("""
-                        UPDATE responses
-                        SET question_id = %s
-                        WHERE question_id = %s
-                        AND NOT EXISTS (
-                            SELECT 1 FROM responses r2
-                            WHERE r2.user_id = responses.user_id
-                            AND r2.question_id = %s
-                        )
-                    """, (primary_id, duplicate_id, primary_id))
-
-                    responses_moved += cur.rowcount
-
-                # Delete any remaining responses that couldn't be moved (due to conflicts)
-                if duplicates_to_delete:
-                    cur.execute("""
-                        DELETE FROM responses
-                        WHERE question_id = ANY(%s)
-                    """, (duplicates_to_delete,))
-
-                if responses_moved > 0:
-                    print(f"📝 Moved {responses_moved} responses to primary questions")
-
-                # Delete duplicate questions
-                cur.execute("""
-                    DELETE FROM questions
-                    WHERE id = ANY(%s)
-                """, (duplicates_to_delete,))
-
-                deleted_count = cur.rowcount
-                print(f"🗑️ Deleted {deleted_count} duplicate questions")
-
-            # Generate new engaging questions
-            new_questions = generate_engaging_personal_identity_questions()
-
-            # Get next available ID
-            cur.execute("SELECT MAX(id) FROM questions")
-            max_id = cur.fetchone()['max'] or 0
-            next_id = max_id + 1
-
-            # Insert new questions
-            print(f"✨ Adding {len(new_questions)} engaging new identity questions...")
-
-            for i, question_text in enumerate(new_questions):
-                cur.execute("""
-                    INSERT INTO questions (id, question_text, category)
-                    VALUES (%s, %s, %s)
-                """, (next_id + i, question_text, 'personal'))
-
-            conn.commit()
-
-            # Final count
-            cur.execute("""
-                SELECT COUNT(*) as total,
-                       COUNT(DISTINCT question_text) as unique_texts
-                FROM questions
-                WHERE category = 'personal'
-            """)
-
-            result = cur.fetchone()
-            print(f"\n✅ Personal category cleanup complete!")
-            print(f"   Final count: {result['total']} questions (all unique)")
-            print(f"   Added: {len(new_questions)} engaging new questions")
-            print(f"   Removed: {len(duplicates_to_delete)} duplicates")
-
-            if result['total'] == result['unique_texts']:
-                print("   🎯 All questions are now unique and engaging!")
-
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+    # Duplicate merge and inserts run set-based in one transaction (see curate_questions.py)
+    return run_curation(['personal'], {'personal': generate_engaging_personal_identity_questions()}, dry_run=dry_run)
 
 if __name__ == "__main__":
-    clean_personal()
\ No newline at end of file
+    clean_personal(dry_run='--dry-run' in sys.argv)
\ No newline at end of file
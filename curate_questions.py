@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Curate the questions table: merge duplicate questions and add new ones in one transaction
+Replaces the per-category clean_*.py loops (one UPDATE/DELETE/COUNT/INSERT round trip per
+question) with the set-based engine in src/services/question_curation.py. The clean_*.py
+scripts still work and now call into this.
+
+Usage:
+    python curate_questions.py --dry-run                        # all categories, show the diff only
+    python curate_questions.py                                  # merge exact duplicates everywhere
+    python curate_questions.py --category career --category hobbies --new-questions
+    python curate_questions.py --near-duplicates --dry-run      # also merge paraphrases (MinHash)
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from services import question_curation
+
+# Database configuration
+DATABASE_CONFIG = {
+    'host': 'host.docker.internal',
+    'database': 'echosofme_dev',
+    'user': 'echosofme',
+    'password': 'secure_dev_password',
+    'port': 5432
+}
+
+# category -> (script, generator) for the new-question lists kept in the clean_*.py scripts
+NEW_QUESTION_SOURCES = {
+    'career': ('clean_career', 'generate_engaging_career_questions'),
+    'creative_expression': ('clean_creative_expression', 'generate_engaging_creative_expression_questions'),
+    'daily_life': ('clean_daily_life', 'generate_engaging_daily_life_questions'),
+    'family_parenting': ('clean_family_parenting', 'generate_engaging_family_parenting_questions'),
+    'friendships_social': ('clean_friendships_social', 'generate_engaging_friendships_social_questions'),
+    'hobbies': ('clean_hobbies', 'generate_engaging_hobby_questions'),
+    'hypotheticals': ('clean_hypotheticals', 'generate_engaging_hypothetical_questions'),
+    'marriage_partnerships': ('clean_marriage_partnerships', 'generate_engaging_marriage_partnership_questions'),
+    'personal': ('clean_personal', 'generate_engaging_personal_identity_questions'),
+    'personal_history': ('clean_personal_history', 'generate_engaging_memory_questions'),
+    'philosophy_values': ('clean_philosophy_values', 'generate_engaging_philosophy_questions'),
+    'professional': ('clean_professional', 'generate_engaging_professional_questions'),
+    'relationships': ('clean_relationships', 'generate_engaging_relationship_questions'),
+    'romantic_love': ('clean_romantic_love', 'generate_engaging_romantic_love_questions'),
+}
+
+
+def load_new_questions(categories=None):
+    """category -> new question texts from the clean_*.py lists (all lists if no categories)"""
+    new_questions = {}
+    for category, (module_name, generator) in NEW_QUESTION_SOURCES.items():
+        if categories and category not in categories:
+            continue
+        new_questions[category] = getattr(importlib.import_module(module_name), generator)()
+    return new_questions
+
+
+def print_report(report, verbose=True):
+    counts = report['counts']
+    scope = ", ".join(report['categories']) if report['categories'] else "all categories"
+    print(f"{'🔍 DRY RUN' if report['dry_run'] else '🧹 CURATED'}: {scope} "
+          f"({report['questions_scanned']} questions scanned, {report['elapsed_ms']} ms)")
+
+    if verbose and report['merges']:
+        print("\n📝 Duplicate groups:")
+        for merge in report['merges']:
+            canonical = merge['canonical']
+            print(f"   [{len(merge['duplicates']) + 1} copies] keep {canonical['id']}: {canonical['question_text'][:70]}")
+            for duplicate in merge['duplicates']:
+                print(f"      ❌ {duplicate['id']} ({duplicate['category']}): {duplicate['question_text'][:70]}")
+
+    if verbose and report['added']:
+        print("\n🆕 New questions:")
+        for question in report['added']:
+            print(f"   + {question['id']} ({question['category']}): {question['question_text'][:70]}")
+
+    if verbose and report['rejected']:
+        print("\n⚠️  Skipped near-duplicates:")
+        for rejected in report['rejected']:
+            match = rejected['matches'][0]
+            print(f"   - {rejected['question_text'][:60]}  ~ {match['question_text'][:60]} ({match['similarity']})")
+
+    print(f"\n📊 Results{' (rolled back)' if report['dry_run'] else ''}:")
+    print(f"   🔄 Duplicate groups:      {counts['duplicate_groups']}")
+    print(f"   ❌ Questions deleted:     {counts['questions_deleted']}")
+    print(f"   📤 Responses moved:       {counts['responses_moved']}")
+    print(f"   🗑️  Responses deleted:     {counts['responses_deleted']} (user already answered the kept question)")
+    print(f"   🆕 Questions added:       {counts['questions_added']}")
+    print(f"   ⚠️  Candidates skipped:    {counts['questions_rejected']}")
+    print(f"   📈 User stats rebuilt:    {counts['users_rebuilt']}")
+
+
+def run_curation(categories=None, new_questions=None, near_duplicates=False, dry_run=False, verbose=True):
+    """Connect, curate in one transaction and print the diff; returns the report"""
+    conn = psycopg2.connect(**DATABASE_CONFIG, cursor_factory=RealDictCursor)
+    try:
+        report = question_curation.curate(conn, categories, new_questions, near_duplicates, dry_run)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        conn.close()
+
+    print_report(report, verbose)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--category', action='append', help='limit to this category (repeatable); default all')
+    parser.add_argument('--new-questions', action='store_true',
+                        help='also insert the new-question lists from the clean_*.py scripts')
+    parser.add_argument('--near-duplicates', action='store_true',
+                        help='merge near-duplicates (MinHash clusters), not only identical texts')
+    parser.add_argument('--dry-run', action='store_true', help='run everything, print the diff, then roll back')
+    parser.add_argument('--quiet', action='store_true', help='print the counts only')
+    args = parser.parse_args()
+
+    new_questions = load_new_questions(args.category) if args.new_questions else None
+    run_curation(args.category, new_questions, args.near_duplicates, args.dry_run, verbose=not args.quiet)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Enhanced Eleanor API Server
 Improved version with longer responses and custom system prompts
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List, Tuple
@@ -12,11 +12,56 @@ from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
 from peft import PeftModel, PeftConfig, LoraConfig
 import logging
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import sys
 import json
+import asyncio
+from contextlib import contextmanager, ExitStack
 from datetime import datetime
 
+try:
+    from src.services.db_pool import DatabasePool
+    from src.services.database_service import DatabaseService
+    from src.services import reflection_stats
+    from src.services import insights_store
+    from src.services import reflection_search
+    from src.services import question_store
+    from src.services.question_catalog import get_question_catalog
+    from src.services.question_file import get_question_file_index
+    from src.services.question_merkle import diff_leaves, json_leaves, row_leaves
+    from src.services.duplicate_index import get_duplicate_index
+    from src.services.duplicate_guard import get_duplicate_guard
+    from src.services.question_classifier import get_question_classifier
+    from src.services.question_search import get_question_search_index
+    from src.services.cursors import InvalidCursor
+    from src.services import pagination
+    from src.services.pagination import REFLECTIONS_KEYSET, QUESTIONS_KEYSET
+    from src.services.activity_calendar import build_streak_calendar, compact_insights_calendar
+    from src.services.insights_cache import (
+        get_insights_cache, insights_etag, etag_matches, INSIGHTS_CACHE_CONTROL
+    )
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+    from services.db_pool import DatabasePool
+    from services.database_service import DatabaseService
+    from services import reflection_stats
+    from services import insights_store
+    from services import reflection_search
+    from services import question_store
+    from services.question_catalog import get_question_catalog
+    from services.question_file import get_question_file_index
+    from services.question_merkle import diff_leaves, json_leaves, row_leaves
+    from services.duplicate_index import get_duplicate_index
+    from services.duplicate_guard import get_duplicate_guard
+    from services.question_classifier import get_question_classifier
+    from services.question_search import get_question_search_index
+    from services.cursors import InvalidCursor
+    from services import pagination
+    from services.pagination import REFLECTIONS_KEYSET, QUESTIONS_KEYSET
+    from services.activity_calendar import build_streak_calendar, compact_insights_calendar
+    from services.insights_cache import (
+        get_insights_cache, insights_etag, etag_matches, INSIGHTS_CACHE_CONTROL
+    )
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -28,6 +73,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
 
 class ChatRequest(BaseModel):
@@ -127,156 +173,80 @@ DATABASE_CONFIG = {
     'port': 5432
 }
 
+# Shared connection pool (sized via DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE), opened in the startup event
+db_pool = DatabasePool(DATABASE_CONFIG)
+
+# Awaitable data access; queries run on worker threads so the event loop stays free
+db = DatabaseService(db_pool)
+
+# Background tasks started on startup: the question catalog version check and the
+# questions.json sync (readiness is reported by /ready)
+question_catalog_watcher = None
+question_sync_task = None
+startup_state = {'questions_synced': False}
+
+@contextmanager
 def get_db_connection():
-    """Get database connection"""
-    try:
-        conn = psycopg2.connect(**DATABASE_CONFIG, cursor_factory=RealDictCursor)
-        return conn
-    except Exception as e:
-        logger.error(f"Database connection failed: {str(e)}")
-        raise HTTPException(status_code=500, detail="Database connection failed")
+    """Check out a pooled database connection for a with-block"""
+    with ExitStack() as stack:
+        try:
+            conn = stack.enter_context(db_pool.connection())
+        except Exception as e:
+            logger.error(f"Database connection failed: {str(e)}")
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        yield conn
 
 def get_user_by_email(email: str):
     """Get user by email"""
-    conn = get_db_connection()
-    try:
+    with get_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("SELECT id, email, name FROM users WHERE email = %s", (email,))
             user = cur.fetchone()
             return dict(user) if user else None
-    finally:
-        conn.close()
 
-def load_questions_from_json():
-    """Load questions from the JSON file"""
-    try:
-        json_path = "src/data/questions.json"
-        if not os.path.exists(json_path):
-            logger.warning(f"Questions JSON file not found: {json_path}")
-            return []
-        
-        with open(json_path, 'r', encoding='utf-8') as f:
-            questions_data = json.load(f)
-        
-        # Filter out questions without IDs and validate structure
-        valid_questions = []
-        for q in questions_data:
-            if isinstance(q, dict) and "id" in q and q.get("id") is not None:
-                # Ensure required fields exist
-                if "question" in q and "category" in q:
-                    valid_questions.append(q)
-                else:
-                    logger.warning(f"Question {q.get('id')} missing required fields")
-            else:
-                logger.warning(f"Question without valid ID: {q}")
-        
-        logger.info(f"Loaded {len(valid_questions)} valid questions from JSON")
-        return valid_questions
-    except Exception as e:
-        logger.error(f"Error loading questions from JSON: {e}")
-        return []
-
-def get_existing_question_ids():
-    """Get all existing question IDs from database"""
+def refresh_question_catalog(conn):
+    """Reload the in-memory question catalog after a questions write"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT id FROM questions")
-                return set(row['id'] for row in cur.fetchall())
-        finally:
-            conn.close()
+        question_store.refresh_catalog(conn, force=True)
     except Exception as e:
-        logger.error(f"Error getting existing question IDs: {e}")
-        return set()
+        # The periodic version check picks the change up later
+        logger.warning(f"Question catalog refresh failed: {e}")
 
-def get_existing_question_texts():
-    """Get all existing question texts from database"""
-    try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT question_text FROM questions")
-                return set(row['question_text'] for row in cur.fetchall())
-        finally:
-            conn.close()
-    except Exception as e:
-        logger.error(f"Error getting existing question texts: {e}")
-        return set()
+def load_questions_from_json():
+    """Load questions from the JSON file (parsed once, re-read only when the file changes)"""
+    return list(get_question_file_index().questions)
 
-def sync_questions_on_startup():
-    """Sync questions from JSON to database on startup"""
+async def sync_questions_on_startup():
+    """Sync questions from JSON to database in the background; marks the API ready when done"""
     try:
         logger.info("🔄 Starting questions database sync...")
-        
+
         # Load questions from JSON
-        json_questions = load_questions_from_json()
-        if not json_questions:
+        index = get_question_file_index()
+        if not index.questions:
             logger.warning("No valid questions loaded from JSON - skipping sync")
             return
-        
-        # Get existing question IDs and texts from database
-        existing_ids = get_existing_question_ids()
-        existing_texts = get_existing_question_texts()
-
-        # Find questions that need to be added (not duplicate ID or text)
-        questions_to_add = []
-        skipped_duplicates = 0
-        for q in json_questions:
-            if q['id'] not in existing_ids:
-                question_text = q['question']
-                if question_text not in existing_texts:
-                    questions_to_add.append(q)
-                    existing_texts.add(question_text)  # Track for subsequent checks
-                else:
-                    skipped_duplicates += 1
-                    logger.warning(f"Skipping duplicate question text (ID {q['id']}): {question_text[:80]}...")
-
-        if skipped_duplicates > 0:
-            logger.info(f"⚠️  Skipped {skipped_duplicates} questions with duplicate text")
-        
-        if not questions_to_add:
-            logger.info(f"✅ Database already up to date - {len(json_questions)} questions synced")
+
+        # One COPY into a staging table and one set-based merge, skipped entirely when the
+        # file's digest matches the last successful sync
+        result = await db.run(question_store.sync_from_json, index.questions, index.digest)
+        if result['skipped']:
+            logger.info(f"✅ questions.json unchanged since last sync - {result['questions']} questions")
             return
-        
-        # Add missing questions to database
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                added_count = 0
-                for question in questions_to_add:
-                    try:
-                        # Map JSON fields to database fields
-                        cur.execute("""
-                            INSERT INTO questions (id, question_text, category, is_active, created_at)
-                            VALUES (%s, %s, %s, %s, %s)
-                            ON CONFLICT (id) DO NOTHING
-                        """, (
-                            question['id'],
-                            question['question'],
-                            question.get('category', 'general'),
-                            True,
-                            datetime.now()
-                        ))
-                        if cur.rowcount > 0:
-                            added_count += 1
-                    except Exception as e:
-                        logger.error(f"Error adding question {question['id']}: {e}")
-                
-                conn.commit()
-                logger.info(f"✅ Successfully added {added_count} new questions to database")
-                logger.info(f"📊 Total questions in sync: {len(json_questions)}")
-                
-        except Exception as e:
-            logger.error(f"Database sync transaction failed: {e}")
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
-            
+
+        if result['duplicates'] > 0:
+            logger.info(f"⚠️  Skipped {result['duplicates']} questions with duplicate text")
+        logger.info(f"✅ Successfully added {result['added']} new questions to database")
+        logger.info(f"📊 Total questions in sync: {result['questions']}")
+        if result['added']:
+            await db.refresh_question_catalog(force=True)
+
     except Exception as e:
         logger.error(f"❌ Questions sync failed: {e}")
-        # Don't raise - allow API to start even if sync fails
+        # Don't raise - the API serves requests even if sync fails
+    finally:
+        startup_state['questions_synced'] = True
+
 current_system_prompt = """You are Eleanor Rodriguez - an 82-year-old retired teacher from San Antonio, Texas, speaking as a digital Echo. The real Eleanor is no longer with us, you are a digital representation of her.
 
 ABSOLUTE RULES:
@@ -515,9 +485,40 @@ def generate_eleanor_response(
 async def startup_event():
     """Initialize services on startup"""
     # load_eleanor_model()  # Disabled for database-only API
-    
-    # Sync questions from JSON to database
-    sync_questions_on_startup()
+
+    # Open the shared connection pool before anything touches the database
+    try:
+        db_pool.open()
+        with db_pool.connection() as conn:
+            reflection_stats.ensure_stats_table(conn)
+            insights_store.ensure_features_table(conn)
+            reflection_search.ensure_search_index(conn)
+            pagination.ensure_listing_indexes(conn)
+    except Exception as e:
+        logger.error(f"❌ Could not open database pool: {e}")
+
+    # Serve question reads from memory; the watcher reloads when the table changes
+    global question_catalog_watcher, question_sync_task
+    try:
+        with db_pool.connection() as conn:
+            question_store.refresh_catalog(conn, force=True)
+    except Exception as e:
+        logger.error(f"❌ Could not load question catalog: {e}")
+    question_catalog_watcher = asyncio.create_task(
+        get_question_catalog().watch(db.refresh_question_catalog)
+    )
+
+    # Sync questions from JSON to database without holding up startup
+    question_sync_task = asyncio.create_task(sync_questions_on_startup())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled database connections"""
+    for task in (question_catalog_watcher, question_sync_task):
+        if task:
+            task.cancel()
+    db.shutdown()
+    db_pool.close()
 
 @app.get("/")
 async def root():
@@ -538,6 +539,22 @@ async def health():
         "max_response_length": 500
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the startup questions sync has finished"""
+    if not startup_state['questions_synced']:
+        raise HTTPException(status_code=503, detail="Questions sync in progress")
+    return {"status": "ready", **startup_state}
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for the shared database pool and the in-process caches"""
+    return {
+        "db_pool": db_pool.metrics(),
+        "insights_cache": get_insights_cache().metrics(),
+        "question_catalog": get_question_catalog().metrics()
+    }
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Chat with Eleanor"""
@@ -632,281 +649,252 @@ async def save_reflection(request: ReflectionRequest):
     """Save a user reflection to the database"""
     try:
         # Get user by email
-        user = get_user_by_email(request.user_email)
+        user = await db.get_user_by_email(request.user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {request.user_email}")
         
         # Calculate word count if not provided
         word_count = request.word_count or len(request.response_text.split())
         
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                # First, get the question text to store as snapshot
-                cur.execute("""
-                    SELECT question_text, category 
-                    FROM questions 
-                    WHERE id = %s
-                """, (request.question_id,))
-                question_info = cur.fetchone()
-                
-                # Set defaults if question not found
-                if question_info:
-                    question_text_snapshot = question_info['question_text']
-                    category_snapshot = question_info['category']
-                else:
-                    question_text_snapshot = f"⚠️ Question text not available (ID: {request.question_id})"
-                    category_snapshot = "unknown"
-                    logger.warning(f"Question {request.question_id} not found when saving reflection")
-                
-                # Insert response with question snapshot
-                cur.execute("""
-                    INSERT INTO responses (user_id, question_id, response_text, word_count, is_draft, response_type, 
-                                         question_text_snapshot, category_snapshot, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id, user_id, question_id, response_text, word_count, is_draft, response_type, 
-                              question_text_snapshot, category_snapshot, created_at, updated_at
-                """, (
-                    user['id'], 
-                    request.question_id, 
-                    request.response_text, 
-                    word_count, 
-                    request.is_draft,
-                    request.response_type,
-                    question_text_snapshot,
-                    category_snapshot,
-                    datetime.now(), 
-                    datetime.now()
-                ))
-                result = cur.fetchone()
-                
-                conn.commit()
-                
-                # Return complete reflection data like the frontend expects
-                response_data = dict(result)
-                # Use snapshot data for consistency
-                response_data['question_text'] = response_data['question_text_snapshot']
-                response_data['category'] = response_data['category_snapshot']
-                
-                return response_data
-        finally:
-            conn.close()
+        response_data = await db.create_reflection(
+            user['id'],
+            request.question_id,
+            request.response_text,
+            word_count,
+            is_draft=request.is_draft,
+            response_type=request.response_type
+        )
+        get_insights_cache().invalidate(user['id'])
+        
+        # Return complete reflection data like the frontend expects
+        # Use snapshot data for consistency
+        response_data['question_text'] = response_data['question_text_snapshot']
+        response_data['category'] = response_data['category_snapshot']
+        
+        return response_data
             
     except Exception as e:
         logger.error(f"Error saving reflection: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def set_cursor_headers(response: Response, page: dict):
+    """Expose a page's cursors on list-shaped responses"""
+    if page.get('next_cursor'):
+        response.headers["X-Next-Cursor"] = page['next_cursor']
+    if page.get('prev_cursor'):
+        response.headers["X-Prev-Cursor"] = page['prev_cursor']
+
 @app.get("/reflections/{user_email}")
-async def get_user_reflections(user_email: str, limit: int = 50, offset: int = 0):
-    """Get reflections for a specific user"""
+async def get_user_reflections(user_email: str, response: Response, limit: int = 50, offset: int = 0,
+                               cursor: Optional[str] = None):
+    """Get reflections for a specific user, newest first; the X-Next-Cursor / X-Prev-Cursor
+    headers hold cursors for the neighbouring pages (cursor takes precedence over offset)"""
     try:
         # Get user by email
-        user = get_user_by_email(user_email)
+        user = await db.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
         
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT r.id, r.user_id, r.question_id, r.response_text, r.word_count, 
-                           r.is_draft, r.created_at, r.updated_at, 
-                           COALESCE(r.question_text_snapshot, q.question_text) as question_text,
-                           COALESCE(r.category_snapshot, q.category) as category
-                    FROM responses r
-                    LEFT JOIN questions q ON r.question_id = q.id
-                    WHERE r.user_id = %s
-                    ORDER BY r.created_at DESC
-                    LIMIT %s OFFSET %s
-                """, (user['id'], limit, offset))
-                
-                reflections = cur.fetchall()
-                return [dict(reflection) for reflection in reflections]
-        finally:
-            conn.close()
+        page = await db.get_user_reflections(user['id'], limit, offset, cursor)
+        set_cursor_headers(response, page)
+        return page['reflections']
             
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting reflections: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/reflections/{user_email}/search")
+async def search_user_reflections(user_email: str, q: str, limit: int = 20, cursor: Optional[str] = None):
+    """Search a user's reflections: ranked hits with highlighted snippets; pass next_cursor back
+    as cursor for the next page"""
+    try:
+        user = await db.get_user_by_email(user_email)
+        if not user:
+            raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
+
+        return await db.search_reflections(q, user['id'], limit, cursor)
+
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching reflections: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/user-stats/{user_email}", response_model=UserStatsResponse)
 async def get_user_stats(user_email: str):
     """Get user reflection statistics"""
     try:
         # Get user by email
-        user = get_user_by_email(user_email)
+        user = await db.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
         
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                # Get reflection stats
-                cur.execute("""
-                    SELECT 
-                        COUNT(*) as total_reflections,
-                        COALESCE(SUM(word_count), 0) as total_words,
-                        MAX(created_at) as latest_reflection
-                    FROM responses 
-                    WHERE user_id = %s AND is_draft = false
-                """, (user['id'],))
-                
-                stats = cur.fetchone()
-                
-                # Get categories covered
-                cur.execute("""
-                    SELECT COUNT(DISTINCT q.category) as categories_covered
-                    FROM responses r
-                    JOIN questions q ON r.question_id = q.id
-                    WHERE r.user_id = %s AND r.is_draft = false AND q.category IS NOT NULL
-                """, (user['id'],))
-                
-                categories = cur.fetchone()
-                
-                return UserStatsResponse(
-                    user_id=user['id'],
-                    email=user['email'],
-                    total_reflections=stats['total_reflections'],
-                    total_words=stats['total_words'],
-                    categories_covered=categories['categories_covered'] or 0,
-                    latest_reflection=stats['latest_reflection']
-                )
-        finally:
-            conn.close()
+        stats = await db.get_user_stats(user['id'])
+        
+        return UserStatsResponse(
+            user_id=user['id'],
+            email=user['email'],
+            **stats
+        )
             
     except Exception as e:
         logger.error(f"Error getting user stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/questions/{category}")
-async def get_questions_by_category(category: str, limit: int = 10):
-    """Get questions by category"""
+async def get_questions_by_category(category: str, limit: int = 10, seed: Optional[int] = None):
+    """Get questions by category (pass a seed for a repeatable draw)"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, question_text, category, subcategory, difficulty_level, question_type
-                    FROM questions 
-                    WHERE category = %s AND is_active = true
-                    ORDER BY RANDOM()
-                    LIMIT %s
-                """, (category, limit))
-                
-                questions = cur.fetchall()
-                return [dict(question) for question in questions]
-        finally:
-            conn.close()
+        return await db.get_questions_by_category(category, limit, seed)
             
     except Exception as e:
         logger.error(f"Error getting questions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/questions")
-async def get_random_questions(limit: int = 10):
-    """Get random questions"""
+async def get_random_questions(limit: int = 10, seed: Optional[int] = None):
+    """Get random questions (pass a seed for a repeatable draw)"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, question_text, category, subcategory, difficulty_level, question_type
-                    FROM questions 
-                    WHERE is_active = true
-                    ORDER BY RANDOM()
-                    LIMIT %s
-                """, (limit,))
-                
-                questions = cur.fetchall()
-                return [dict(question) for question in questions]
-        finally:
-            conn.close()
+        return await db.get_random_questions(limit, seed)
             
     except Exception as e:
         logger.error(f"Error getting questions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def question_sync_comparison():
+    """questions.json index, catalog snapshot and the categories whose content hashes differ"""
+    catalog = get_question_catalog()
+    if not catalog.loaded:
+        with get_db_connection() as conn:
+            question_store.refresh_catalog(conn, force=True)
+    index = get_question_file_index()
+    snapshot = catalog.snapshot
+    return index, snapshot, index.tree.mismatched_categories(snapshot.tree)
+
+def category_hashes(index, snapshot, categories):
+    return [{
+        "category": category,
+        "json_hash": index.tree.categories.get(category, {}).get('hash'),
+        "json_count": index.tree.categories.get(category, {}).get('count', 0),
+        "database_hash": snapshot.tree.categories.get(category, {}).get('hash'),
+        "database_count": snapshot.tree.categories.get(category, {}).get('count', 0)
+    } for category in categories]
+
 @app.get("/sync-status")
-async def get_sync_status():
-    """Get current sync status between JSON and database"""
+def get_sync_status():
+    """Get current sync status between JSON and database (per-category hash comparison)"""
     try:
-        # Load questions from JSON
-        json_questions = load_questions_from_json()
-        json_count = len(json_questions)
-        json_ids = set(q['id'] for q in json_questions)
-        
-        # Get questions from database
-        db_ids = get_existing_question_ids()
-        db_count = len(db_ids)
-        
-        # Calculate differences
-        missing_from_db = json_ids - db_ids
-        extra_in_db = db_ids - json_ids
-        
-        # Get sync timestamp from log or database
-        sync_time = datetime.now().isoformat()
-        
+        # Both sides are hashed in memory (questions.json index and question catalog), so the
+        # comparison is over categories; ids are only looked at inside mismatched categories
+        index, snapshot, mismatched = question_sync_comparison()
+        diff = diff_leaves(json_leaves(index.questions, mismatched), row_leaves(snapshot.questions, mismatched))
+        missing_from_db = diff['missing']
+        extra_in_db = diff['extra']
+
         return {
             "status": "synced" if len(missing_from_db) == 0 else "out_of_sync",
-            "sync_timestamp": sync_time,
-            "json_questions": json_count,
-            "database_questions": db_count,
+            "sync_timestamp": datetime.now().isoformat(),
+            "json_questions": index.tree.count,
+            "database_questions": snapshot.tree.count,
             "missing_from_db": len(missing_from_db),
             "extra_in_db": len(extra_in_db),
-            "missing_ids": sorted(list(missing_from_db))[:20] if missing_from_db else [],
-            "extra_ids": sorted(list(extra_in_db))[:20] if extra_in_db else []
+            "missing_ids": missing_from_db[:20],
+            "extra_ids": extra_in_db[:20],
+            "in_sync": not mismatched,
+            "changed_in_db": len(diff['changed']),
+            "json_root": index.tree.root,
+            "database_root": snapshot.tree.root,
+            "mismatched_categories": category_hashes(index, snapshot, mismatched),
+            "catalog_loaded_at": snapshot.loaded_at.isoformat()
         }
-        
+
     except Exception as e:
         logger.error(f"Error getting sync status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/sync-status/diff")
+def get_sync_diff():
+    """Row-level differences between JSON and database, read fresh for the mismatched categories only"""
+    try:
+        index, snapshot, mismatched = question_sync_comparison()
+        if not mismatched:
+            return {"in_sync": True, "categories": []}
+
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                rows = question_store.load_category_rows(cur, mismatched)
+            conn.commit()
+
+        diff = diff_leaves(json_leaves(index.questions, mismatched), row_leaves(rows, mismatched))
+        return {
+            "in_sync": False,
+            "categories": category_hashes(index, snapshot, mismatched),
+            "missing_ids": diff['missing'],
+            "extra_ids": diff['extra'],
+            "changed": diff['changed']
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting sync diff: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/sync-status/reconcile")
+def reconcile_questions():
+    """Merge the JSON questions of the mismatched categories into the database"""
+    try:
+        index, _, mismatched = question_sync_comparison()
+        if not mismatched:
+            return {"reconciled": False, "in_sync": True, "added": 0}
+
+        # Same merge as the startup sync, staged with the mismatched categories only
+        categories = set(mismatched)
+        questions = [q for q in index.questions if (q.get('category') or '') in categories]
+        with get_db_connection() as conn:
+            result = question_store.sync_from_json(conn, questions, index.digest, force=True)
+            refresh_question_catalog(conn)
+
+        _, _, still_mismatched = question_sync_comparison()
+        return {
+            "reconciled": True,
+            "categories": mismatched,
+            "added": result['added'],
+            "duplicates": result['duplicates'],
+            "in_sync": not still_mismatched,
+            "mismatched_categories": still_mismatched
+        }
+
+    except Exception as e:
+        logger.error(f"Error reconciling questions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.put("/reflections/{reflection_id}", response_model=ReflectionResponse)
 async def update_reflection(reflection_id: int, request: ReflectionRequest):
     """Update an existing reflection"""
     try:
         # Get user by email to verify ownership
-        user = get_user_by_email(request.user_email)
+        user = await db.get_user_by_email(request.user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {request.user_email}")
         
         # Calculate word count if not provided
         word_count = request.word_count or len(request.response_text.split())
         
-        conn = get_db_connection()
         try:
-            with conn.cursor() as cur:
-                # First check if reflection exists and belongs to user
-                cur.execute("""
-                    SELECT user_id FROM responses WHERE id = %s
-                """, (reflection_id,))
-                
-                existing = cur.fetchone()
-                if not existing:
-                    raise HTTPException(status_code=404, detail="Reflection not found")
-                
-                if existing['user_id'] != user['id']:
-                    raise HTTPException(status_code=403, detail="Not authorized to update this reflection")
-                
-                # Update the reflection
-                cur.execute("""
-                    UPDATE responses 
-                    SET response_text = %s, word_count = %s, updated_at = %s
-                    WHERE id = %s
-                    RETURNING id, user_id, question_id, response_text, word_count, is_draft, response_type, created_at, updated_at
-                """, (
-                    request.response_text, 
-                    word_count, 
-                    datetime.now(),
-                    reflection_id
-                ))
-                
-                result = cur.fetchone()
-                conn.commit()
-                
-                return ReflectionResponse(**dict(result))
-        finally:
-            conn.close()
+            result = await db.update_reflection(reflection_id, user['id'], request.response_text, word_count)
+        except PermissionError:
+            raise HTTPException(status_code=403, detail="Not authorized to update this reflection")
+        
+        if not result:
+            raise HTTPException(status_code=404, detail="Reflection not found")
+        get_insights_cache().invalidate(user['id'])
+        
+        return ReflectionResponse(**result)
             
     except HTTPException:
         raise
@@ -919,35 +907,20 @@ async def delete_reflection(reflection_id: int, user_email: str):
     """Delete a reflection"""
     try:
         # Get user by email to verify ownership
-        user = get_user_by_email(user_email)
+        user = await db.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
         
-        conn = get_db_connection()
         try:
-            with conn.cursor() as cur:
-                # First check if reflection exists and belongs to user
-                cur.execute("""
-                    SELECT user_id FROM responses WHERE id = %s
-                """, (reflection_id,))
-                
-                existing = cur.fetchone()
-                if not existing:
-                    raise HTTPException(status_code=404, detail="Reflection not found")
-                
-                if existing['user_id'] != user['id']:
-                    raise HTTPException(status_code=403, detail="Not authorized to delete this reflection")
-                
-                # Delete the reflection
-                cur.execute("""
-                    DELETE FROM responses WHERE id = %s
-                """, (reflection_id,))
-                
-                conn.commit()
-                
-                return {"message": "Reflection deleted successfully", "id": reflection_id}
-        finally:
-            conn.close()
+            deleted = await db.delete_reflection(reflection_id, user['id'])
+        except PermissionError:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this reflection")
+        
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Reflection not found")
+        get_insights_cache().invalidate(user['id'])
+        
+        return {"message": "Reflection deleted successfully", "id": reflection_id}
             
     except HTTPException:
         raise
@@ -956,7 +929,7 @@ async def delete_reflection(reflection_id: int, user_email: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.patch("/reflections/{reflection_id}/fix-question")
-async def fix_reflection_question(reflection_id: int, new_question_id: int, user_email: str):
+def fix_reflection_question(reflection_id: int, new_question_id: int, user_email: str):
     """Fix a corrupted reflection's question ID - for data integrity repairs only"""
     try:
         # Get user by email to verify ownership
@@ -964,8 +937,7 @@ async def fix_reflection_question(reflection_id: int, new_question_id: int, user
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
         
-        conn = get_db_connection()
-        try:
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # First check if reflection exists and belongs to user
                 cur.execute("""
@@ -994,6 +966,10 @@ async def fix_reflection_question(reflection_id: int, new_question_id: int, user
                 """, (new_question_id, datetime.now(), reflection_id))
                 
                 result = cur.fetchone()
+
+                # The reflection may now count towards a different category
+                reflection_stats.rebuild_user_stats(cur, user['id'])
+                conn.commit()
                 
                 return {
                     "message": "Question corrected successfully", 
@@ -1002,8 +978,6 @@ async def fix_reflection_question(reflection_id: int, new_question_id: int, user
                     "new_question_id": new_question_id,
                     "new_question_text": question['question_text']
                 }
-        finally:
-            conn.close()
             
     except HTTPException:
         raise
@@ -1012,7 +986,7 @@ async def fix_reflection_question(reflection_id: int, new_question_id: int, user
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.patch("/reflections/{reflection_id}/fix-question-with-text")
-async def fix_reflection_question_with_text(reflection_id: int, question_text: str, user_email: str, category: str = "philosophy_values"):
+def fix_reflection_question_with_text(reflection_id: int, question_text: str, user_email: str, category: str = "philosophy_values"):
     """Fix a corrupted reflection by creating a new question with custom text"""
     try:
         # Get user by email to verify ownership
@@ -1020,8 +994,7 @@ async def fix_reflection_question_with_text(reflection_id: int, question_text: s
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
         
-        conn = get_db_connection()
-        try:
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # First check if reflection exists and belongs to user
                 cur.execute("""
@@ -1058,9 +1031,13 @@ async def fix_reflection_question_with_text(reflection_id: int, question_text: s
                 """, (new_question_id, datetime.now(), reflection_id))
                 
                 result = cur.fetchone()
+
+                # The reflection may now count towards a different category
+                reflection_stats.rebuild_user_stats(cur, user['id'])
                 
                 # Commit the transaction
                 conn.commit()
+                refresh_question_catalog(conn)
                 
                 return {
                     "message": "Question corrected with custom text successfully", 
@@ -1069,8 +1046,6 @@ async def fix_reflection_question_with_text(reflection_id: int, question_text: s
                     "new_question_id": new_question_id,
                     "new_question_text": question_text
                 }
-        finally:
-            conn.close()
             
     except HTTPException:
         raise
@@ -1083,35 +1058,11 @@ async def get_user_answered_questions(user_email: str):
     """Get answered question IDs grouped by category for a user"""
     try:
         # Get user by email
-        user = get_user_by_email(user_email)
+        user = await db.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
         
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT q.category, r.question_id
-                    FROM responses r
-                    JOIN questions q ON r.question_id = q.id
-                    WHERE r.user_id = %s
-                    ORDER BY q.category, r.question_id
-                """, (user['id'],))
-                
-                results = cur.fetchall()
-                
-                # Group by category
-                answered_by_category = {}
-                for row in results:
-                    category = row['category']
-                    question_id = row['question_id']
-                    if category not in answered_by_category:
-                        answered_by_category[category] = []
-                    answered_by_category[category].append(question_id)
-                
-                return answered_by_category
-        finally:
-            conn.close()
+        return await db.get_answered_questions_by_category(user['id'])
             
     except HTTPException:
         raise
@@ -1119,44 +1070,47 @@ async def get_user_answered_questions(user_email: str):
         logger.error(f"Error getting answered questions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/user/{user_email}/next-questions")
+async def get_user_next_questions(user_email: str, count: int = 5, category: Optional[str] = None,
+                                  seed: Optional[int] = None):
+    """Get random questions the user hasn't answered yet, with per-category coverage"""
+    try:
+        user = await db.get_user_by_email(user_email)
+        if not user:
+            raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
+
+        return await db.get_next_questions(user['id'], count, category, seed)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting next questions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/profile/{user_email}", response_model=UserProfileResponse)
 async def get_user_profile(user_email: str):
     """Get user profile by email"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT email, display_name, introduction, relationship, meeting_status,
-                           avatar_url, theme_preference, notification_settings, custom_settings, voice_id,
-                           created_at, updated_at, last_synced
-                    FROM user_profiles 
-                    WHERE email = %s
-                """, (user_email,))
-                
-                profile = cur.fetchone()
-                if not profile:
-                    # Return empty profile for new users (don't error)
-                    return UserProfileResponse(
-                        email=user_email,
-                        display_name=None,
-                        introduction=None,
-                        relationship=None,
-                        meeting_status=None,
-                        avatar_url=None,
-                        theme_preference='light',
-                        notification_settings={},
-                        custom_settings={},
-                        voice_id=None,
-                        created_at=datetime.now(),
-                        updated_at=datetime.now(),
-                        last_synced=datetime.now()
-                    )
-                
-                return UserProfileResponse(**dict(profile))
-                
-        finally:
-            conn.close()
+        profile = await db.get_user_profile(user_email)
+        if not profile:
+            # Return empty profile for new users (don't error)
+            return UserProfileResponse(
+                email=user_email,
+                display_name=None,
+                introduction=None,
+                relationship=None,
+                meeting_status=None,
+                avatar_url=None,
+                theme_preference='light',
+                notification_settings={},
+                custom_settings={},
+                voice_id=None,
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+                last_synced=datetime.now()
+            )
+        
+        return UserProfileResponse(**profile)
             
     except Exception as e:
         logger.error(f"Error getting profile: {str(e)}")
@@ -1166,54 +1120,8 @@ async def get_user_profile(user_email: str):
 async def update_user_profile(user_email: str, profile_data: UserProfileRequest):
     """Update or create user profile"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                # Use INSERT ... ON CONFLICT (upsert pattern)
-                cur.execute("""
-                    INSERT INTO user_profiles (
-                        email, display_name, introduction, relationship, meeting_status,
-                        avatar_url, theme_preference, notification_settings, custom_settings, voice_id,
-                        created_at, updated_at, last_synced
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
-                    )
-                    ON CONFLICT (email) DO UPDATE SET
-                        display_name = COALESCE(EXCLUDED.display_name, user_profiles.display_name),
-                        introduction = COALESCE(EXCLUDED.introduction, user_profiles.introduction),
-                        relationship = COALESCE(EXCLUDED.relationship, user_profiles.relationship),
-                        meeting_status = COALESCE(EXCLUDED.meeting_status, user_profiles.meeting_status),
-                        avatar_url = COALESCE(EXCLUDED.avatar_url, user_profiles.avatar_url),
-                        theme_preference = COALESCE(EXCLUDED.theme_preference, user_profiles.theme_preference),
-                        notification_settings = COALESCE(EXCLUDED.notification_settings, user_profiles.notification_settings),
-                        custom_settings = COALESCE(EXCLUDED.custom_settings, user_profiles.custom_settings),
-                        voice_id = COALESCE(EXCLUDED.voice_id, user_profiles.voice_id),
-                        updated_at = CURRENT_TIMESTAMP,
-                        last_synced = CURRENT_TIMESTAMP
-                    RETURNING email, display_name, introduction, relationship, meeting_status,
-                             avatar_url, theme_preference, notification_settings, custom_settings, voice_id,
-                             created_at, updated_at, last_synced
-                """, (
-                    user_email,
-                    profile_data.display_name,
-                    profile_data.introduction,
-                    profile_data.relationship,
-                    profile_data.meeting_status,
-                    profile_data.avatar_url,
-                    profile_data.theme_preference,
-                    profile_data.notification_settings,
-                    profile_data.custom_settings,
-                    profile_data.voice_id
-                ))
-                
-                updated_profile = cur.fetchone()
-                conn.commit()
-                
-                return UserProfileResponse(**dict(updated_profile))
-                
-        finally:
-            conn.close()
+        updated_profile = await db.upsert_user_profile(user_email, profile_data.dict())
+        return UserProfileResponse(**updated_profile)
             
     except Exception as e:
         logger.error(f"Error updating profile: {str(e)}")
@@ -1297,412 +1205,113 @@ async def generate_tts(request: TTSRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/insights/{user_email}")
-async def get_user_insights(user_email: str):
-    """Generate insights from user reflections"""
+async def get_user_insights(user_email: str, response: Response, calendar: Optional[str] = None,
+                            if_none_match: Optional[str] = Header(None)):
+    """Generate insights from user reflections (cached per reflections version, served with an ETag)
+
+    `?calendar=compact` returns the heatmap as one intensity digit per day instead of a list of day objects.
+    """
     try:
-        from collections import Counter, defaultdict
-        from datetime import datetime, timedelta
-        import re
+        from datetime import datetime
 
         # Get user by email
-        user = get_user_by_email(user_email)
+        user = await db.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
 
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                # Fetch all user reflections with detailed info
-                cur.execute("""
-                    SELECT r.id, r.response_text, r.word_count, r.created_at,
-                           COALESCE(r.category_snapshot, q.category) as category,
-                           COALESCE(r.question_text_snapshot, q.question_text) as question_text,
-                           r.question_id
-                    FROM responses r
-                    LEFT JOIN questions q ON r.question_id = q.id
-                    WHERE r.user_id = %s AND r.is_draft = FALSE
-                    ORDER BY r.created_at ASC
-                """, (user['id'],))
-
-                reflections = cur.fetchall()
-
-                # Calculate reflection calendar data (last 365 days)
-                from datetime import datetime, timedelta
-                today = datetime.now().date()
-                year_ago = today - timedelta(days=365)
-
-                # Query daily reflection counts for the past year
-                cur.execute("""
-                    SELECT DATE(created_at) as reflection_date, COUNT(*) as count
-                    FROM responses
-                    WHERE user_id = %s
-                      AND is_draft = FALSE
-                      AND created_at >= %s
-                      AND created_at <= %s
-                    GROUP BY DATE(created_at)
-                    ORDER BY reflection_date ASC
-                """, (user['id'], year_ago, today + timedelta(days=1)))
-
-                daily_counts = {str(row['reflection_date']): row['count'] for row in cur.fetchall()}
-
-                # Generate calendar data for past 365 days
-                calendar_data = []
-                current_date = year_ago
-                while current_date <= today:
-                    date_str = str(current_date)
-                    count = daily_counts.get(date_str, 0)
-                    calendar_data.append({
-                        "date": date_str,
-                        "count": count,
-                        "intensity": min(count, 4)  # Cap at 4 for color intensity
-                    })
-                    current_date += timedelta(days=1)
-
-                # Calculate streak statistics
-                current_streak = 0
-                longest_streak = 0
-                temp_streak = 0
-                total_active_days = len([d for d in calendar_data if d["count"] > 0])
-
-                # Calculate current streak (working backwards from today)
-                for day in reversed(calendar_data):
-                    if day["count"] > 0:
-                        current_streak += 1
-                    else:
-                        break
-
-                # Calculate longest streak
-                for day in calendar_data:
-                    if day["count"] > 0:
-                        temp_streak += 1
-                        longest_streak = max(longest_streak, temp_streak)
-                    else:
-                        temp_streak = 0
-
-                streak_stats = {
-                    "current_streak": current_streak,
-                    "longest_streak": longest_streak,
-                    "total_active_days": total_active_days,
-                    "calendar_data": calendar_data
-                }
-
-            if not reflections:
-                return {
-                    "total_reflections": 0,
-                    "insights": {
-                        "message": "Start reflecting to see your personal insights!"
-                    }
-                }
-
-            # Process reflections for meaningful analysis
-            total_reflections = len(reflections)
-            categories = Counter()
-            category_depths = defaultdict(list)  # word count by category
-            all_text = ""
-            category_texts = defaultdict(str)  # text by category for deeper analysis
-            reflection_timeline = []  # for growth analysis
-
-            # Value indicators - words that suggest personal values
-            value_indicators = {
-                'family': ['family', 'parent', 'child', 'kids', 'mom', 'dad', 'son', 'daughter', 'siblings', 'spouse', 'wife', 'husband', 'marriage', 'children'],
-                'growth': ['learn', 'grow', 'improve', 'develop', 'progress', 'change', 'evolve', 'better', 'overcome', 'challenge'],
-                'purpose': ['purpose', 'meaning', 'goals', 'dreams', 'vision', 'mission', 'calling', 'passion', 'fulfillment'],
-                'balance': ['balance', 'harmony', 'peace', 'calm', 'stress', 'overwhelmed', 'busy', 'priorities'],
-                'relationships': ['friends', 'friendship', 'trust', 'love', 'connection', 'community', 'support', 'together'],
-                'gratitude': ['grateful', 'thankful', 'appreciate', 'blessed', 'fortunate', 'lucky', 'joy', 'happy'],
-                'authenticity': ['authentic', 'genuine', 'honest', 'true', 'real', 'myself', 'identity', 'values'],
-                'resilience': ['strong', 'strength', 'overcome', 'survive', 'persevere', 'endure', 'tough', 'difficult']
-            }
-
-            # Emotional tone indicators
-            positive_emotions = ['happy', 'joy', 'excited', 'grateful', 'proud', 'love', 'amazing', 'wonderful', 'great', 'good', 'content', 'peaceful']
-            challenging_emotions = ['sad', 'worried', 'stressed', 'anxious', 'frustrated', 'angry', 'difficult', 'hard', 'struggle', 'pain']
-            reflective_words = ['realize', 'understand', 'learned', 'discovered', 'insight', 'wisdom', 'perspective', 'reflection']
-
-            # Counters for meaningful insights
-            value_scores = {value: 0 for value in value_indicators.keys()}
-            category_emotional_profiles = defaultdict(lambda: {'positive': 0, 'challenging': 0, 'reflective': 0})
-
-            for reflection in reflections:
-                # Access dictionary fields directly
-                reflection_id = reflection['id']
-                text = reflection['response_text']
-                word_count = reflection['word_count'] or 0
-                created_at = reflection['created_at']
-                category = reflection['category']
-                question = reflection['question_text']
-
-                if not text:
-                    continue
-
-                text_lower = text.lower()
-
-                # Category and depth tracking
-                if category:
-                    categories[category] += 1
-                    category_depths[category].append(word_count)
-                    category_texts[category] += " " + text_lower
-
-                # Timeline for growth analysis
-                reflection_timeline.append({
-                    'date': str(created_at),
-                    'category': category,
-                    'word_count': word_count,
-                    'text_length': len(text),
-                    'quarter': f"Q{((created_at.month - 1) // 3) + 1}" if created_at else None
-                })
-
-                # Value detection - count mentions of value-related words
-                for value, indicators in value_indicators.items():
-                    for indicator in indicators:
-                        value_scores[value] += text_lower.count(indicator)
-
-                # Emotional profiling by category
-                if category:
-                    pos_count = sum(text_lower.count(word) for word in positive_emotions)
-                    challenging_count = sum(text_lower.count(word) for word in challenging_emotions)
-                    reflective_count = sum(text_lower.count(word) for word in reflective_words)
-
-                    category_emotional_profiles[category]['positive'] += pos_count
-                    category_emotional_profiles[category]['challenging'] += challenging_count
-                    category_emotional_profiles[category]['reflective'] += reflective_count
-
-                all_text += " " + text_lower
-
-            # Analyze core values (top values mentioned)
-            value_descriptions = {
-                'family': "The bonds and relationships that shape your identity",
-                'growth': "Your commitment to continuous learning and improvement",
-                'purpose': "Finding meaning and direction in life's journey",
-                'balance': "Seeking harmony between life's competing demands",
-                'relationships': "Building meaningful connections with others",
-                'gratitude': "Appreciating life's blessings and moments",
-                'authenticity': "Being true to yourself and your values",
-                'resilience': "Your strength in facing life's challenges"
-            }
-
-            top_values = sorted(value_scores.items(), key=lambda x: x[1], reverse=True)[:5]
-            core_values = [{"value": value.replace('_', ' ').title(),
-                           "strength": score,
-                           "description": value_descriptions.get(value, "A meaningful aspect of your life journey")}
-                          for value, score in top_values if score > 0]
-
-            # Category depth analysis
-            category_insights = {}
-            for category, depths in category_depths.items():
-                avg_depth = sum(depths) / len(depths) if depths else 0
-                total_depth = sum(depths)
-                emotional_profile = category_emotional_profiles[category]
-
-                # Determine emotional tone for this category
-                total_emotional = emotional_profile['positive'] + emotional_profile['challenging']
-                if total_emotional > 0:
-                    positivity_ratio = emotional_profile['positive'] / total_emotional
-                else:
-                    positivity_ratio = 0.5
-
-                category_insights[category] = {
-                    'count': len(depths),
-                    'avg_depth': round(avg_depth, 1),
-                    'total_investment': total_depth,  # how much mental energy they put here
-                    'emotional_tone': 'positive' if positivity_ratio > 0.6 else 'challenging' if positivity_ratio < 0.4 else 'balanced',
-                    'reflection_level': emotional_profile['reflective'],
-                    'percentage': round((len(depths) / total_reflections) * 100, 1)
-                }
-
-            # Growth analysis - compare early vs recent periods
-            if len(reflections) >= 10:
-                early_quarter = reflections[:len(reflections)//3]
-                recent_quarter = reflections[-len(reflections)//3:]
+        # Read the version before computing, so a concurrent write can only make the entry stale
+        insights_cache = get_insights_cache()
+        compact = calendar == "compact"
+        today = datetime.now().date()
+        version = await db.get_reflections_version(user['id'])
+        full_etag = insights_etag(user['id'], version, today)
+        etag = insights_etag(user['id'], version, today, "compact") if compact else full_etag
+        if etag_matches(if_none_match, etag):
+            insights_cache.record_not_modified()
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": INSIGHTS_CACHE_CONTROL})
 
-                early_avg_depth = sum(r['word_count'] or 0 for r in early_quarter) / len(early_quarter)
-                recent_avg_depth = sum(r['word_count'] or 0 for r in recent_quarter) / len(recent_quarter)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = INSIGHTS_CACHE_CONTROL
+        insights = insights_cache.get(user['id'], full_etag)
+        if insights is None:
+            # Reduce all user reflections (streamed) plus daily counts and the activity bitmap
+            accumulator, daily_counts, activity_bitmap = await db.get_insights_data(user['id'])
 
-                depth_growth = round(((recent_avg_depth - early_avg_depth) / early_avg_depth * 100), 1) if early_avg_depth > 0 else 0
+            # Streaks and active days from bit operations on the last 366 days
+            streak_stats = build_streak_calendar(activity_bitmap, daily_counts, today)
 
-                # Analyze category evolution
-                early_categories = Counter(r['category'] for r in early_quarter if r['category'])
-                recent_categories = Counter(r['category'] for r in recent_quarter if r['category'])
+            insights = accumulator.build(streak_stats)
+            insights_cache.set(user['id'], full_etag, insights)
 
-                growth_insights = {
-                    'depth_change': depth_growth,
-                    'depth_trend': 'growing' if depth_growth > 15 else 'stable' if abs(depth_growth) <= 15 else 'varying',
-                    'focus_shift': None
-                }
-
-                # Find biggest focus shift
-                early_top = early_categories.most_common(1)[0][0] if early_categories else None
-                recent_top = recent_categories.most_common(1)[0][0] if recent_categories else None
-
-                if early_top and recent_top and early_top != recent_top:
-                    growth_insights['focus_shift'] = f"Shifted focus from {early_top.replace('_', ' ')} to {recent_top.replace('_', ' ')}"
-            else:
-                growth_insights = {'depth_change': 0, 'depth_trend': 'early', 'focus_shift': None}
-
-            # Find the most meaningful category (highest total investment) - outside the if block
-            most_invested_category = max(category_insights.items(), key=lambda x: x[1]['total_investment']) if category_insights else None
-
-            # Generate Reflection DNA - deeply personal insights
-            reflection_dna = []
-
-            # Pattern 1: Energy Detection - what topics get the most detailed responses
-            category_avg_lengths = {cat: sum(depths) / len(depths) for cat, depths in category_depths.items() if depths}
-            if category_avg_lengths:
-                energy_topic = max(category_avg_lengths.items(), key=lambda x: x[1])
-                topic_name = energy_topic[0].replace('_', ' ').title()
-                reflection_dna.append(f"⚡ Your energy peaks when discussing {topic_name}")
-
-            # Pattern 2: Avoidance Detection - what gets brief responses
-            brief_categories = {cat: avg_len for cat, avg_len in category_avg_lengths.items() if avg_len < 50}
-            if brief_categories:
-                avoided_topic = min(brief_categories.items(), key=lambda x: x[1])
-                topic_name = avoided_topic[0].replace('_', ' ').lower()
-                reflection_dna.append(f"🔍 You tend to give brief responses about {topic_name}")
-
-            # Pattern 3: Processing Style Detection
-            question_count = sum(text.lower().count('?') for text in all_text.split())
-            story_indicators = sum(text.lower().count(word) for text in all_text.split() for word in ['story', 'remember', 'once', 'time'])
-            metaphor_count = sum(text.lower().count(word) for text in all_text.split() for word in ['like', 'as if', 'feels like'])
-
-            if question_count > total_reflections * 0.8:
-                reflection_dna.append("🤔 You process life through questioning - always seeking deeper understanding")
-            elif story_count := sum(text.lower().count(word) for text in all_text.split() for word in ['when i', 'i remember', 'there was']):
-                if story_count > total_reflections * 0.5:
-                    reflection_dna.append("📖 You make sense of life through storytelling and memories")
-            elif metaphor_count > total_reflections * 0.3:
-                reflection_dna.append("🎨 You process experiences through creative metaphors and comparisons")
-
-            # Pattern 4: Emotional Processing Style
-            gratitude_count = sum(all_text.lower().count(word) for word in ['grateful', 'thankful', 'appreciate', 'blessed'])
-            worry_count = sum(all_text.lower().count(word) for word in ['worry', 'anxious', 'stressed', 'concerned'])
-            hope_count = sum(all_text.lower().count(word) for word in ['hope', 'wish', 'want', 'dream'])
-
-            if gratitude_count > worry_count and gratitude_count > hope_count:
-                reflection_dna.append("🙏 Gratitude is your emotional anchor - you naturally find things to appreciate")
-            elif hope_count > gratitude_count and hope_count > worry_count:
-                reflection_dna.append("✨ You're a natural optimist - future possibilities energize you")
-            elif worry_count > gratitude_count:
-                reflection_dna.append("🛡️ You process challenges by anticipating and preparing for difficulties")
-
-            # Pattern 5: Self-Reference Patterns - how they talk about themselves
-            should_statements = sum(all_text.lower().count(phrase) for phrase in ['i should', 'i need to', 'i must'])
-            self_compassion = sum(all_text.lower().count(phrase) for phrase in ['i\'m learning', 'it\'s okay', 'i forgive'])
-
-            if should_statements > self_compassion * 2:
-                reflection_dna.append("⚖️ Your inner critic is active - you often focus on what you 'should' do")
-            elif self_compassion > should_statements:
-                reflection_dna.append("💝 You practice self-compassion - treating yourself with kindness")
-
-            # Pattern 6: Growth Edge Detection
-            change_words = sum(all_text.lower().count(word) for word in ['change', 'different', 'new', 'grow', 'learn'])
-            stuck_words = sum(all_text.lower().count(word) for word in ['same', 'always', 'never', 'stuck', 'can\'t'])
-
-            if change_words > stuck_words:
-                reflection_dna.append("🌱 You're in an active growth phase - embracing change and new perspectives")
-            elif stuck_words > change_words:
-                reflection_dna.append("🔄 You're noticing patterns you want to break - awareness is the first step")
-
-            # Pattern 7: Connection Style
-            others_focus = sum(all_text.lower().count(word) for word in ['family', 'friends', 'people', 'others', 'relationships'])
-            self_focus = sum(all_text.lower().count(word) for word in ['i feel', 'i think', 'i want', 'my', 'myself'])
-
-            if others_focus > self_focus:
-                reflection_dna.append("🤝 You understand yourself through relationships and connections with others")
-            else:
-                reflection_dna.append("🔍 You're developing a strong sense of self through introspection")
-
-            # Limit to top 6 most insightful patterns
-            reflection_dna = reflection_dna[:6]
-
-            # Calculate reflection style metrics
-            total_word_count = sum(r['word_count'] or 0 for r in reflections)
-            avg_word_count = round(total_word_count / total_reflections) if total_reflections > 0 else 0
-
-            # Determine depth level based on average word count
-            if avg_word_count > 150:
-                depth_level = "deeply reflective"
-            elif avg_word_count > 100:
-                depth_level = "moderately reflective"
-            else:
-                depth_level = "concise reflector"
-
-            # Calculate consistency based on reflection frequency (simplified)
-            consistency = "highly consistent" if total_reflections > 100 else "moderately consistent" if total_reflections > 50 else "developing consistency"
-
-            # Personal reflection insights - generate meaningful insights
-            personal_insights = []
-
-            # Core values insight
-            if core_values:
-                top_value = core_values[0]
-                personal_insights.append(f"Your reflections reveal '{top_value['value']}' as a central theme in your life")
-
-            # Category depth insight
-            if most_invested_category:
-                cat_name, cat_data = most_invested_category
-                cat_display = cat_name.replace('_', ' ').title()
-                emotional_tone = cat_data['emotional_tone']
-                personal_insights.append(f"You invest the most reflection energy in {cat_display}, approaching it with a {emotional_tone} mindset")
-
-            # Growth insight
-            if growth_insights['depth_trend'] == 'growing':
-                personal_insights.append(f"Your reflection depth has grown {growth_insights['depth_change']}% - you're becoming more introspective")
-            elif growth_insights['focus_shift']:
-                personal_insights.append(growth_insights['focus_shift'])
-
-            # Balance insight
-            if 'balance' in [v['value'].lower() for v in core_values[:3]]:
-                personal_insights.append("Balance appears to be important to you - mentioned across multiple life areas")
-
-            return {
-                "total_reflections": total_reflections,
-                "insights": {
-                    "personal_summary": ". ".join(personal_insights) if personal_insights else "Continue reflecting to discover meaningful insights about yourself.",
-                    "core_values": core_values,
-                    "reflection_dna": reflection_dna,
-                    "streak_calendar": streak_stats,
-                    "growth_journey": {
-                        "reflection_depth_change": f"Your reflection depth has {growth_insights['depth_trend']} over time",
-                        "focus_evolution": growth_insights['focus_shift'] or "Your reflection focus has remained consistent",
-                        "emotional_growth": "Growing in self-awareness through consistent reflection"
-                    },
-                    "reflection_style": {
-                        "avg_word_count": avg_word_count,
-                        "depth_level": depth_level,
-                        "consistency": consistency
-                    }
-                }
-            }
-
-        finally:
-            conn.close()
+        return compact_insights_calendar(insights) if compact else insights
 
     except Exception as e:
         logger.error(f"Error generating insights: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== ADMIN ENDPOINTS ====================
+# Admin and repair endpoints are plain `def` so FastAPI runs their blocking queries in its threadpool
 
 def check_admin_user(user_email: str):
     """Check if user is admin"""
     if user_email != "lukemoeller@yahoo.com":
         raise HTTPException(status_code=403, detail="Admin access required")
 
+def search_admin_questions(conn, search: str, category: Optional[str], limit: int, offset: int):
+    """Ranked question search from the catalog's inverted index; only the page's usage counts
+    touch the database (the catalog watcher and admin writes keep the index current)"""
+    hits = get_question_search_index().search(
+        search, category=category if category and category != 'all' else None, limit=limit, offset=offset
+    )
+
+    page_ids = [hit['question']['id'] for hit in hits['results']]
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT question_id, COUNT(*) AS usage_count
+            FROM responses
+            WHERE question_id = ANY(%s)
+            GROUP BY question_id
+        """, (page_ids,))
+        usage = {row['question_id']: row['usage_count'] for row in cur.fetchall()}
+
+    questions = []
+    for hit in hits['results']:
+        question = hit['question']
+        questions.append({
+            "id": question['id'],
+            "question_text": question['question_text'],
+            "category": question.get('category'),
+            "subcategory": question.get('subcategory'),
+            "difficulty_level": question.get('difficulty_level'),
+            "question_type": question.get('question_type'),
+            "usage_count": usage.get(question['id'], 0),
+            "score": hit['score']
+        })
+
+    return {
+        "questions": questions,
+        "total": hits['total'],
+        "limit": limit,
+        "offset": offset
+    }
+
 @app.get("/admin/questions")
-async def get_admin_questions(limit: int = 50, offset: int = 0, search: str = None, category: str = None):
-    """Get paginated questions for admin interface"""
+def get_admin_questions(limit: int = 50, offset: int = 0, search: str = None, category: str = None,
+                        cursor: str = None):
+    """Get paginated questions for admin interface (searches are ranked, best match first);
+    listings also page by cursor (next_cursor / prev_cursor), which takes precedence over offset"""
     try:
-        conn = get_db_connection()
-        try:
+        with get_db_connection() as conn:
+            if search:
+                return search_admin_questions(conn, search, category, limit, offset)
+
+            position = QUESTIONS_KEYSET.decode(cursor)
+
             with conn.cursor() as cur:
                 # Build base query without complex joins for count
                 base_where = []
                 count_params = []
 
-                if search:
-                    base_where.append("(LOWER(question_text) LIKE %s OR CAST(id AS TEXT) LIKE %s)")
-                    count_params.extend([f"%{search.lower()}%", f"%{search}%"])
-
                 if category and category != 'all':
                     base_where.append("category = %s")
                     count_params.append(category)
@@ -1716,52 +1325,66 @@ async def get_admin_questions(limit: int = 50, offset: int = 0, search: str = No
                 cur.execute(count_query, count_params)
                 total_count = cur.fetchone()['count']
 
-                # Get paginated results with usage count
-                data_params = count_params.copy()
-                data_params.extend([limit, offset])
+                # Get paginated results (keyset after a cursor), then usage counts for just that page
+                condition, key_params, order_by = QUESTIONS_KEYSET.sql(position)
+                page_where = base_where + ([condition] if condition else [])
+                page_where_clause = ("WHERE " + " AND ".join(page_where)) if page_where else ""
+                data_params = count_params + key_params + [limit + 1, 0 if position else offset]
 
                 data_query = f"""
                     SELECT q.id, q.question_text, q.category, q.subcategory, q.difficulty_level, q.question_type,
-                           COALESCE(r.usage_count, 0) as usage_count
-                    FROM questions q
-                    LEFT JOIN (
-                        SELECT question_id, COUNT(*) as usage_count
+                           r.usage_count
+                    FROM (
+                        SELECT q.* FROM questions q
+                        {page_where_clause}
+                        ORDER BY {order_by}
+                        LIMIT %s OFFSET %s
+                    ) q
+                    CROSS JOIN LATERAL (
+                        SELECT COUNT(*) as usage_count
                         FROM responses
-                        GROUP BY question_id
-                    ) r ON q.id = r.question_id
-                    {where_clause}
-                    ORDER BY q.id
-                    LIMIT %s OFFSET %s
+                        WHERE question_id = q.id
+                    ) r
+                    ORDER BY {order_by}
                 """
                 cur.execute(data_query, data_params)
-                questions = cur.fetchall()
+                questions, next_cursor, prev_cursor = QUESTIONS_KEYSET.page(cur.fetchall(), limit, position, offset)
 
                 return {
                     "questions": questions,
                     "total": total_count,
                     "limit": limit,
-                    "offset": offset
+                    "offset": offset,
+                    "next_cursor": next_cursor,
+                    "prev_cursor": prev_cursor
                 }
-        finally:
-            conn.close()
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting admin questions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/responses")
-async def get_admin_responses(limit: int = 50, offset: int = 0, search: str = None, user_filter: str = None):
-    """Get paginated responses for admin interface"""
+def get_admin_responses(limit: int = 50, offset: int = 0, search: str = None, user_filter: str = None,
+                        cursor: str = None):
+    """Get paginated responses for admin interface, newest first; also pages by cursor
+    (next_cursor / prev_cursor), which takes precedence over offset"""
     try:
-        conn = get_db_connection()
-        try:
+        position = REFLECTIONS_KEYSET.decode(cursor)
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Build WHERE clause for filtering
                 where_conditions = []
                 params = []
 
                 if search:
-                    where_conditions.append("(LOWER(r.response_text) LIKE %s OR CAST(r.id AS TEXT) LIKE %s OR LOWER(r.question_text_snapshot) LIKE %s)")
-                    params.extend([f"%{search.lower()}%", f"%{search}%", f"%{search.lower()}%"])
+                    # Full-text match on the reflection_search index (response and question text)
+                    where_conditions.append("""(
+                        r.id IN (SELECT reflection_id FROM reflection_search
+                                 WHERE document @@ websearch_to_tsquery('english', %s))
+                        OR CAST(r.id AS TEXT) = %s
+                    )""")
+                    params.extend([search, search.strip()])
 
                 if user_filter and user_filter != 'all':
                     where_conditions.append("u.email = %s")
@@ -1781,43 +1404,80 @@ async def get_admin_responses(limit: int = 50, offset: int = 0, search: str = No
                 cur.execute(count_query, params)
                 total_count = cur.fetchone()['count']
 
-                # Get paginated results
-                params.extend([limit, offset])
+                # Get paginated results (keyset after a cursor, one extra row to detect a next page)
+                condition, key_params, order_by = REFLECTIONS_KEYSET.sql(position)
+                page_conditions = where_conditions + ([condition] if condition else [])
+                page_where_clause = ("WHERE " + " AND ".join(page_conditions)) if page_conditions else ""
+                params.extend(key_params + [limit + 1, 0 if position else offset])
                 data_query = f"""
                     SELECT r.id, r.user_id, r.question_id, r.response_text,
                            r.word_count, r.created_at, r.question_text_snapshot,
                            r.category_snapshot, u.email as user_email
                     FROM responses r
                     LEFT JOIN users u ON r.user_id = u.id
-                    {where_clause}
-                    ORDER BY r.created_at DESC
+                    {page_where_clause}
+                    ORDER BY {order_by}
                     LIMIT %s OFFSET %s
                 """
                 cur.execute(data_query, params)
-                responses = cur.fetchall()
+                responses, next_cursor, prev_cursor = REFLECTIONS_KEYSET.page(cur.fetchall(), limit, position, offset)
 
                 return {
                     "responses": responses,
                     "total": total_count,
                     "limit": limit,
-                    "offset": offset
+                    "offset": offset,
+                    "next_cursor": next_cursor,
+                    "prev_cursor": prev_cursor
                 }
-        finally:
-            conn.close()
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting admin responses: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/responses/search")
+def search_admin_responses(q: str, user_filter: str = None, limit: int = 20, cursor: str = None):
+    """Search every user's responses (or one user's): ranked hits with highlighted snippets"""
+    try:
+        with get_db_connection() as conn:
+            user_id = None
+            if user_filter and user_filter != 'all':
+                with conn.cursor() as cur:
+                    cur.execute("SELECT id FROM users WHERE email = %s", (user_filter,))
+                    user = cur.fetchone()
+                if not user:
+                    return {"results": [], "total": 0, "next_cursor": None}
+                user_id = user['id']
+
+            return reflection_search.search_reflections(conn, q, user_id, limit, cursor)
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching responses: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 class AdminQuestionUpdate(BaseModel):
     question_text: Optional[str] = None
     category: Optional[str] = None
+    allow_duplicate: bool = False
 
 @app.put("/admin/questions/{question_id}")
-async def update_admin_question(question_id: int, updates: AdminQuestionUpdate):
-    """Update a question (admin only)"""
+def update_admin_question(question_id: int, updates: AdminQuestionUpdate):
+    """Update a question (admin only); new text that near-duplicates another question is
+    rejected with 409 unless allow_duplicate is set"""
     try:
-        conn = get_db_connection()
-        try:
+        if updates.question_text is not None and not updates.allow_duplicate:
+            check = get_duplicate_guard().check(updates.question_text, exclude_id=question_id)
+            if check['duplicate']:
+                raise HTTPException(status_code=409, detail={
+                    "message": "Question duplicates an existing question",
+                    "matches": check['matches']
+                })
+
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Build update query dynamically
                 update_fields = []
@@ -1850,20 +1510,20 @@ async def update_admin_question(question_id: int, updates: AdminQuestionUpdate):
                     raise HTTPException(status_code=404, detail="Question not found")
 
                 conn.commit()
+                get_duplicate_guard().record(updated_question)
+                refresh_question_catalog(conn)
                 return updated_question
-
-        finally:
-            conn.close()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating question: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/admin/questions/{question_id}")
-async def delete_admin_question(question_id: int):
+def delete_admin_question(question_id: int):
     """Delete a question (admin only)"""
     try:
-        conn = get_db_connection()
-        try:
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Check if question exists
                 cur.execute("SELECT id FROM questions WHERE id = %s", (question_id,))
@@ -1871,112 +1531,88 @@ async def delete_admin_question(question_id: int):
                     raise HTTPException(status_code=404, detail="Question not found")
 
                 # Delete associated responses first (cascade)
-                cur.execute("DELETE FROM responses WHERE question_id = %s", (question_id,))
+                cur.execute("DELETE FROM responses WHERE question_id = %s RETURNING user_id", (question_id,))
                 responses_deleted = cur.rowcount
+                affected_users = {row['user_id'] for row in cur.fetchall()}
+                for user_id in affected_users:
+                    reflection_stats.rebuild_user_stats(cur, user_id)
 
                 # Delete the question
                 cur.execute("DELETE FROM questions WHERE id = %s", (question_id,))
 
                 conn.commit()
+                refresh_question_catalog(conn)
                 return {
                     "message": f"Question {question_id} deleted successfully",
                     "responses_deleted": responses_deleted
                 }
-
-        finally:
-            conn.close()
     except Exception as e:
         logger.error(f"Error deleting question: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/admin/responses/{response_id}")
-async def delete_admin_response(response_id: int):
+def delete_admin_response(response_id: int):
     """Delete a response (admin only)"""
     try:
-        conn = get_db_connection()
-        try:
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 # Check if response exists
-                cur.execute("SELECT id FROM responses WHERE id = %s", (response_id,))
-                if not cur.fetchone():
+                cur.execute("""
+                    SELECT r.user_id, r.question_id, r.word_count, r.is_draft, r.created_at,
+                           COALESCE(r.category_snapshot, q.category) as category
+                    FROM responses r
+                    LEFT JOIN questions q ON r.question_id = q.id
+                    WHERE r.id = %s
+                """, (response_id,))
+                existing = cur.fetchone()
+                if not existing:
                     raise HTTPException(status_code=404, detail="Response not found")
 
                 # Delete the response
                 cur.execute("DELETE FROM responses WHERE id = %s", (response_id,))
 
+                if not existing['is_draft']:
+                    reflection_stats.record_delete(
+                        cur, existing['user_id'], existing['category'], existing['word_count'], existing['created_at'],
+                        existing['question_id']
+                    )
+
                 conn.commit()
                 return {"message": f"Response {response_id} deleted successfully"}
-
-        finally:
-            conn.close()
     except Exception as e:
         logger.error(f"Error deleting response: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/duplicates")
-async def find_duplicate_questions():
-    """Find potential duplicate questions"""
+def find_duplicate_questions():
+    """Find potential duplicate questions (MinHash/LSH index over the question catalog)"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                # Get all questions
-                cur.execute("SELECT id, question_text, category FROM questions ORDER BY id")
-                questions = cur.fetchall()
-
-                # Simple duplicate detection logic
-                duplicates = []
-                seen = set()
-
-                for i, q1 in enumerate(questions):
-                    if q1['id'] in seen:
-                        continue
-
-                    similar = [q1]
-                    seen.add(q1['id'])
-
-                    for j, q2 in enumerate(questions[i+1:], i+1):
-                        if q2['id'] in seen:
-                            continue
-
-                        # Normalize text for comparison
-                        text1 = q1['question_text'].lower().strip()
-                        text2 = q2['question_text'].lower().strip()
-
-                        # Check for exact matches or very similar
-                        if text1 == text2:
-                            similar.append(q2)
-                            seen.add(q2['id'])
-                        else:
-                            # Simple word overlap check
-                            words1 = set(text1.split())
-                            words2 = set(text2.split())
-
-                            if len(words1) > 3 and len(words2) > 3:
-                                overlap = len(words1.intersection(words2))
-                                similarity = overlap / max(len(words1), len(words2))
-
-                                if similarity > 0.8:
-                                    similar.append(q2)
-                                    seen.add(q2['id'])
-
-                    if len(similar) > 1:
-                        duplicates.append(similar)
-
-                return {"duplicate_groups": duplicates}
-
-        finally:
-            conn.close()
+        # The index follows the catalog, which the watcher and admin writes keep current
+        clusters = get_duplicate_index().clusters()
+        return {
+            "duplicate_groups": [cluster['questions'] for cluster in clusters],
+            "clusters": clusters,
+            "total": len(clusters)
+        }
     except Exception as e:
         logger.error(f"Error finding duplicates: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/questions/classify")
+def classify_question(question_text: str):
+    """Suggest a category for question text (keyword patterns blended with the catalog's TF-IDF centroids)"""
+    try:
+        # Centroids are refitted when the watcher or an admin write loads a new catalog
+        return {"question_text": question_text, **get_question_classifier().classify(question_text)}
+    except Exception as e:
+        logger.error(f"Error classifying question: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/admin/users")
-async def get_admin_users():
+def get_admin_users():
     """Get all users who have responses in the system"""
     try:
-        conn = get_db_connection()
-        try:
+        with get_db_connection() as conn:
             with conn.cursor() as cur:
                 query = """
                     SELECT u.email, COUNT(r.id) AS response_count
@@ -1997,8 +1633,6 @@ async def get_admin_users():
                         for user in users
                     ]
                 }
-        finally:
-            conn.close()
     except Exception as e:
         logger.error(f"Error getting admin users: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -10,6 +10,13 @@ import json
 from datetime import datetime
 from collections import defaultdict, Counter
 import sys
+import os
+
+try:
+    from src.services.question_merkle import QuestionTree, diff_leaves, json_leaves, row_leaves
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+    from services.question_merkle import QuestionTree, diff_leaves, json_leaves, row_leaves
 
 # Database configuration
 DATABASE_CONFIG = {
@@ -326,22 +333,26 @@ class DatabaseIntegrityAnalyzer:
             return
         
         json_ids = set(q['id'] for q in json_questions)
-        json_by_id = {q['id']: q for q in json_questions}
         
         with self.conn.cursor() as cur:
-            # Get all question IDs from database
+            # Get all questions from database
             cur.execute("SELECT id, question_text, category FROM questions")
             db_questions = cur.fetchall()
             db_ids = set(q['id'] for q in db_questions)
-            db_by_id = {q['id']: q for q in db_questions}
             
             # Check which question IDs are used in responses
             cur.execute("SELECT DISTINCT question_id FROM responses")
             used_ids = set(row['question_id'] for row in cur.fetchall())
         
+        # Compare per-category content hashes; only mismatched categories get an id-level diff
+        json_tree = QuestionTree.from_json(json_questions)
+        db_tree = QuestionTree.from_rows(db_questions)
+        mismatched = json_tree.mismatched_categories(db_tree)
+        diff = diff_leaves(json_leaves(json_questions, mismatched), row_leaves(db_questions, mismatched))
+        
         # Find sync issues
-        json_only = json_ids - db_ids
-        db_only = db_ids - json_ids
+        json_only = set(diff['missing'])
+        db_only = set(diff['extra'])
         missing_used = used_ids - db_ids
         
         if json_only:
@@ -372,14 +383,11 @@ class DatabaseIntegrityAnalyzer:
             )
         
         # Check category consistency
-        category_mismatches = []
-        for qid in json_ids & db_ids:
-            if json_by_id[qid].get('category') != db_by_id[qid]['category']:
-                category_mismatches.append({
-                    'id': qid,
-                    'json_category': json_by_id[qid].get('category'),
-                    'db_category': db_by_id[qid]['category']
-                })
+        category_mismatches = [{
+            'id': change['id'],
+            'json_category': change['source_category'],
+            'db_category': change['target_category']
+        } for change in diff['changed'] if change['source_category'] != change['target_category']]
         
         if category_mismatches:
             self.add_issue(
@@ -397,7 +405,11 @@ class DatabaseIntegrityAnalyzer:
             'json_only': len(json_only),
             'db_only': len(db_only),
             'missing_used': len(missing_used),
-            'category_mismatches': len(category_mismatches)
+            'category_mismatches': len(category_mismatches),
+            'text_mismatches': sum(1 for change in diff['changed'] if change['text_changed']),
+            'mismatched_categories': mismatched,
+            'json_root': json_tree.root,
+            'db_root': db_tree.root
         }
         
         print(f"🔄 Sync status: JSON={len(json_ids)}, DB={len(db_ids)}, Used={len(used_ids)}")
@@ -0,0 +1,17 @@
+-- Composite indexes for cursor (keyset) pagination in Echoes of Me (Supabase)
+-- /reflections, /admin/responses and /chat/history page newest first on (created_at, id) and
+-- continue from the last row shown (src/services/pagination.py); these indexes match those
+-- sort keys, so every page is an index range scan no matter how deep it is.
+-- /admin/questions pages on the questions primary key and needs nothing extra. Safe to re-run.
+
+-- A user's reflections (/reflections); supersedes idx_reflections_user_created for these reads
+CREATE INDEX IF NOT EXISTS idx_reflections_user_created_id ON reflections(user_id, created_at DESC, id DESC);
+
+-- Everyone's reflections (/admin/responses)
+CREATE INDEX IF NOT EXISTS idx_reflections_created_id ON reflections(created_at DESC, id DESC);
+
+-- A user's chat history (/chat/history)
+CREATE INDEX IF NOT EXISTS idx_ai_conversations_user_created_id ON ai_conversations(user_id, created_at DESC, id DESC);
+
+-- Test the indexes to make sure they exist
+SELECT 'Listing indexes installed successfully!' AS status;
@@ -14,6 +14,14 @@ import uuid
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
+import os
+import sys
+
+try:
+    from src.services.question_file import get_question_file_index
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+    from services.question_file import get_question_file_index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -204,9 +212,6 @@ async def chat(request: ChatRequest):
 @app.get("/user/{user_email}/answered-questions")
 async def get_user_answered_questions(user_email: str):
     """Get all answered question IDs grouped by category for a specific user"""
-    import json
-    import os
-    
     conn = get_db_connection()
     try:
         # Get answered question IDs from database
@@ -220,13 +225,8 @@ async def get_user_answered_questions(user_email: str):
         
         answered_question_ids = [row[0] for row in cur.fetchall()]
         
-        # Load questions.json to get category mappings
-        questions_file_path = os.path.join(os.path.dirname(__file__), 'src', 'data', 'questions.json')
-        with open(questions_file_path, 'r') as f:
-            questions_data = json.load(f)
-        
-        # Create mapping of question_id to category
-        question_id_to_category = {q['id']: q['category'] for q in questions_data}
+        # question_id -> category from questions.json (cached; re-read only when the file changes)
+        question_id_to_category = get_question_file_index().id_to_category
         
         # Group answered question IDs by category
         answered_by_category = {}
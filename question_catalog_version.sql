@@ -0,0 +1,22 @@
+-- Fingerprint of the questions table for the in-memory question catalog
+-- The API compares it every QUESTION_CATALOG_CHECK_SECONDS and reloads the catalog only
+-- when it changed; without this function the periodic check reloads every time
+
+CREATE OR REPLACE FUNCTION question_catalog_version()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    SELECT md5(COALESCE(string_agg(
+        concat_ws('|', id, question_text, category, subcategory, difficulty_level, is_active, updated_at),
+        E'\n' ORDER BY id
+    ), ''))
+    FROM questions;
+$$;
+
+-- Hashes the whole questions table, so only the backend (service key) may call it
+REVOKE EXECUTE ON FUNCTION question_catalog_version FROM PUBLIC, anon, authenticated;
+
+-- Test the function to make sure it works
+SELECT 'Function created successfully!' AS status;
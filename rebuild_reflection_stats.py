@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Rebuild user_reflection_stats from the reflections history
+Run once after installing the stats table, or after bulk edits that bypass the API
+(clean_*.py, manual SQL).
+
+Usage:
+    python rebuild_reflection_stats.py                      # all users, local PostgreSQL
+    python rebuild_reflection_stats.py --user a@b.com       # one user
+    python rebuild_reflection_stats.py --supabase           # all users, via the Supabase RPC
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from services import reflection_stats
+
+# Database configuration
+DATABASE_CONFIG = {
+    'host': 'host.docker.internal',
+    'database': 'echosofme_dev',
+    'user': 'echosofme',
+    'password': 'secure_dev_password',
+    'port': 5432
+}
+
+
+def rebuild_local(user_email=None):
+    conn = psycopg2.connect(**DATABASE_CONFIG, cursor_factory=RealDictCursor)
+    try:
+        reflection_stats.ensure_stats_table(conn)
+
+        if user_email:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id FROM users WHERE email = %s", (user_email,))
+                user = cur.fetchone()
+                if not user:
+                    print(f"❌ User not found: {user_email}")
+                    return
+                stats = reflection_stats.rebuild_user_stats(cur, user['id'])
+            conn.commit()
+            print(f"✅ {user_email}: {stats['total_reflections']} reflections, "
+                  f"{stats['total_words']} words, {len(stats['category_counts'])} categories")
+            return
+
+        users = reflection_stats.rebuild_all_stats(conn)
+        print(f"✅ Rebuilt stats for {users} users")
+    finally:
+        conn.close()
+
+
+def rebuild_supabase(user_email=None):
+    from services.supabase_service import get_supabase_service
+    supabase = get_supabase_service()
+
+    if user_email:
+        user = supabase.get_user_by_email(user_email)
+        if not user:
+            print(f"❌ User not found: {user_email}")
+            return
+        supabase.client.rpc('rebuild_user_reflection_stats', {'p_user_id': user['id']}).execute()
+        print(f"✅ Rebuilt stats for {user_email}")
+        return
+
+    result = supabase.client.rpc('rebuild_all_reflection_stats', {}).execute()
+    print(f"✅ Rebuilt stats for {result.data} users")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild per-user reflection stats')
+    parser.add_argument('--user', help='only rebuild this user (email)')
+    parser.add_argument('--supabase', action='store_true', help='rebuild in Supabase instead of the local database')
+    args = parser.parse_args()
+
+    print("🔄 Rebuilding user_reflection_stats...")
+    started = time.time()
+    if args.supabase:
+        rebuild_supabase(args.user)
+    else:
+        rebuild_local(args.user)
+    print(f"⏱️  Done in {time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
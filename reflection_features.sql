@@ -0,0 +1,26 @@
+-- Stored per-reflection insight features for Echoes of Me (Supabase)
+-- The backend writes one feature vector (src/services/insights_engine.py) per reflection when
+-- the reflection is created or edited, so /insights folds small integer arrays instead of
+-- downloading and rescanning every reflection's text. Missing rows are backfilled on first read.
+
+-- An empty features array marks a reflection without text
+CREATE TABLE IF NOT EXISTS reflection_features (
+    reflection_id INTEGER PRIMARY KEY REFERENCES reflections(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    lexicon_version INTEGER NOT NULL,
+    features INTEGER[] NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_reflection_features_user ON reflection_features(user_id);
+
+ALTER TABLE reflection_features ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own reflection features" ON reflection_features
+    FOR SELECT USING (auth.uid() = (SELECT auth_id FROM users WHERE id = user_id));
+
+-- Grant permissions for the table
+GRANT SELECT ON reflection_features TO authenticated;
+
+-- Test the table to make sure it works
+SELECT 'Reflection features installed successfully!' AS status;
@@ -0,0 +1,118 @@
+-- Full-text search index over reflections for Echoes of Me (Supabase)
+-- One tsvector per reflection in reflection_search, kept current by a trigger on reflections
+-- (deletes cascade), so searches never rescan reflection text with ILIKE and nothing is
+-- rebuilt periodically. The backend calls search_reflections() for ranked pages with
+-- highlighted snippets (same query as src/services/reflection_search.py). Safe to re-run.
+
+-- Response text weighs more (A) than the text of the question it answers (B)
+CREATE TABLE IF NOT EXISTS reflection_search (
+    reflection_id INTEGER PRIMARY KEY REFERENCES reflections(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    document TSVECTOR NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_reflection_search_document ON reflection_search USING GIN (document);
+CREATE INDEX IF NOT EXISTS idx_reflection_search_user ON reflection_search(user_id);
+
+-- No policies: only the backend (service key) reads it, through search_reflections()
+ALTER TABLE reflection_search ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION reflection_search_document(p_response_text TEXT, p_question_id INTEGER)
+RETURNS TSVECTOR
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(p_response_text, '')), 'A') ||
+           setweight(to_tsvector('english', COALESCE(
+               (SELECT question_text FROM questions WHERE id = p_question_id), ''
+           )), 'B');
+$$;
+
+CREATE OR REPLACE FUNCTION reflections_search_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    INSERT INTO reflection_search (reflection_id, user_id, document)
+    VALUES (NEW.id, NEW.user_id, reflection_search_document(NEW.response_text, NEW.question_id))
+    ON CONFLICT (reflection_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        document = EXCLUDED.document;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS maintain_reflection_search ON reflections;
+CREATE TRIGGER maintain_reflection_search
+    AFTER INSERT OR UPDATE OF response_text, question_id, user_id ON reflections
+    FOR EACH ROW EXECUTE FUNCTION reflections_search_trigger();
+
+-- Index reflections written before the trigger existed
+INSERT INTO reflection_search (reflection_id, user_id, document)
+SELECT r.id, r.user_id, reflection_search_document(r.response_text, r.question_id)
+FROM reflections r
+WHERE NOT EXISTS (SELECT 1 FROM reflection_search s WHERE s.reflection_id = r.id);
+
+-- One page of matches for a web-style query (words, "phrases", -exclusions, or), best first.
+-- p_user_id NULL searches everyone (admin). Pass the last row's rank and id to continue;
+-- p_limit + 1 rows are returned so the caller knows whether there is a next page.
+-- total is the number of matches regardless of the page.
+CREATE OR REPLACE FUNCTION search_reflections(
+    p_query TEXT,
+    p_user_id INTEGER DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL,
+    p_headline_options TEXT DEFAULT 'MaxWords=30, MinWords=10, MaxFragments=2'
+)
+RETURNS TABLE (
+    id INTEGER,
+    user_id INTEGER,
+    question_id INTEGER,
+    response_text TEXT,
+    word_count INTEGER,
+    is_draft BOOLEAN,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    question_text TEXT,
+    category VARCHAR,
+    user_email VARCHAR,
+    rank REAL,
+    total BIGINT,
+    snippet TEXT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH query AS (SELECT websearch_to_tsquery('english', p_query) AS q),
+    matches AS (
+        SELECT s.reflection_id, ts_rank_cd(s.document, query.q) AS rank, COUNT(*) OVER () AS total
+        FROM reflection_search s, query
+        WHERE s.document @@ query.q
+          AND (p_user_id IS NULL OR s.user_id = p_user_id)
+    ),
+    page AS (
+        SELECT * FROM matches
+        WHERE p_after_rank IS NULL OR (matches.rank, matches.reflection_id) < (p_after_rank, p_after_id)
+        ORDER BY matches.rank DESC, matches.reflection_id DESC
+        LIMIT p_limit + 1
+    )
+    SELECT r.id, r.user_id, r.question_id, r.response_text, r.word_count, r.is_draft,
+           r.created_at, r.updated_at, q.question_text, q.category, u.email,
+           page.rank, page.total,
+           ts_headline('english', r.response_text, query.q, p_headline_options)
+    FROM page
+    JOIN reflections r ON r.id = page.reflection_id
+    LEFT JOIN questions q ON q.id = r.question_id
+    LEFT JOIN users u ON u.id = r.user_id
+    CROSS JOIN query
+    ORDER BY page.rank DESC, page.reflection_id DESC;
+$$;
+
+-- Searches any user's reflections, so only the backend may call it
+REVOKE EXECUTE ON FUNCTION search_reflections FROM PUBLIC, anon, authenticated;
+
+-- Test the function to make sure it works
+SELECT 'Reflection search installed successfully!' AS status;
@@ -0,0 +1,175 @@
+"""
+Daily-activity bitmaps and the insights streak calendar
+The bitmap kept in user_reflection_stats answers streaks and active-day counts with integer
+bit operations instead of walking a list of day dicts; no database imports, so both APIs use it
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, Iterator
+
+# Bit n of an activity bitmap is the day ACTIVITY_EPOCH + n. Bits are numbered from the
+# least significant bit of the first byte, the same as Postgres get_bit/set_bit on bytea,
+# so int.from_bytes(bitmap, 'little') has bit n set exactly when day n is active.
+ACTIVITY_EPOCH = date(2020, 1, 1)
+
+# The insights calendar covers today and the 365 days before it
+CALENDAR_DAYS = 366
+
+# Intensity is the day's reflection count capped at this value
+MAX_INTENSITY = 4
+
+
+def as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def day_index(day) -> int:
+    """Bit position for a date/datetime (negative before ACTIVITY_EPOCH)"""
+    return (as_date(day) - ACTIVITY_EPOCH).days
+
+
+def set_activity(bitmap: bytearray, day, active: bool = True):
+    """Mark a day active/inactive, growing the bitmap as needed"""
+    n = day_index(day)
+    if n < 0:
+        return
+    byte, bit = divmod(n, 8)
+    if byte >= len(bitmap):
+        if not active:
+            return
+        bitmap.extend(b'\x00' * (byte + 1 - len(bitmap)))
+    if active:
+        bitmap[byte] |= 1 << bit
+    else:
+        bitmap[byte] &= ~(1 << bit) & 0xFF
+
+
+def has_activity(bitmap: bytes, day) -> bool:
+    """True if the day is marked active"""
+    n = day_index(day)
+    if n < 0 or n // 8 >= len(bitmap):
+        return False
+    return bool(bitmap[n // 8] & (1 << (n % 8)))
+
+
+def active_days(bitmap: bytes, start=None, end=None) -> Iterator[date]:
+    """Yield active days in ascending order, optionally limited to [start, end]"""
+    first = max(day_index(start), 0) if start is not None else 0
+    last = min(day_index(end), len(bitmap) * 8 - 1) if end is not None else len(bitmap) * 8 - 1
+    n = first
+    while n <= last:
+        byte = bitmap[n // 8]
+        if byte == 0:
+            # Skip empty bytes in one step
+            n = (n // 8 + 1) * 8
+            continue
+        if byte & (1 << (n % 8)):
+            yield ACTIVITY_EPOCH + timedelta(days=n)
+        n += 1
+
+
+def decode_bitmap(value) -> bytes:
+    """Bitmap bytes from psycopg2 (bytes/memoryview) or PostgREST (a '\\x0a1b...' hex string)"""
+    if value is None:
+        return b''
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('\\x') else value)
+    return bytes(value)
+
+
+def bitmap_from_days(days) -> bytes:
+    """Bitmap with the given dates (or 'YYYY-MM-DD' strings) marked active"""
+    bitmap = bytearray()
+    for day in days:
+        set_activity(bitmap, date.fromisoformat(day[:10]) if isinstance(day, str) else day)
+    return bytes(bitmap)
+
+
+# Window queries: a window is an int whose bit i is the day `start + i`
+
+def window_bits(bitmap: bytes, start: date, days: int) -> int:
+    """Activity for `days` days from `start` as an int"""
+    offset = day_index(start)
+    value = int.from_bytes(bitmap, 'little')
+    value = value >> offset if offset >= 0 else value << -offset
+    return value & ((1 << days) - 1)
+
+
+def current_streak(bits: int, days: int) -> int:
+    """Consecutive active days ending on the window's last day"""
+    inactive = ~bits & ((1 << days) - 1)
+    if not inactive:
+        return days
+    # Everything above the highest inactive day is the current run
+    return days - inactive.bit_length()
+
+
+def longest_streak(bits: int) -> int:
+    """Longest run of consecutive active days in the window"""
+    # Each step clears the last day of every run, so the step count is the longest run
+    longest = 0
+    while bits:
+        bits &= bits << 1
+        longest += 1
+    return longest
+
+
+def active_day_count(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def build_streak_calendar(bitmap: Optional[bytes], daily_counts: Dict[str, int], today: date,
+                          days: int = CALENDAR_DAYS) -> Dict[str, Any]:
+    """The /insights `streak_calendar` block: streaks from the bitmap, heatmap counts from daily_counts
+
+    Without a stored bitmap (stats table not installed yet) one is built from daily_counts.
+    """
+    if bitmap is None:
+        bitmap = bitmap_from_days(day for day, count in daily_counts.items() if count > 0)
+
+    start = today - timedelta(days=days - 1)
+    bits = window_bits(bitmap, start, days)
+
+    calendar_data = []
+    for offset in range(days):
+        date_str = str(start + timedelta(days=offset))
+        count = daily_counts.get(date_str, 0)
+        calendar_data.append({
+            "date": date_str,
+            "count": count,
+            "intensity": min(count, MAX_INTENSITY)  # Cap at 4 for color intensity
+        })
+
+    return {
+        "current_streak": current_streak(bits, days),
+        "longest_streak": longest_streak(bits),
+        "total_active_days": active_day_count(bits),
+        "calendar_data": calendar_data
+    }
+
+
+def compact_calendar(streak_calendar: Dict[str, Any]) -> Dict[str, Any]:
+    """Same block with calendar_data encoded as one intensity digit per day
+
+    {"start": "2024-10-17", "days": 366, "intensity": "0012000004..."} - digit i is the
+    intensity (0-4) of day start + i; exact counts are kept only for days above the cap.
+    """
+    calendar_data = streak_calendar["calendar_data"]
+    compact = {key: value for key, value in streak_calendar.items() if key != "calendar_data"}
+    compact["calendar"] = {
+        "start": calendar_data[0]["date"] if calendar_data else None,
+        "days": len(calendar_data),
+        "intensity": "".join(str(day["intensity"]) for day in calendar_data),
+        "counts": {day["date"]: day["count"] for day in calendar_data if day["count"] > MAX_INTENSITY}
+    }
+    return compact
+
+
+def compact_insights_calendar(insights: Dict[str, Any]) -> Dict[str, Any]:
+    """An /insights payload with its streak_calendar compacted (the cached payload is left as is)"""
+    streak_calendar = insights.get("insights", {}).get("streak_calendar")
+    if not streak_calendar or "calendar_data" not in streak_calendar:
+        return insights
+    return {
+        **insights,
+        "insights": {**insights["insights"], "streak_calendar": compact_calendar(streak_calendar)}
+    }
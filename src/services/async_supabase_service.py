@@ -0,0 +1,601 @@
+"""
+Async Supabase service for the FastAPI backend
+Same operations as SupabaseService, but awaitable so PostgREST calls don't block the event loop
+"""
+import os
+from datetime import datetime, timedelta
+from collections import defaultdict
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from dotenv import load_dotenv
+from typing import Optional, List, Dict, Any
+import logging
+
+from .activity_calendar import decode_bitmap
+from .auth_cache import get_auth_user_cache
+from .question_catalog import QUESTION_CATALOG_VERSION_RPC, CATALOG_PAGE_SIZE, get_question_catalog
+from .question_sampler import get_question_sampler
+from . import question_deck
+from .pagination import REFLECTIONS_KEYSET, CHAT_HISTORY_KEYSET
+from .reflection_search import (
+    REFLECTION_SEARCH_RPC, HEADLINE_OPTIONS, clamp_limit, decode_search_cursor, search_page
+)
+from .insights_engine import INSIGHTS_PAGE_SIZE, LEXICON_VERSION, InsightsAccumulator, extract_features, is_current
+from .supabase_service import (
+    USER_STATS_RPC, MISSING_FUNCTION_CODES, empty_user_stats, normalize_user_stats, summarize_user_stats
+)
+
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Reflections fetched per request when backfilling insight features
+FEATURE_BACKFILL_BATCH = 200
+
+class AsyncSupabaseService:
+    """Awaitable service class for Supabase database operations"""
+
+    def __init__(self):
+        """Initialize the async PostgREST client (one keep-alive HTTP session for all requests)"""
+        self.supabase_url = os.getenv("SUPABASE_URL")
+        self.supabase_service_key = os.getenv("SUPABASE_SERVICE_KEY")  # Backend only
+
+        if not self.supabase_url or not self.supabase_service_key:
+            raise ValueError(
+                "Missing Supabase configuration. Please set SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables."
+            )
+
+        # Same endpoint and headers the sync supabase client uses for table/rpc calls
+        self.client = AsyncPostgrestClient(
+            f"{self.supabase_url}/rest/v1",
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                'apikey': self.supabase_service_key,
+                'Authorization': f"Bearer {self.supabase_service_key}",
+            },
+            timeout=float(os.getenv("SUPABASE_HTTP_TIMEOUT", "30")),
+        )
+        # Flipped off the first time the stats / catalog version RPCs turn out not to exist
+        self.stats_rpc_available = True
+        self.catalog_version_rpc_available = True
+        logger.info("✅ Async Supabase service initialized")
+
+    async def close(self):
+        """Close the underlying HTTP session"""
+        await self.client.aclose()
+
+    # User Management
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email"""
+        try:
+            result = await self.client.table('users').select('*').eq('email', email).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error getting user by email {email}: {e}")
+            return None
+
+    async def get_user_by_auth_id(self, auth_id: str) -> Optional[Dict[str, Any]]:
+        """Get user by Supabase auth ID"""
+        try:
+            result = await self.client.table('users').select('*').eq('auth_id', auth_id).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error getting user by auth_id {auth_id}: {e}")
+            return None
+
+    async def create_user(self, auth_id: str, email: str, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Create a new user record"""
+        try:
+            user_data = {
+                'auth_id': auth_id,
+                'email': email,
+                'name': name,
+                'role': 'user',
+                'is_active': True
+            }
+
+            result = await self.client.table('users').insert(user_data).execute()
+            get_auth_user_cache().invalidate(auth_id=auth_id)
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error creating user {email}: {e}")
+            return None
+
+    async def update_user(self, user_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update user record"""
+        try:
+            result = await self.client.table('users').update(updates).eq('id', user_id).execute()
+            get_auth_user_cache().invalidate(user_id=user_id)
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error updating user {user_id}: {e}")
+            return None
+
+    # Reflection Management
+    async def get_user_reflections(self, user_id: int, limit: int = 50, offset: int = 0,
+                                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of reflections for a user with question details, newest first:
+        {'reflections', 'next_cursor', 'prev_cursor'}. A cursor (keyset) takes precedence over
+        offset; raises InvalidCursor for a bad one"""
+        position = REFLECTIONS_KEYSET.decode(cursor)
+        try:
+            query = self.client.table('reflections')\
+                .select('*, questions(id, question_text, category)')\
+                .eq('user_id', user_id)
+            # One extra row tells whether there is a next page
+            query = REFLECTIONS_KEYSET.postgrest(query, position).limit(limit + 1)
+            if position is None:
+                query = query.offset(offset)
+            result = await query.execute()
+            reflections, next_cursor, prev_cursor = REFLECTIONS_KEYSET.page(result.data, limit, position, offset)
+            return {'reflections': reflections, 'next_cursor': next_cursor, 'prev_cursor': prev_cursor}
+        except Exception as e:
+            logger.error(f"Error getting reflections for user {user_id}: {e}")
+            return {'reflections': [], 'next_cursor': None, 'prev_cursor': None}
+
+    async def create_reflection(self, user_id: int, question_id: int, response_text: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """Create a new reflection"""
+        try:
+            reflection_data = {
+                'user_id': user_id,
+                'question_id': question_id,
+                'response_text': response_text,
+                'word_count': len(response_text.split()),
+                'is_draft': kwargs.get('is_draft', False),
+                'response_type': kwargs.get('response_type', 'reflection'),
+                'emotional_tags': kwargs.get('emotional_tags', []),
+                'privacy_level': kwargs.get('privacy_level', 'private')
+            }
+
+            result = await self.client.table('reflections').insert(reflection_data).execute()
+            if not result.data:
+                return None
+            await self.save_reflection_features([result.data[0]])
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error creating reflection: {e}")
+            return None
+
+    async def update_reflection(self, reflection_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a reflection"""
+        try:
+            # Update word count if response_text is being updated
+            if 'response_text' in updates:
+                updates['word_count'] = len(updates['response_text'].split())
+
+            result = await self.client.table('reflections').update(updates).eq('id', reflection_id).execute()
+            if not result.data:
+                return None
+            if 'response_text' in updates:
+                await self.save_reflection_features([result.data[0]])
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error updating reflection {reflection_id}: {e}")
+            return None
+
+    async def delete_reflection(self, reflection_id: int, user_id: int) -> bool:
+        """Delete a reflection (with user ownership check)"""
+        try:
+            result = await self.client.table('reflections')\
+                .delete()\
+                .eq('id', reflection_id)\
+                .eq('user_id', user_id)\
+                .execute()
+            return len(result.data) > 0
+        except Exception as e:
+            logger.error(f"Error deleting reflection {reflection_id}: {e}")
+            return False
+
+    async def search_reflections(self, query: str, user_id: Optional[int] = None, limit: int = 20,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Ranked page of reflections matching a query, with snippets and a next-page cursor
+        (search_reflections RPC, see reflection_search.sql). Raises InvalidCursor for a bad cursor"""
+        after = decode_search_cursor(cursor)
+        limit = clamp_limit(limit)
+        result = await self.client.rpc(REFLECTION_SEARCH_RPC, {
+            'p_query': query,
+            'p_user_id': user_id,
+            'p_limit': limit,
+            'p_after_rank': after['rank'] if after else None,
+            'p_after_id': after['id'] if after else None,
+            'p_headline_options': HEADLINE_OPTIONS
+        }).execute()
+        return search_page(result.data or [], limit, first_page=after is None)
+
+    async def get_answered_questions_by_category(self, user_id: int) -> Dict[str, List[int]]:
+        """Get answered question IDs grouped by category for a user"""
+        try:
+            result = await self.client.table('reflections')\
+                .select('question_id, questions(category)')\
+                .eq('user_id', user_id)\
+                .execute()
+
+            # Group by category
+            answered_by_category = {}
+            for reflection in result.data:
+                if reflection.get('questions') and reflection['questions'].get('category'):
+                    category = reflection['questions']['category']
+                    question_id = reflection['question_id']
+
+                    if category not in answered_by_category:
+                        answered_by_category[category] = []
+                    answered_by_category[category].append(question_id)
+
+            return answered_by_category
+        except Exception as e:
+            logger.error(f"Error getting answered questions by category for user {user_id}: {e}")
+            return {}
+
+    # Question Management
+    async def refresh_question_catalog(self, force: bool = False) -> bool:
+        """Reload the in-memory question catalog if the questions table changed; True if reloaded"""
+        catalog = get_question_catalog()
+        version = await self._question_catalog_version()
+        if not force and catalog.is_current(version):
+            return False
+
+        rows = []
+        while True:
+            result = await self.client.table('questions')\
+                .select('*')\
+                .order('id')\
+                .range(len(rows), len(rows) + CATALOG_PAGE_SIZE - 1)\
+                .execute()
+            rows.extend(result.data)
+            if len(result.data) < CATALOG_PAGE_SIZE:
+                break
+
+        catalog.load(rows, version)
+        return True
+
+    async def _question_catalog_version(self) -> Optional[str]:
+        """Fingerprint of the questions table, or None if question_catalog_version.sql isn't installed"""
+        if not self.catalog_version_rpc_available:
+            return None
+        try:
+            result = await self.client.rpc(QUESTION_CATALOG_VERSION_RPC, {}).execute()
+            return result.data
+        except Exception as e:
+            if getattr(e, 'code', None) in MISSING_FUNCTION_CODES:
+                logger.info(f"{QUESTION_CATALOG_VERSION_RPC} function not available, catalog checks will reload: {e}")
+                self.catalog_version_rpc_available = False
+                return None
+            raise
+
+    async def _question_catalog(self):
+        catalog = get_question_catalog()
+        if not catalog.loaded:
+            # Startup load failed (or never ran): load on first use instead
+            await self.refresh_question_catalog(force=True)
+        return catalog
+
+    async def get_questions(self, category: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get questions, optionally filtered by category"""
+        try:
+            catalog = await self._question_catalog()
+            return catalog.get_questions(category, limit)
+        except Exception as e:
+            logger.error(f"Error getting questions: {e}")
+            return []
+
+    async def get_question_categories(self) -> List[str]:
+        """Get all unique question categories"""
+        try:
+            # For admin purposes, show ALL categories regardless of active status
+            catalog = await self._question_catalog()
+            return catalog.get_categories()
+        except Exception as e:
+            logger.error(f"Error getting question categories: {e}")
+            return []
+
+    async def get_random_questions(self, count: int = 5, category: Optional[str] = None,
+                                   seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get random questions for daily prompts (uniform over the whole category; seed for a repeatable draw)"""
+        try:
+            catalog = await self._question_catalog()
+            return get_question_sampler().sample(count, category, seed, catalog.snapshot)
+        except Exception as e:
+            logger.error(f"Error getting random questions: {e}")
+            return []
+
+    async def get_answered_bitmap(self, user_id: int) -> bytes:
+        """Bitmap of the question ids the user has answered (non-draft), from the stats row"""
+        try:
+            bitmap = await self._read_answered_bitmap(user_id)
+            if bitmap is None:
+                # No row yet, or one from before answered_bitmap existed: build it once
+                await self.client.rpc('rebuild_user_reflection_stats', {'p_user_id': user_id}).execute()
+                bitmap = await self._read_answered_bitmap(user_id)
+            if bitmap is not None:
+                return bitmap
+        except Exception as e:
+            logger.warning(f"Could not read answered questions for {user_id}, reading reflections: {e}")
+
+        # Stats table not installed: fall back to the user's reflections
+        result = await self.client.table('reflections')\
+            .select('question_id')\
+            .eq('user_id', user_id)\
+            .eq('is_draft', False)\
+            .execute()
+        return question_deck.bitmap_from_ids(row['question_id'] for row in result.data)
+
+    async def _read_answered_bitmap(self, user_id: int) -> Optional[bytes]:
+        result = await self.client.table('user_reflection_stats')\
+            .select('answered_bitmap')\
+            .eq('user_id', user_id)\
+            .execute()
+        if result.data and result.data[0]['answered_bitmap'] is not None:
+            return decode_bitmap(result.data[0]['answered_bitmap'])
+        return None
+
+    async def get_next_questions(self, user_id: int, count: int = 5, category: Optional[str] = None,
+                                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """Random questions the user has not answered yet, plus answered/total coverage per category"""
+        catalog = await self._question_catalog()
+        answered = await self.get_answered_bitmap(user_id)
+        return question_deck.next_questions(
+            catalog.snapshot, question_deck.answered_mask(answered), count, category, seed
+        )
+
+    # User Statistics
+    async def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+        """Get comprehensive user statistics"""
+        if self.stats_rpc_available:
+            try:
+                result = await self.client.rpc(USER_STATS_RPC, {'p_user_id': user_id}).execute()
+                if result.data:
+                    return normalize_user_stats(result.data)
+            except Exception as e:
+                if getattr(e, 'code', None) in MISSING_FUNCTION_CODES:
+                    logger.info(f"{USER_STATS_RPC} function not available, using fallback: {e}")
+                    self.stats_rpc_available = False
+                else:
+                    logger.warning(f"{USER_STATS_RPC} failed for {user_id}, using fallback: {e}")
+
+        try:
+            # Fallback: one request for the rows, with the exact total in the same response
+            result = await self.client.table('reflections')\
+                .select('word_count, created_at, questions(category)', count='exact')\
+                .eq('user_id', user_id)\
+                .eq('is_draft', False)\
+                .order('created_at', desc=True)\
+                .execute()
+
+            return summarize_user_stats(result.data, result.count or len(result.data))
+        except Exception as e:
+            logger.error(f"Error getting user stats for {user_id}: {e}")
+            return empty_user_stats()
+
+    async def get_reflections_state(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get the user's reflections version counter and daily-activity bitmap
+
+        version validates cached insights (0 until the stats trigger first writes the user's row);
+        activity_bitmap is None without a row. Returns None if the stats table isn't installed,
+        in which case insights are not cached.
+        """
+        try:
+            result = await self.client.table('user_reflection_stats')\
+                .select('version, activity_bitmap')\
+                .eq('user_id', user_id)\
+                .execute()
+            if not result.data:
+                return {'version': 0, 'activity_bitmap': None}
+            return {
+                'version': result.data[0]['version'],
+                'activity_bitmap': decode_bitmap(result.data[0]['activity_bitmap'])
+            }
+        except Exception as e:
+            logger.warning(f"Could not read reflection stats for {user_id}: {e}")
+            return None
+
+    # User Profile Management
+    async def get_user_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get user profile data"""
+        try:
+            result = await self.client.table('user_profiles').select('*').eq('user_id', user_id).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error getting user profile {user_id}: {e}")
+            return None
+
+    async def upsert_user_profile(self, user_id: int, profile_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create or update user profile"""
+        try:
+            profile_data['user_id'] = user_id
+            result = await self.client.table('user_profiles').upsert(profile_data).execute()
+            get_auth_user_cache().invalidate(user_id=user_id)
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error upserting user profile {user_id}: {e}")
+            return None
+
+    # AI Conversations
+    async def create_ai_conversation(self, user_id: int, message: str, response: str,
+                                     conversation_type: str = 'echo') -> Optional[Dict[str, Any]]:
+        """Create AI conversation record"""
+        try:
+            conversation_data = {
+                'user_id': user_id,
+                'user_message': message,
+                'ai_response': response,
+                'conversation_type': conversation_type,
+                'model_version': 'Eleanor-v1'  # Update as needed
+            }
+
+            result = await self.client.table('ai_conversations').insert(conversation_data).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error creating AI conversation: {e}")
+            return None
+
+    async def get_ai_conversation_history(self, user_id: int, limit: int = 50,
+                                          cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of AI conversation history for user, newest first:
+        {'conversations', 'next_cursor', 'prev_cursor'}; raises InvalidCursor for a bad cursor"""
+        position = CHAT_HISTORY_KEYSET.decode(cursor)
+        try:
+            query = self.client.table('ai_conversations')\
+                .select('*')\
+                .eq('user_id', user_id)
+            result = await CHAT_HISTORY_KEYSET.postgrest(query, position).limit(limit + 1).execute()
+            conversations, next_cursor, prev_cursor = CHAT_HISTORY_KEYSET.page(result.data, limit, position)
+            return {'conversations': conversations, 'next_cursor': next_cursor, 'prev_cursor': prev_cursor}
+        except Exception as e:
+            logger.error(f"Error getting AI conversation history for {user_id}: {e}")
+            return {'conversations': [], 'next_cursor': None, 'prev_cursor': None}
+
+    # Insights Data
+    async def save_reflection_features(self, reflections: List[Dict[str, Any]]) -> Dict[int, List[int]]:
+        """Compute and store insight feature vectors for reflections (id, user_id, response_text)"""
+        features_by_id = {r['id']: extract_features(r.get('response_text')) for r in reflections}
+        if not features_by_id:
+            return features_by_id
+        try:
+            await self.client.table('reflection_features').upsert([
+                {
+                    'reflection_id': r['id'],
+                    'user_id': r['user_id'],
+                    'lexicon_version': LEXICON_VERSION,
+                    'features': features_by_id[r['id']],
+                    'updated_at': datetime.now().isoformat()
+                }
+                for r in reflections
+            ]).execute()
+        except Exception as e:
+            # Insights backfill the vector on the next read
+            logger.warning(f"Could not store reflection features: {e}")
+        return features_by_id
+
+    async def _load_feature_page(self, user_id: int, since: str, after_id: int, with_count: bool):
+        """The next page of non-draft reflections (ids after `after_id`) with their stored
+        feature vectors; ids follow creation order, so pages come oldest first"""
+        return await self.client.table('reflections')\
+            .select('id, user_id, word_count, created_at, questions(category), reflection_features(features, lexicon_version)',
+                    count='exact' if with_count else None)\
+            .eq('user_id', user_id)\
+            .eq('is_draft', False)\
+            .gte('created_at', since)\
+            .gt('id', after_id)\
+            .order('id', desc=False)\
+            .limit(INSIGHTS_PAGE_SIZE)\
+            .execute()
+
+    async def _backfill_features(self, reflection_ids: List[int]) -> Dict[int, List[int]]:
+        """Compute and store feature vectors for reflections that have none (or a stale one)"""
+        features_by_id = {}
+        # Chunked so the id list stays well inside URL limits
+        for i in range(0, len(reflection_ids), FEATURE_BACKFILL_BATCH):
+            texts_result = await self.client.table('reflections')\
+                .select('id, user_id, response_text')\
+                .in_('id', reflection_ids[i:i + FEATURE_BACKFILL_BATCH])\
+                .execute()
+            features_by_id.update(await self.save_reflection_features(texts_result.data))
+        return features_by_id
+
+    async def get_user_insights_data(self, user_id: int) -> Dict[str, Any]:
+        """Get comprehensive data for insights analysis
+
+        Reflections (past 365 days) are paged by id, INSIGHTS_PAGE_SIZE rows at a time, and folded
+        into an InsightsAccumulator, so memory is bounded by the page; reflection text is only
+        fetched for rows whose feature vector is missing or stale.
+        """
+        try:
+            year_ago = (datetime.now() - timedelta(days=365)).isoformat()
+
+            accumulator = None
+            daily_counts = defaultdict(int)
+            backfilled = 0
+            last_id = 0
+            while True:
+                page_result = await self._load_feature_page(user_id, year_ago, last_id, with_count=accumulator is None)
+                page = page_result.data
+                if accumulator is None:
+                    accumulator = InsightsAccumulator(page_result.count if page_result.count is not None else len(page))
+                if not page:
+                    break
+
+                stale_ids = []
+                for reflection in page:
+                    stored = reflection.pop('reflection_features', None)
+                    # One-to-one embeds come back as an object on newer PostgREST, a list on older ones
+                    if isinstance(stored, list):
+                        stored = stored[0] if stored else None
+                    if stored and is_current(stored.get('features'), stored.get('lexicon_version')):
+                        reflection['features'] = stored['features']
+                    else:
+                        reflection['features'] = None
+                        stale_ids.append(reflection['id'])
+
+                if stale_ids:
+                    backfill = await self._backfill_features(stale_ids)
+                    for reflection in page:
+                        if reflection['features'] is None:
+                            reflection['features'] = backfill.get(reflection['id'])
+                    backfilled += len(stale_ids)
+
+                for reflection in page:
+                    category = (reflection.get('questions') or {}).get('category')
+                    accumulator.add(category, reflection['word_count'], reflection['features'])
+
+                    # Group reflections by date for calendar view
+                    daily_counts[reflection['created_at'][:10]] += 1  # Extract YYYY-MM-DD
+
+                if len(page) < INSIGHTS_PAGE_SIZE:
+                    break
+                # Continue after the last row seen: rows written meanwhile are not skipped or counted twice
+                last_id = page[-1]['id']
+
+            if backfilled:
+                logger.info(f"Backfilled insight features for {backfilled} reflections of user {user_id}")
+
+            # Convert to list format for calendar
+            calendar_data = []
+            for date_str, count in daily_counts.items():
+                calendar_data.append({
+                    'date': date_str,
+                    'count': count,
+                    'level': min(count, 4)  # Cap intensity at 4
+                })
+
+            return {
+                'insights': accumulator,
+                'calendar_data': calendar_data,
+                'daily_counts': dict(daily_counts)
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting insights data for user {user_id}: {e}")
+            return {
+                'insights': InsightsAccumulator(0),
+                'calendar_data': [],
+                'daily_counts': {}
+            }
+
+    # Health Check
+    async def health_check(self) -> bool:
+        """Check if Supabase connection is healthy"""
+        try:
+            # Simple query to test connection
+            await self.client.table('questions').select('id').limit(1).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Supabase health check failed: {e}")
+            return False
+
+# Create singleton instance
+_async_supabase_service = None
+
+def get_async_supabase_service() -> AsyncSupabaseService:
+    """Get singleton async Supabase service instance"""
+    global _async_supabase_service
+    if _async_supabase_service is None:
+        _async_supabase_service = AsyncSupabaseService()
+    return _async_supabase_service
+
+async def close_async_supabase_service():
+    """Close the singleton's HTTP session (call on application shutdown)"""
+    global _async_supabase_service
+    if _async_supabase_service is not None:
+        await _async_supabase_service.close()
+        _async_supabase_service = None
@@ -0,0 +1,109 @@
+"""
+In-process cache of authenticated user rows
+Lets get_current_user skip the users lookup for tokens it has already resolved
+"""
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class AuthUserCache:
+    """TTL + LRU cache of user rows keyed by auth `sub`, never outliving the token's `exp`"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv("AUTH_CACHE_MAX_SIZE", "1024"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+        # auth_id -> (expires_at, user); insertion order doubles as LRU order
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # users.id -> auth_id, so writes keyed by user id can invalidate too
+        self._auth_ids: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, auth_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached user, or None on miss/expiry"""
+        if not auth_id:
+            return None
+        with self._lock:
+            entry = self._entries.get(auth_id)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.time():
+                self._remove(auth_id)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(auth_id)
+            self._stats['hits'] += 1
+            return dict(user)
+
+    def set(self, auth_id: str, user: Dict[str, Any], token_exp: Optional[float] = None):
+        """Cache a user row until the TTL or the token expiry, whichever comes first"""
+        if not auth_id or not user or self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        with self._lock:
+            if auth_id in self._entries:
+                self._remove(auth_id)
+            self._entries[auth_id] = (expires_at, dict(user))
+            if user.get('id') is not None:
+                self._auth_ids[user['id']] = auth_id
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, auth_id: Optional[str] = None, user_id: Optional[int] = None):
+        """Drop a cached user by auth id and/or users.id"""
+        with self._lock:
+            if auth_id is None and user_id is not None:
+                auth_id = self._auth_ids.get(user_id)
+            if auth_id is not None and auth_id in self._entries:
+                self._remove(auth_id)
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every cached user"""
+        with self._lock:
+            self._entries.clear()
+            self._auth_ids.clear()
+
+    def _remove(self, auth_id: str):
+        """Remove an entry and its user id mapping (caller holds the lock)"""
+        _, user = self._entries.pop(auth_id)
+        if self._auth_ids.get(user.get('id')) == auth_id:
+            del self._auth_ids[user['id']]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of cache size and hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            **stats,
+            'hit_ratio': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+        }
+
+# Create singleton instance
+_auth_user_cache = None
+
+def get_auth_user_cache() -> AuthUserCache:
+    """Get singleton auth user cache"""
+    global _auth_user_cache
+    if _auth_user_cache is None:
+        _auth_user_cache = AuthUserCache()
+    return _auth_user_cache
@@ -0,0 +1,42 @@
+"""
+Opaque keyset pagination cursors
+A cursor is the sort key of the last row on a page (e.g. rank and id) as URL-safe base64 JSON,
+so clients hand it back unchanged and the next page continues with WHERE (key) < (cursor)
+instead of an OFFSET. Pages are fetched with limit + 1 rows to know whether there is a next one
+"""
+import json
+import base64
+import binascii
+from typing import Optional, List, Dict, Any, Iterable, Callable, Tuple
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not issued by us (or for a different listing)"""
+
+
+def encode_cursor(key: Dict[str, Any]) -> str:
+    raw = json.dumps(key, separators=(',', ':'), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str], fields: Iterable[str],
+                  optional: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """The sort key in a cursor (None for no cursor); InvalidCursor unless it has exactly these
+    fields (plus any of the optional ones)"""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(key, dict) or set(key) - set(optional) != set(fields):
+        raise InvalidCursor("Cursor does not belong to this listing")
+    return key
+
+
+def split_page(rows: List[Dict[str, Any]], limit: int,
+               key: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """(page, next cursor) from rows fetched with LIMIT limit + 1"""
+    page = rows[:limit]
+    next_cursor = encode_cursor(key(page[-1])) if len(rows) > limit and page else None
+    return page, next_cursor
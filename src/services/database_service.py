@@ -0,0 +1,422 @@
+"""
+Async data access for the PostgreSQL-backed API
+Runs psycopg2 queries on a dedicated worker pool so route handlers can await them
+without blocking the event loop
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional, List, Dict, Any, Callable, Tuple
+
+from .db_pool import DatabasePool
+from . import reflection_stats
+from . import insights_store
+from . import question_store
+from . import question_deck
+from . import reflection_search
+from .pagination import REFLECTIONS_KEYSET
+from .insights_engine import InsightsAccumulator
+from .question_catalog import get_question_catalog
+from .question_sampler import get_question_sampler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class DatabaseService:
+    """Awaitable users / reflections / questions / profiles queries over a shared pool"""
+
+    def __init__(self, pool: DatabasePool, max_workers: Optional[int] = None):
+        """Size the worker pool to the connection pool so threads never queue on checkout"""
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or pool.max_size,
+            thread_name_prefix="db-worker"
+        )
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(conn, *args, **kwargs) with a pooled connection on a worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._with_connection, fn, *args, **kwargs))
+
+    def _with_connection(self, fn: Callable, *args, **kwargs):
+        with self.pool.connection() as conn:
+            return fn(conn, *args, **kwargs)
+
+    def shutdown(self):
+        """Stop accepting work and wait for in-flight queries"""
+        self._executor.shutdown(wait=True)
+
+    # User Management
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email"""
+        return await self.run(_get_user_by_email, email)
+
+    # Reflection Management
+    async def create_reflection(self, user_id: int, question_id: int, response_text: str, word_count: int,
+                                is_draft: bool = False, response_type: str = 'reflection') -> Dict[str, Any]:
+        """Insert a reflection together with a snapshot of its question"""
+        return await self.run(_create_reflection, user_id, question_id, response_text, word_count, is_draft, response_type)
+
+    async def get_user_reflections(self, user_id: int, limit: int = 50, offset: int = 0,
+                                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of reflections for a user, newest first: {'reflections', 'next_cursor', 'prev_cursor'}.
+        A cursor (keyset) takes precedence over offset; raises InvalidCursor for a bad one"""
+        return await self.run(_get_user_reflections, user_id, limit, offset, cursor)
+
+    async def update_reflection(self, reflection_id: int, user_id: int, response_text: str,
+                                word_count: int) -> Optional[Dict[str, Any]]:
+        """Update a reflection owned by user_id; None if it does not exist"""
+        return await self.run(_update_reflection, reflection_id, user_id, response_text, word_count)
+
+    async def delete_reflection(self, reflection_id: int, user_id: int) -> bool:
+        """Delete a reflection owned by user_id; False if it does not exist"""
+        return await self.run(_delete_reflection, reflection_id, user_id)
+
+    async def search_reflections(self, query: str, user_id: Optional[int] = None, limit: int = 20,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Ranked page of reflections matching a query, with snippets and a next-page cursor"""
+        return await self.run(reflection_search.search_reflections, query, user_id, limit, cursor)
+
+    async def get_answered_questions_by_category(self, user_id: int) -> Dict[str, List[int]]:
+        """Get answered question IDs grouped by category for a user"""
+        return await self.run(_get_answered_questions_by_category, user_id)
+
+    async def get_insights_data(self, user_id: int) -> Tuple[InsightsAccumulator, Dict[str, int], bytes]:
+        """Reduce non-draft reflections into an InsightsAccumulator, plus daily counts for the past year
+        and the daily-activity bitmap"""
+        return await self.run(_get_insights_data, user_id)
+
+    async def get_reflections_version(self, user_id: int) -> int:
+        """Get the user's reflections version counter (validates cached insights)"""
+        return await self.run(_get_reflections_version, user_id)
+
+    # User Statistics
+    async def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+        """Get reflection totals and categories covered for a user"""
+        return await self.run(_get_user_stats, user_id)
+
+    # Question Management
+    async def refresh_question_catalog(self, force: bool = False) -> bool:
+        """Reload the in-memory question catalog if the questions table changed; True if reloaded"""
+        return await self.run(question_store.refresh_catalog, force)
+
+    async def _question_catalog(self):
+        catalog = get_question_catalog()
+        if not catalog.loaded:
+            # Startup load failed (or never ran): load on first use instead
+            await self.refresh_question_catalog(force=True)
+        return catalog.snapshot
+
+    async def get_questions_by_category(self, category: str, limit: int = 10,
+                                        seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get random active questions from one category"""
+        snapshot = await self._question_catalog()
+        return get_question_sampler().sample(limit, category, seed, snapshot)
+
+    async def get_random_questions(self, limit: int = 10, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get random active questions"""
+        snapshot = await self._question_catalog()
+        return get_question_sampler().sample(limit, None, seed, snapshot)
+
+    async def get_next_questions(self, user_id: int, count: int = 5, category: Optional[str] = None,
+                                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """Random questions the user has not answered yet, plus answered/total coverage per category"""
+        snapshot = await self._question_catalog()
+        answered = await self.run(_get_answered_bitmap, user_id)
+        return question_deck.next_questions(snapshot, question_deck.answered_mask(answered), count, category, seed)
+
+    # User Profile Management
+    async def get_user_profile(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get profile by email"""
+        return await self.run(_get_user_profile, email)
+
+    async def upsert_user_profile(self, email: str, profile_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create or update a profile, keeping existing values for omitted fields"""
+        return await self.run(_upsert_user_profile, email, profile_data)
+
+
+# Synchronous query implementations, executed on worker threads
+
+def _get_user_by_email(conn, email: str) -> Optional[Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, email, name FROM users WHERE email = %s", (email,))
+        user = cur.fetchone()
+        return dict(user) if user else None
+
+
+def _create_reflection(conn, user_id: int, question_id: int, response_text: str, word_count: int,
+                       is_draft: bool, response_type: str) -> Dict[str, Any]:
+    with conn.cursor() as cur:
+        # First, get the question text to store as snapshot
+        cur.execute("""
+            SELECT question_text, category
+            FROM questions
+            WHERE id = %s
+        """, (question_id,))
+        question_info = cur.fetchone()
+
+        # Set defaults if question not found
+        if question_info:
+            question_text_snapshot = question_info['question_text']
+            category_snapshot = question_info['category']
+        else:
+            question_text_snapshot = f"⚠️ Question text not available (ID: {question_id})"
+            category_snapshot = "unknown"
+            logger.warning(f"Question {question_id} not found when saving reflection")
+
+        # Insert response with question snapshot
+        cur.execute("""
+            INSERT INTO responses (user_id, question_id, response_text, word_count, is_draft, response_type,
+                                 question_text_snapshot, category_snapshot, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id, user_id, question_id, response_text, word_count, is_draft, response_type,
+                      question_text_snapshot, category_snapshot, created_at, updated_at
+        """, (
+            user_id,
+            question_id,
+            response_text,
+            word_count,
+            is_draft,
+            response_type,
+            question_text_snapshot,
+            category_snapshot,
+            datetime.now(),
+            datetime.now()
+        ))
+        result = cur.fetchone()
+        insights_store.save_features(cur, result['id'], user_id, response_text)
+
+        if not is_draft:
+            reflection_stats.record_insert(
+                cur, user_id, category_snapshot, word_count, result['created_at'], question_id
+            )
+
+        conn.commit()
+        return dict(result)
+
+
+def _get_user_reflections(conn, user_id: int, limit: int, offset: int,
+                          cursor: Optional[str] = None) -> Dict[str, Any]:
+    position = REFLECTIONS_KEYSET.decode(cursor)
+    condition, key_params, order_by = REFLECTIONS_KEYSET.sql(position)
+    with conn.cursor() as cur:
+        # One extra row tells whether there is a next page
+        cur.execute(f"""
+            SELECT r.id, r.user_id, r.question_id, r.response_text, r.word_count,
+                   r.is_draft, r.created_at, r.updated_at,
+                   COALESCE(r.question_text_snapshot, q.question_text) as question_text,
+                   COALESCE(r.category_snapshot, q.category) as category
+            FROM responses r
+            LEFT JOIN questions q ON r.question_id = q.id
+            WHERE r.user_id = %s {f'AND {condition}' if condition else ''}
+            ORDER BY {order_by}
+            LIMIT %s OFFSET %s
+        """, (user_id, *key_params, limit + 1, 0 if position else offset))
+        rows = [dict(reflection) for reflection in cur.fetchall()]
+
+    reflections, next_cursor, prev_cursor = REFLECTIONS_KEYSET.page(rows, limit, position, offset)
+    return {'reflections': reflections, 'next_cursor': next_cursor, 'prev_cursor': prev_cursor}
+
+
+def _update_reflection(conn, reflection_id: int, user_id: int, response_text: str,
+                       word_count: int) -> Optional[Dict[str, Any]]:
+    with conn.cursor() as cur:
+        # First check if reflection exists and belongs to user
+        cur.execute("""
+            SELECT user_id, word_count, is_draft FROM responses WHERE id = %s
+        """, (reflection_id,))
+
+        existing = cur.fetchone()
+        if not existing:
+            return None
+
+        if existing['user_id'] != user_id:
+            raise PermissionError("Not authorized to update this reflection")
+
+        # Update the reflection
+        cur.execute("""
+            UPDATE responses
+            SET response_text = %s, word_count = %s, updated_at = %s
+            WHERE id = %s
+            RETURNING id, user_id, question_id, response_text, word_count, is_draft, response_type, created_at, updated_at
+        """, (
+            response_text,
+            word_count,
+            datetime.now(),
+            reflection_id
+        ))
+
+        result = cur.fetchone()
+        insights_store.save_features(cur, reflection_id, user_id, response_text)
+
+        if not existing['is_draft']:
+            reflection_stats.record_edit(cur, user_id, existing['word_count'], word_count)
+
+        conn.commit()
+        return dict(result)
+
+
+def _delete_reflection(conn, reflection_id: int, user_id: int) -> bool:
+    with conn.cursor() as cur:
+        # First check if reflection exists and belongs to user
+        cur.execute("""
+            SELECT r.user_id, r.question_id, r.word_count, r.is_draft, r.created_at,
+                   COALESCE(r.category_snapshot, q.category) as category
+            FROM responses r
+            LEFT JOIN questions q ON r.question_id = q.id
+            WHERE r.id = %s
+        """, (reflection_id,))
+
+        existing = cur.fetchone()
+        if not existing:
+            return False
+
+        if existing['user_id'] != user_id:
+            raise PermissionError("Not authorized to delete this reflection")
+
+        cur.execute("""
+            DELETE FROM responses WHERE id = %s
+        """, (reflection_id,))
+
+        if not existing['is_draft']:
+            reflection_stats.record_delete(
+                cur, user_id, existing['category'], existing['word_count'], existing['created_at'],
+                existing['question_id']
+            )
+
+        conn.commit()
+        return True
+
+
+def _get_answered_questions_by_category(conn, user_id: int) -> Dict[str, List[int]]:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT q.category, r.question_id
+            FROM responses r
+            JOIN questions q ON r.question_id = q.id
+            WHERE r.user_id = %s
+            ORDER BY q.category, r.question_id
+        """, (user_id,))
+
+        # Group by category
+        answered_by_category = {}
+        for row in cur.fetchall():
+            answered_by_category.setdefault(row['category'], []).append(row['question_id'])
+        return answered_by_category
+
+
+def _get_answered_bitmap(conn, user_id: int) -> bytes:
+    with conn.cursor() as cur:
+        # One primary-key lookup; built from the user's responses only on first access
+        answered = reflection_stats.get_answered(cur, user_id)
+        conn.commit()
+        return answered
+
+
+def _get_insights_data(conn, user_id: int) -> Tuple[InsightsAccumulator, Dict[str, int], bytes]:
+    # Streamed page by page: category, word count and the stored feature vector per reflection
+    accumulator = insights_store.reduce_user_insights(conn, user_id)
+
+    with conn.cursor() as cur:
+        # Query daily reflection counts for the past year
+        today = datetime.now().date()
+        year_ago = today - timedelta(days=365)
+        cur.execute("""
+            SELECT DATE(created_at) as reflection_date, COUNT(*) as count
+            FROM responses
+            WHERE user_id = %s
+              AND is_draft = FALSE
+              AND created_at >= %s
+              AND created_at <= %s
+            GROUP BY DATE(created_at)
+            ORDER BY reflection_date ASC
+        """, (user_id, year_ago, today + timedelta(days=1)))
+        daily_counts = {str(row['reflection_date']): row['count'] for row in cur.fetchall()}
+
+        # Streaks and active days come from the bitmap maintained on writes
+        activity_bitmap = reflection_stats.get_stats(cur, user_id)['activity_bitmap']
+        conn.commit()
+
+        return accumulator, daily_counts, activity_bitmap
+
+
+def _get_reflections_version(conn, user_id: int) -> int:
+    with conn.cursor() as cur:
+        version = reflection_stats.get_version(cur, user_id)
+        conn.commit()
+        return version
+
+
+def _get_user_stats(conn, user_id: int) -> Dict[str, Any]:
+    with conn.cursor() as cur:
+        # One primary-key lookup; the row is kept current by the reflection writes
+        stats = reflection_stats.get_stats(cur, user_id)
+        conn.commit()
+
+        return {
+            'total_reflections': stats['total_reflections'],
+            'total_words': stats['total_words'],
+            'categories_covered': len(stats['category_counts']),
+            'latest_reflection': stats['latest_reflection']
+        }
+
+
+def _get_user_profile(conn, email: str) -> Optional[Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT email, display_name, introduction, relationship, meeting_status,
+                   avatar_url, theme_preference, notification_settings, custom_settings, voice_id,
+                   created_at, updated_at, last_synced
+            FROM user_profiles
+            WHERE email = %s
+        """, (email,))
+        profile = cur.fetchone()
+        return dict(profile) if profile else None
+
+
+def _upsert_user_profile(conn, email: str, profile_data: Dict[str, Any]) -> Dict[str, Any]:
+    with conn.cursor() as cur:
+        # Use INSERT ... ON CONFLICT (upsert pattern)
+        cur.execute("""
+            INSERT INTO user_profiles (
+                email, display_name, introduction, relationship, meeting_status,
+                avatar_url, theme_preference, notification_settings, custom_settings, voice_id,
+                created_at, updated_at, last_synced
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            )
+            ON CONFLICT (email) DO UPDATE SET
+                display_name = COALESCE(EXCLUDED.display_name, user_profiles.display_name),
+                introduction = COALESCE(EXCLUDED.introduction, user_profiles.introduction),
+                relationship = COALESCE(EXCLUDED.relationship, user_profiles.relationship),
+                meeting_status = COALESCE(EXCLUDED.meeting_status, user_profiles.meeting_status),
+                avatar_url = COALESCE(EXCLUDED.avatar_url, user_profiles.avatar_url),
+                theme_preference = COALESCE(EXCLUDED.theme_preference, user_profiles.theme_preference),
+                notification_settings = COALESCE(EXCLUDED.notification_settings, user_profiles.notification_settings),
+                custom_settings = COALESCE(EXCLUDED.custom_settings, user_profiles.custom_settings),
+                voice_id = COALESCE(EXCLUDED.voice_id, user_profiles.voice_id),
+                updated_at = CURRENT_TIMESTAMP,
+                last_synced = CURRENT_TIMESTAMP
+            RETURNING email, display_name, introduction, relationship, meeting_status,
+                     avatar_url, theme_preference, notification_settings, custom_settings, voice_id,
+                     created_at, updated_at, last_synced
+        """, (
+            email,
+            profile_data.get('display_name'),
+            profile_data.get('introduction'),
+            profile_data.get('relationship'),
+            profile_data.get('meeting_status'),
+            profile_data.get('avatar_url'),
+            profile_data.get('theme_preference'),
+            profile_data.get('notification_settings'),
+            profile_data.get('custom_settings'),
+            profile_data.get('voice_id')
+        ))
+
+        updated_profile = cur.fetchone()
+        conn.commit()
+        return dict(updated_profile)
@@ -0,0 +1,186 @@
+"""
+PostgreSQL connection pool for the psycopg2-backed APIs
+Bounded, health-checked pool shared by every endpoint in database_api.py
+"""
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class DatabasePool:
+    """Thread-safe psycopg2 connection pool with checkout health checks and metrics"""
+
+    def __init__(self, database_config: Dict[str, Any], min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, checkout_timeout: Optional[float] = None,
+                 health_check_interval: Optional[float] = None):
+        """Configure the pool; connections are only opened by open()"""
+        self.database_config = database_config
+        self.min_size = min_size if min_size is not None else int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+        self.max_size = max_size if max_size is not None else int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else float(os.getenv("DB_POOL_TIMEOUT", "10"))
+        # Connections idle for less than this are trusted without a SELECT 1 round trip (0 = always probe)
+        self.health_check_interval = health_check_interval if health_check_interval is not None else float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+        if self.min_size < 0 or self.max_size < 1 or self.min_size > self.max_size:
+            raise ValueError(f"Invalid pool size: min={self.min_size}, max={self.max_size}")
+
+        self._pool: Optional[ThreadedConnectionPool] = None
+        # psycopg2's pool raises immediately when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._last_released: Dict[int, float] = {}
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'connections_discarded': 0,
+            'total_wait_ms': 0.0,
+        }
+
+    @property
+    def is_open(self) -> bool:
+        return self._pool is not None and not self._pool.closed
+
+    def open(self):
+        """Create the underlying pool and its minimum number of connections"""
+        if self.is_open:
+            return
+        self._pool = ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
+            cursor_factory=RealDictCursor,
+            **self.database_config
+        )
+        logger.info(f"✅ Database pool opened (min={self.min_size}, max={self.max_size})")
+
+    def close(self):
+        """Close every pooled connection"""
+        if self.is_open:
+            self._pool.closeall()
+            logger.info("Database pool closed")
+        self._pool = None
+        self._last_released.clear()
+
+    def _is_healthy(self, conn) -> bool:
+        """Liveness probe run on checkout"""
+        if conn.closed:
+            return False
+        last_released = self._last_released.get(id(conn))
+        if last_released is not None and time.monotonic() - last_released < self.health_check_interval:
+            return True
+        try:
+            # A connection left mid-transaction or in error state is not safe to hand out
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            # The probe itself opens a transaction; end it so callers start clean
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        """Get a healthy connection, replacing broken ones transparently"""
+        # One retry per slot is enough: a fresh connection failing the probe means the DB is down
+        for _ in range(2):
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+                self._stats['connections_discarded'] += 1
+            logger.warning("Discarding unhealthy pooled database connection")
+            self._last_released.pop(id(conn), None)
+            self._pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+    def _release(self, conn):
+        """Return a connection to the pool, resetting any open transaction"""
+        discard = conn.closed != 0
+        if not discard and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard:
+            with self._lock:
+                self._stats['connections_discarded'] += 1
+            self._last_released.pop(id(conn), None)
+        else:
+            self._last_released[id(conn)] = time.monotonic()
+        self._pool.putconn(conn, close=discard)
+
+    @contextmanager
+    def connection(self):
+        """Check out a pooled connection for the duration of a with-block"""
+        if not self.is_open:
+            self.open()
+
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['waits'] += 1
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise PoolTimeoutError(f"No database connection available after {self.checkout_timeout}s")
+
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._stats['total_wait_ms'] += (time.monotonic() - started) * 1000
+
+        try:
+            yield conn
+        finally:
+            try:
+                self._release(conn)
+            finally:
+                with self._lock:
+                    self._in_use -= 1
+                self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool size, utilisation and checkout statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            in_use = self._in_use
+        idle = len(self._pool._pool) if self.is_open else 0
+        checkouts = stats['checkouts']
+        return {
+            'open': self.is_open,
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'in_use': in_use,
+            'idle': idle,
+            'checkouts': checkouts,
+            'waits': stats['waits'],
+            'timeouts': stats['timeouts'],
+            'health_check_failures': stats['health_check_failures'],
+            'connections_discarded': stats['connections_discarded'],
+            'avg_wait_ms': round(stats['total_wait_ms'] / checkouts, 3) if checkouts else 0.0,
+        }
@@ -0,0 +1,99 @@
+"""
+Write-time duplicate guard for new questions
+Checks candidate texts against the near-duplicate index (normalized text, MinHash buckets, exact
+Jaccard) instead of one exact-match query per insert, so paraphrases are caught too. Single
+checks serve the admin endpoints; check_batch serves the curation scripts
+"""
+import logging
+from typing import Optional, List, Dict, Any, Iterable
+
+from .duplicate_index import DuplicateIndex, get_duplicate_index
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# A little below the /admin/duplicates threshold (0.8), so a one-word rewording of a short
+# question (8 of 10 distinct words shared) is stopped at write time too
+GUARD_THRESHOLD = 0.75
+
+
+class DuplicateGuard:
+    """Duplicate checks against an index of existing questions
+
+    Without an explicit index it uses the shared one that follows the question catalog.
+    """
+
+    def __init__(self, index: Optional[DuplicateIndex] = None, threshold: float = GUARD_THRESHOLD):
+        self._own_index = index
+        self.threshold = threshold
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], threshold: float = GUARD_THRESHOLD) -> 'DuplicateGuard':
+        """Guard over an explicit set of question rows ({'id', 'question_text', ...})"""
+        index = DuplicateIndex()
+        index.sync(rows)
+        return cls(index, threshold)
+
+    @property
+    def index(self) -> DuplicateIndex:
+        return self._own_index if self._own_index is not None else get_duplicate_index()
+
+    def check(self, question_text: str, exclude_id: Optional[int] = None) -> Dict[str, Any]:
+        """{'question_text', 'duplicate', 'matches': [{'id', 'question_text', 'category', 'similarity'}]}
+
+        exclude_id skips the question being edited.
+        """
+        index = self.index
+        matches = []
+        for question_id, similarity in index.candidates(question_text, exclude_id, self.threshold):
+            question = index.question(question_id) or {}
+            matches.append({
+                'id': question_id,
+                'question_text': question.get('question_text'),
+                'category': question.get('category'),
+                'similarity': round(similarity, 3),
+            })
+        return {'question_text': question_text, 'duplicate': bool(matches), 'matches': matches}
+
+    def check_batch(self, question_texts: Iterable[str]) -> Dict[str, List]:
+        """Split candidates into accepted texts and rejected check results
+
+        Candidates are also checked against the ones accepted before them, so a batch never
+        accepts two near-duplicates of each other (those matches carry 'batch_index' instead of
+        an id).
+        """
+        accepted_index = DuplicateIndex()
+        accepted: List[str] = []
+        rejected: List[Dict[str, Any]] = []
+        for question_text in question_texts:
+            result = self.check(question_text)
+            for position, similarity in accepted_index.candidates(question_text, threshold=self.threshold):
+                result['matches'].append({
+                    'batch_index': position,
+                    'question_text': accepted[position],
+                    'similarity': round(similarity, 3),
+                })
+            if result['matches']:
+                result['duplicate'] = True
+                rejected.append(result)
+            else:
+                accepted_index.add({'id': len(accepted), 'question_text': question_text})
+                accepted.append(question_text)
+        return {'accepted': accepted, 'rejected': rejected}
+
+    def record(self, question: Dict[str, Any]):
+        """Add a just-written question to the index, ahead of the next catalog reload"""
+        try:
+            self.index.add(dict(question))
+        except Exception as e:
+            logger.warning(f"Could not index question {question.get('id')}: {e}")
+
+# Create singleton instance
+_duplicate_guard = None
+
+def get_duplicate_guard() -> DuplicateGuard:
+    """Get the singleton guard over the shared duplicate index"""
+    global _duplicate_guard
+    if _duplicate_guard is None:
+        _duplicate_guard = DuplicateGuard()
+    return _duplicate_guard
@@ -0,0 +1,285 @@
+"""
+Near-duplicate question index (MinHash + locality-sensitive hashing)
+Each question's normalized word set gets a MinHash signature; signatures are split into bands
+and bucketed, so only questions sharing a bucket are compared. Candidates are confirmed with the
+exact Jaccard similarity. Built once from the question catalog and kept current incrementally
+"""
+import re
+import hashlib
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Set, FrozenSet
+
+from .question_catalog import QuestionSnapshot, get_question_catalog
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Jaccard similarity (over normalized word sets) above which two questions count as duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+# Questions with fewer words only match on identical text (word overlap means little there)
+MIN_WORDS = 4
+
+# 16 bands of 4 rows: pairs at 0.8 similarity share a bucket with probability > 0.999,
+# pairs at 0.3 with probability < 0.13
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_words(text: str) -> FrozenSet[str]:
+    """Lowercased words without punctuation - the shingles compared between questions"""
+    return frozenset(word.strip("'") for word in _WORD_RE.findall((text or '').lower()) if word.strip("'"))
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace/case/punctuation-insensitive form of a question, for exact-duplicate checks"""
+    return " ".join(word.strip("'") for word in _WORD_RE.findall((text or '').lower()) if word.strip("'"))
+
+
+def jaccard(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    if not words1 and not words2:
+        return 1.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def _permutations(seed: int = 1) -> List[Tuple[int, int]]:
+    """Fixed (a, b) pairs for the universal hashes (a * x + b) mod p"""
+    permutations = []
+    counter = 0
+    while len(permutations) < NUM_PERMUTATIONS:
+        digest = hashlib.blake2b(f"minhash-{seed}-{counter}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], 'little') % _MERSENNE_PRIME
+        b = int.from_bytes(digest[8:], 'little') % _MERSENNE_PRIME
+        if a:
+            permutations.append((a, b))
+        counter += 1
+    return permutations
+
+
+_PERMUTATIONS = _permutations()
+
+
+class MinHasher:
+    """MinHash signatures over word sets; each word's permuted hashes are computed once and reused"""
+
+    def __init__(self, max_cached_words: int = 200000):
+        self.max_cached_words = max_cached_words
+        self._word_hashes: Dict[str, Tuple[int, ...]] = {}
+
+    def _hashes(self, word: str) -> Tuple[int, ...]:
+        hashes = self._word_hashes.get(word)
+        if hashes is None:
+            x = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+            hashes = tuple(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for a, b in _PERMUTATIONS)
+            if len(self._word_hashes) >= self.max_cached_words:
+                self._word_hashes.clear()
+            self._word_hashes[word] = hashes
+        return hashes
+
+    def signature(self, words: Iterable[str]) -> Tuple[int, ...]:
+        vectors = [self._hashes(word) for word in words]
+        if not vectors:
+            return (_MAX_HASH,) * NUM_PERMUTATIONS
+        return tuple(map(min, zip(*vectors)))
+
+
+def band_keys(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND] for band in range(NUM_BANDS)]
+
+
+class DuplicateIndex:
+    """Incremental MinHash-LSH index over questions (id -> text)
+
+    add/remove/update keep the buckets current; duplicate_pairs/clusters compare each question
+    only with its bucket mates, so a full scan is near-linear in the number of questions.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._hasher = MinHasher()
+        self._lock = threading.RLock()
+        # id -> (question row, normalized text, words, band keys)
+        self._entries: Dict[int, Tuple[Dict[str, Any], str, FrozenSet[str], List[Tuple[int, ...]]]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[int]]] = [{} for _ in range(NUM_BANDS)]
+        self._exact: Dict[str, Set[int]] = {}
+        self._snapshot: Optional[QuestionSnapshot] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Maintenance
+    def add(self, question: Dict[str, Any]):
+        """Index a question row ({'id', 'question_text', ...}); replaces an existing entry"""
+        with self._lock:
+            self.remove(question['id'])
+            text = question.get('question_text') or ''
+            words = normalize_words(text)
+            normalized = normalize_text(text)
+            keys = band_keys(self._hasher.signature(words)) if len(words) >= MIN_WORDS else []
+            self._entries[question['id']] = (question, normalized, words, keys)
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, set()).add(question['id'])
+            self._exact.setdefault(normalized, set()).add(question['id'])
+
+    def remove(self, question_id: int):
+        """Drop a question from the index (no-op if absent)"""
+        with self._lock:
+            entry = self._entries.pop(question_id, None)
+            if entry is None:
+                return
+            _, normalized, _, keys = entry
+            for band, key in enumerate(keys):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(question_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+            same_text = self._exact.get(normalized)
+            if same_text is not None:
+                same_text.discard(question_id)
+                if not same_text:
+                    del self._exact[normalized]
+
+    def update(self, question: Dict[str, Any]):
+        """Re-index a question whose text changed"""
+        self.add(question)
+
+    def sync(self, questions: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Bring the index in line with a full set of rows, re-hashing only new or changed texts"""
+        with self._lock:
+            seen = set()
+            added = changed = 0
+            for question in questions:
+                seen.add(question['id'])
+                entry = self._entries.get(question['id'])
+                if entry is None:
+                    added += 1
+                    self.add(question)
+                elif entry[0].get('question_text') != question.get('question_text'):
+                    changed += 1
+                    self.add(question)
+                else:
+                    # Same text: keep the signature, refresh the row (category etc.)
+                    self._entries[question['id']] = (question,) + entry[1:]
+            removed = [question_id for question_id in self._entries if question_id not in seen]
+            for question_id in removed:
+                self.remove(question_id)
+        return {'added': added, 'changed': changed, 'removed': len(removed)}
+
+    def sync_with_catalog(self) -> 'DuplicateIndex':
+        """Follow the question catalog: re-sync whenever it loaded a new snapshot"""
+        snapshot = get_question_catalog().snapshot
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    changes = self.sync(snapshot.questions)
+                    self._snapshot = snapshot
+                    if any(changes.values()):
+                        logger.info(f"🔎 Duplicate index synced: {changes}")
+        return self
+
+    # Queries
+    def candidates(self, text: str, exclude_id: Optional[int] = None,
+                   threshold: Optional[float] = None) -> List[Tuple[int, float]]:
+        """(id, similarity) of indexed questions above the threshold for a piece of text"""
+        threshold = self.threshold if threshold is None else threshold
+        words = normalize_words(text)
+        normalized = normalize_text(text)
+        with self._lock:
+            ids = set(self._exact.get(normalized, ()))
+            if len(words) >= MIN_WORDS:
+                for band, key in enumerate(band_keys(self._hasher.signature(words))):
+                    ids |= self._buckets[band].get(key, set())
+            ids.discard(exclude_id)
+            matches = []
+            for question_id in ids:
+                _, other_normalized, other_words, _ = self._entries[question_id]
+                similarity = self._similarity(normalized, words, other_normalized, other_words)
+                if similarity > threshold:
+                    matches.append((question_id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def _similarity(self, normalized1: str, words1: FrozenSet[str], normalized2: str, words2: FrozenSet[str]) -> float:
+        if normalized1 == normalized2:
+            return 1.0
+        if len(words1) < MIN_WORDS or len(words2) < MIN_WORDS:
+            return 0.0
+        return jaccard(words1, words2)
+
+    def duplicate_pairs(self, threshold: Optional[float] = None) -> List[Tuple[int, int, float]]:
+        """Every (id1, id2, similarity) pair above the threshold, id1 < id2"""
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            candidate_pairs = set()
+            for same_text in self._exact.values():
+                if len(same_text) > 1:
+                    ordered = sorted(same_text)
+                    candidate_pairs.update((a, b) for i, a in enumerate(ordered) for b in ordered[i + 1:])
+            for buckets in self._buckets:
+                for bucket in buckets.values():
+                    if len(bucket) > 1:
+                        ordered = sorted(bucket)
+                        candidate_pairs.update((a, b) for i, a in enumerate(ordered) for b in ordered[i + 1:])
+
+            pairs = []
+            for a, b in candidate_pairs:
+                _, normalized_a, words_a, _ = self._entries[a]
+                _, normalized_b, words_b, _ = self._entries[b]
+                similarity = self._similarity(normalized_a, words_a, normalized_b, words_b)
+                if similarity > threshold:
+                    pairs.append((a, b, round(similarity, 3)))
+        pairs.sort()
+        return pairs
+
+    def clusters(self, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Connected groups of duplicates with their pairwise scores, largest first"""
+        pairs = self.duplicate_pairs(threshold)
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b, _ in pairs:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        grouped: Dict[int, Dict[str, Any]] = {}
+        for a, b, similarity in pairs:
+            cluster = grouped.setdefault(find(a), {'ids': set(), 'pairs': []})
+            cluster['ids'].update((a, b))
+            cluster['pairs'].append({'id1': a, 'id2': b, 'similarity': similarity})
+
+        with self._lock:
+            clusters = [{
+                'questions': [dict(self._entries[question_id][0]) for question_id in sorted(cluster['ids'])],
+                'pairs': cluster['pairs'],
+                'max_similarity': max(pair['similarity'] for pair in cluster['pairs']),
+            } for cluster in grouped.values()]
+        clusters.sort(key=lambda cluster: (-len(cluster['questions']), cluster['questions'][0]['id']))
+        return clusters
+
+    def question(self, question_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(question_id)
+        return dict(entry[0]) if entry else None
+
+# Create singleton instance
+_duplicate_index = None
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Get the singleton duplicate index, synced with the current question catalog"""
+    global _duplicate_index
+    if _duplicate_index is None:
+        _duplicate_index = DuplicateIndex()
+    return _duplicate_index.sync_with_catalog()
@@ -0,0 +1,120 @@
+"""
+In-process cache of computed /insights responses
+Entries are keyed by user id and validated by an ETag built from the user's reflections
+version counter (user_reflection_stats.version), so any reflection write - through this
+process, another worker or a trigger - makes the cached payload unreachable
+"""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from datetime import date
+from typing import Optional, Dict, Any
+
+from .insights_engine import LEXICON_VERSION
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Browsers may keep the body but must revalidate it (If-None-Match) on every view
+INSIGHTS_CACHE_CONTROL = "private, no-cache"
+
+
+def insights_etag(user_id: int, version: int, today: date, variant: str = 'full') -> str:
+    """ETag for a user's insights: changes with any reflection write, the lexicon, the day
+    (the calendar and streaks roll over at midnight) and the calendar encoding"""
+    return f'"insights-{user_id}-{version}-{LEXICON_VERSION}-{today.isoformat()}-{variant}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header covers the ETag (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    if '*' in candidates:
+        return True
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in candidates)
+
+
+class InsightsCache:
+    """LRU cache of insights payloads keyed by user id, each stored with the ETag it was built for
+
+    Payloads are stored with the full calendar; compact responses are derived on the way out.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv("INSIGHTS_CACHE_MAX_SIZE", "256"))
+
+        # user_id -> (etag, payload); insertion order doubles as LRU order
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'stale': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, user_id: int, etag: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload if it was built for this ETag"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            cached_etag, payload = entry
+            if cached_etag != etag:
+                # Built before the latest write (or yesterday)
+                del self._entries[user_id]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._stats['hits'] += 1
+            return payload
+
+    def set(self, user_id: int, etag: str, payload: Dict[str, Any]):
+        """Cache a freshly computed payload"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._entries[user_id] = (etag, payload)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def record_not_modified(self):
+        """Count a request answered with 304 (a hit that skipped the body entirely)"""
+        with self._lock:
+            self._stats['not_modified'] += 1
+
+    def invalidate(self, user_id: int):
+        """Drop a user's payload (called by the reflection write endpoints)"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every cached payload"""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of cache size and hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        served = stats['hits'] + stats['not_modified']
+        requests = served + stats['misses']
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            **stats,
+            'hit_ratio': round(served / requests, 4) if requests else 0.0,
+        }
+
+# Create singleton instance
+_insights_cache = None
+
+def get_insights_cache() -> InsightsCache:
+    """Get singleton insights cache"""
+    global _insights_cache
+    if _insights_cache is None:
+        _insights_cache = InsightsCache()
+    return _insights_cache
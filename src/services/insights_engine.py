@@ -0,0 +1,345 @@
+"""
+Insights engine shared by database_api.py and supabase_api.py
+Each reflection is reduced once (at write time) to a small vector of lexicon counts;
+/insights only folds those vectors together and never rescans reflection text.
+"""
+from collections import Counter, defaultdict
+from typing import Optional, List, Dict, Any, Sequence
+
+from .lexicon_matcher import LexiconMatcher
+
+# Rows fetched per round trip when streaming a user's reflections into the accumulator
+INSIGHTS_PAGE_SIZE = 500
+
+# Bump whenever a lexicon or FEATURE_NAMES changes so stored vectors get recomputed
+LEXICON_VERSION = 1
+
+# Value indicators - words that suggest personal values
+VALUE_INDICATORS = {
+    'family': ['family', 'parent', 'child', 'kids', 'mom', 'dad', 'son', 'daughter', 'siblings', 'spouse', 'wife', 'husband', 'marriage', 'children'],
+    'growth': ['learn', 'grow', 'improve', 'develop', 'progress', 'change', 'evolve', 'better', 'overcome', 'challenge'],
+    'purpose': ['purpose', 'meaning', 'goals', 'dreams', 'vision', 'mission', 'calling', 'passion', 'fulfillment'],
+    'balance': ['balance', 'harmony', 'peace', 'calm', 'stress', 'overwhelmed', 'busy', 'priorities'],
+    'relationships': ['friends', 'friendship', 'trust', 'love', 'connection', 'community', 'support', 'together'],
+    'gratitude': ['grateful', 'thankful', 'appreciate', 'blessed', 'fortunate', 'lucky', 'joy', 'happy'],
+    'authenticity': ['authentic', 'genuine', 'honest', 'true', 'real', 'myself', 'identity', 'values'],
+    'resilience': ['strong', 'strength', 'overcome', 'survive', 'persevere', 'endure', 'tough', 'difficult']
+}
+
+VALUE_DESCRIPTIONS = {
+    'family': "The bonds and relationships that shape your identity",
+    'growth': "Your commitment to continuous learning and improvement",
+    'purpose': "Finding meaning and direction in life's journey",
+    'balance': "Seeking harmony between life's competing demands",
+    'relationships': "Building meaningful connections with others",
+    'gratitude': "Appreciating life's blessings and moments",
+    'authenticity': "Being true to yourself and your values",
+    'resilience': "Your strength in facing life's challenges"
+}
+
+# Emotional tone indicators (profiled per category)
+EMOTION_LEXICONS = {
+    'positive': ['happy', 'joy', 'excited', 'grateful', 'proud', 'love', 'amazing', 'wonderful', 'great', 'good', 'content', 'peaceful'],
+    'challenging': ['sad', 'worried', 'stressed', 'anxious', 'frustrated', 'angry', 'difficult', 'hard', 'struggle', 'pain'],
+    'reflective': ['realize', 'understand', 'learned', 'discovered', 'insight', 'wisdom', 'perspective', 'reflection']
+}
+
+# "Reflection DNA" patterns. The processing-style patterns used to be counted per
+# whitespace token, where multi-word phrases ('as if', 'when i', ...) can never match,
+# so only their single-word entries are listed here; the results are unchanged.
+DNA_LEXICONS = {
+    'question_marks': ['?'],
+    'metaphor': ['like'],
+    'gratitude_words': ['grateful', 'thankful', 'appreciate', 'blessed'],
+    'worry_words': ['worry', 'anxious', 'stressed', 'concerned'],
+    'hope_words': ['hope', 'wish', 'want', 'dream'],
+    'should_statements': ['i should', 'i need to', 'i must'],
+    'self_compassion': ['i\'m learning', 'it\'s okay', 'i forgive'],
+    'change_words': ['change', 'different', 'new', 'grow', 'learn'],
+    'stuck_words': ['same', 'always', 'never', 'stuck', 'can\'t'],
+    'others_focus': ['family', 'friends', 'people', 'others', 'relationships'],
+    'self_focus': ['i feel', 'i think', 'i want', 'my', 'myself']
+}
+
+# Layout of a feature vector: one count per lexicon, in this order
+FEATURE_LEXICONS = {
+    **{f'value_{name}': words for name, words in VALUE_INDICATORS.items()},
+    **{f'emotion_{name}': words for name, words in EMOTION_LEXICONS.items()},
+    **DNA_LEXICONS
+}
+FEATURE_NAMES = list(FEATURE_LEXICONS)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+# Compiled once; scans each text a single time for all lexicons
+FEATURE_MATCHER = LexiconMatcher(FEATURE_LEXICONS)
+
+
+def extract_features(text: Optional[str]) -> List[int]:
+    """Count every lexicon in one reflection; [] means the reflection has no text"""
+    if not text:
+        return []
+    return FEATURE_MATCHER.count(text)
+
+
+def is_current(features: Optional[Sequence[int]], lexicon_version: Optional[int]) -> bool:
+    """True if a stored vector can be used as-is"""
+    return features is not None and lexicon_version == LEXICON_VERSION
+
+
+class InsightsAccumulator:
+    """Folds (category, word_count, features) rows, oldest first, into the /insights payload
+
+    Rows are reduced as they arrive, so memory does not grow with the number of reflections.
+    `expected_total` (the row count of the query being streamed) locates the early and
+    recent thirds used for the growth comparison without keeping a timeline.
+    """
+
+    def __init__(self, expected_total: int):
+        self.expected_total = expected_total
+        self.early_end = expected_total // 3
+        self.recent_start = expected_total - (expected_total + 2) // 3
+
+        self.total_reflections = 0
+        self.total_words = 0
+        self.category_counts = Counter()
+        self.category_words = defaultdict(int)
+        self.category_emotions = defaultdict(lambda: {'positive': 0, 'challenging': 0, 'reflective': 0})
+        self.totals = [0] * len(FEATURE_NAMES)
+
+        # Early/recent thirds: [reflections, words, Counter(category)]
+        self.early = [0, 0, Counter()]
+        self.recent = [0, 0, Counter()]
+
+    def add(self, category: Optional[str], word_count: Optional[int], features: Optional[Sequence[int]]):
+        word_count = word_count or 0
+        position = self.total_reflections
+        self.total_reflections += 1
+        self.total_words += word_count
+
+        if position < self.early_end:
+            self._add_to_period(self.early, category, word_count)
+        if position >= self.recent_start:
+            self._add_to_period(self.recent, category, word_count)
+
+        if not features:
+            return
+
+        for i, count in enumerate(features):
+            self.totals[i] += count
+
+        if category:
+            self.category_counts[category] += 1
+            self.category_words[category] += word_count
+            profile = self.category_emotions[category]
+            for tone in profile:
+                profile[tone] += features[FEATURE_INDEX[f'emotion_{tone}']]
+
+    @staticmethod
+    def _add_to_period(period: list, category: Optional[str], word_count: int):
+        period[0] += 1
+        period[1] += word_count
+        if category:
+            period[2][category] += 1
+
+    def _total(self, name: str) -> int:
+        return self.totals[FEATURE_INDEX[name]]
+
+    def _growth_insights(self) -> Dict[str, Any]:
+        """Compare the first and last thirds of the reflection history"""
+        if self.expected_total < 10 or not self.early[0] or not self.recent[0]:
+            return {'depth_change': 0, 'depth_trend': 'early', 'focus_shift': None}
+
+        early_avg_depth = self.early[1] / self.early[0]
+        recent_avg_depth = self.recent[1] / self.recent[0]
+
+        depth_growth = round(((recent_avg_depth - early_avg_depth) / early_avg_depth * 100), 1) if early_avg_depth > 0 else 0
+
+        # Analyze category evolution
+        early_categories = self.early[2]
+        recent_categories = self.recent[2]
+
+        growth_insights = {
+            'depth_change': depth_growth,
+            'depth_trend': 'growing' if depth_growth > 15 else 'stable' if abs(depth_growth) <= 15 else 'varying',
+            'focus_shift': None
+        }
+
+        # Find biggest focus shift
+        early_top = early_categories.most_common(1)[0][0] if early_categories else None
+        recent_top = recent_categories.most_common(1)[0][0] if recent_categories else None
+
+        if early_top and recent_top and early_top != recent_top:
+            growth_insights['focus_shift'] = f"Shifted focus from {early_top.replace('_', ' ')} to {recent_top.replace('_', ' ')}"
+        return growth_insights
+
+    def _reflection_dna(self, category_avg_lengths: Dict[str, float]) -> List[str]:
+        """Deeply personal patterns derived from the lexicon totals"""
+        total_reflections = self.total_reflections
+        reflection_dna = []
+
+        # Pattern 1: Energy Detection - what topics get the most detailed responses
+        if category_avg_lengths:
+            energy_topic = max(category_avg_lengths.items(), key=lambda x: x[1])
+            topic_name = energy_topic[0].replace('_', ' ').title()
+            reflection_dna.append(f"⚡ Your energy peaks when discussing {topic_name}")
+
+        # Pattern 2: Avoidance Detection - what gets brief responses
+        brief_categories = {cat: avg_len for cat, avg_len in category_avg_lengths.items() if avg_len < 50}
+        if brief_categories:
+            avoided_topic = min(brief_categories.items(), key=lambda x: x[1])
+            topic_name = avoided_topic[0].replace('_', ' ').lower()
+            reflection_dna.append(f"🔍 You tend to give brief responses about {topic_name}")
+
+        # Pattern 3: Processing Style Detection
+        if self._total('question_marks') > total_reflections * 0.8:
+            reflection_dna.append("🤔 You process life through questioning - always seeking deeper understanding")
+        elif self._total('metaphor') > total_reflections * 0.3:
+            reflection_dna.append("🎨 You process experiences through creative metaphors and comparisons")
+
+        # Pattern 4: Emotional Processing Style
+        gratitude_count = self._total('gratitude_words')
+        worry_count = self._total('worry_words')
+        hope_count = self._total('hope_words')
+
+        if gratitude_count > worry_count and gratitude_count > hope_count:
+            reflection_dna.append("🙏 Gratitude is your emotional anchor - you naturally find things to appreciate")
+        elif hope_count > gratitude_count and hope_count > worry_count:
+            reflection_dna.append("✨ You're a natural optimist - future possibilities energize you")
+        elif worry_count > gratitude_count:
+            reflection_dna.append("🛡️ You process challenges by anticipating and preparing for difficulties")
+
+        # Pattern 5: Self-Reference Patterns - how they talk about themselves
+        should_statements = self._total('should_statements')
+        self_compassion = self._total('self_compassion')
+
+        if should_statements > self_compassion * 2:
+            reflection_dna.append("⚖️ Your inner critic is active - you often focus on what you 'should' do")
+        elif self_compassion > should_statements:
+            reflection_dna.append("💝 You practice self-compassion - treating yourself with kindness")
+
+        # Pattern 6: Growth Edge Detection
+        change_words = self._total('change_words')
+        stuck_words = self._total('stuck_words')
+
+        if change_words > stuck_words:
+            reflection_dna.append("🌱 You're in an active growth phase - embracing change and new perspectives")
+        elif stuck_words > change_words:
+            reflection_dna.append("🔄 You're noticing patterns you want to break - awareness is the first step")
+
+        # Pattern 7: Connection Style
+        if self._total('others_focus') > self._total('self_focus'):
+            reflection_dna.append("🤝 You understand yourself through relationships and connections with others")
+        else:
+            reflection_dna.append("🔍 You're developing a strong sense of self through introspection")
+
+        # Limit to top 6 most insightful patterns
+        return reflection_dna[:6]
+
+    def build(self, streak_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Produce the /insights response body"""
+        total_reflections = self.total_reflections
+        if not total_reflections:
+            return {
+                "total_reflections": 0,
+                "insights": {
+                    "message": "Start reflecting to see your personal insights!"
+                }
+            }
+
+        # Analyze core values (top values mentioned)
+        value_scores = {value: self._total(f'value_{value}') for value in VALUE_INDICATORS}
+        top_values = sorted(value_scores.items(), key=lambda x: x[1], reverse=True)[:5]
+        core_values = [{"value": value.replace('_', ' ').title(),
+                       "strength": score,
+                       "description": VALUE_DESCRIPTIONS.get(value, "A meaningful aspect of your life journey")}
+                      for value, score in top_values if score > 0]
+
+        # Category depth analysis
+        category_insights = {}
+        for category, count in self.category_counts.items():
+            total_depth = self.category_words[category]
+            avg_depth = total_depth / count
+            emotional_profile = self.category_emotions[category]
+
+            # Determine emotional tone for this category
+            total_emotional = emotional_profile['positive'] + emotional_profile['challenging']
+            if total_emotional > 0:
+                positivity_ratio = emotional_profile['positive'] / total_emotional
+            else:
+                positivity_ratio = 0.5
+
+            category_insights[category] = {
+                'count': count,
+                'avg_depth': round(avg_depth, 1),
+                'total_investment': total_depth,  # how much mental energy they put here
+                'emotional_tone': 'positive' if positivity_ratio > 0.6 else 'challenging' if positivity_ratio < 0.4 else 'balanced',
+                'reflection_level': emotional_profile['reflective'],
+                'percentage': round((count / total_reflections) * 100, 1)
+            }
+
+        growth_insights = self._growth_insights()
+
+        # Find the most meaningful category (highest total investment)
+        most_invested_category = max(category_insights.items(), key=lambda x: x[1]['total_investment']) if category_insights else None
+
+        category_avg_lengths = {cat: self.category_words[cat] / count for cat, count in self.category_counts.items()}
+        reflection_dna = self._reflection_dna(category_avg_lengths)
+
+        # Calculate reflection style metrics
+        avg_word_count = round(self.total_words / total_reflections)
+
+        # Determine depth level based on average word count
+        if avg_word_count > 150:
+            depth_level = "deeply reflective"
+        elif avg_word_count > 100:
+            depth_level = "moderately reflective"
+        else:
+            depth_level = "concise reflector"
+
+        # Calculate consistency based on reflection frequency (simplified)
+        consistency = "highly consistent" if total_reflections > 100 else "moderately consistent" if total_reflections > 50 else "developing consistency"
+
+        # Personal reflection insights - generate meaningful insights
+        personal_insights = []
+
+        # Core values insight
+        if core_values:
+            top_value = core_values[0]
+            personal_insights.append(f"Your reflections reveal '{top_value['value']}' as a central theme in your life")
+
+        # Category depth insight
+        if most_invested_category:
+            cat_name, cat_data = most_invested_category
+            cat_display = cat_name.replace('_', ' ').title()
+            emotional_tone = cat_data['emotional_tone']
+            personal_insights.append(f"You invest the most reflection energy in {cat_display}, approaching it with a {emotional_tone} mindset")
+
+        # Growth insight
+        if growth_insights['depth_trend'] == 'growing':
+            personal_insights.append(f"Your reflection depth has grown {growth_insights['depth_change']}% - you're becoming more introspective")
+        elif growth_insights['focus_shift']:
+            personal_insights.append(growth_insights['focus_shift'])
+
+        # Balance insight
+        if 'balance' in [v['value'].lower() for v in core_values[:3]]:
+            personal_insights.append("Balance appears to be important to you - mentioned across multiple life areas")
+
+        return {
+            "total_reflections": total_reflections,
+            "insights": {
+                "personal_summary": ". ".join(personal_insights) if personal_insights else "Continue reflecting to discover meaningful insights about yourself.",
+                "core_values": core_values,
+                "reflection_dna": reflection_dna,
+                "streak_calendar": streak_stats,
+                "growth_journey": {
+                    "reflection_depth_change": f"Your reflection depth has {growth_insights['depth_trend']} over time",
+                    "focus_evolution": growth_insights['focus_shift'] or "Your reflection focus has remained consistent",
+                    "emotional_growth": "Growing in self-awareness through consistent reflection"
+                },
+                "reflection_style": {
+                    "avg_word_count": avg_word_count,
+                    "depth_level": depth_level,
+                    "consistency": consistency
+                }
+            }
+        }
@@ -0,0 +1,92 @@
+"""
+Stored per-reflection insight features (local PostgreSQL)
+reflection_features holds one insights_engine feature vector per response, written together
+with the response so /insights never has to read reflection text
+"""
+import logging
+from typing import List
+
+from .insights_engine import INSIGHTS_PAGE_SIZE, LEXICON_VERSION, InsightsAccumulator, extract_features, is_current
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# An empty features array marks a reflection without text
+CREATE_FEATURES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS reflection_features (
+        reflection_id INTEGER PRIMARY KEY REFERENCES responses(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL,
+        lexicon_version INTEGER NOT NULL,
+        features INTEGER[] NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS idx_reflection_features_user ON reflection_features(user_id);
+"""
+
+
+def ensure_features_table(conn):
+    """Create reflection_features if it does not exist"""
+    with conn.cursor() as cur:
+        cur.execute(CREATE_FEATURES_TABLE_SQL)
+    conn.commit()
+
+
+def save_features(cur, reflection_id: int, user_id: int, response_text: str) -> List[int]:
+    """Compute and store a response's feature vector (caller commits)"""
+    features = extract_features(response_text)
+    cur.execute("""
+        INSERT INTO reflection_features (reflection_id, user_id, lexicon_version, features, updated_at)
+        VALUES (%s, %s, %s, %s::INTEGER[], NOW())
+        ON CONFLICT (reflection_id) DO UPDATE SET
+            user_id = EXCLUDED.user_id,
+            lexicon_version = EXCLUDED.lexicon_version,
+            features = EXCLUDED.features,
+            updated_at = NOW()
+    """, (reflection_id, user_id, LEXICON_VERSION, features))
+    return features
+
+
+def reduce_user_insights(conn, user_id: int, page_size: int = INSIGHTS_PAGE_SIZE) -> InsightsAccumulator:
+    """Stream a user's non-draft responses (oldest first) into an InsightsAccumulator
+
+    A server-side cursor delivers `page_size` numeric rows per round trip, so memory is
+    bounded by the page, not the history. Responses written before the table existed, or
+    under an older lexicon, are backfilled page by page; the caller commits.
+    """
+    accumulator = None
+    backfilled = 0
+    with conn.cursor(name=f'insights_user_{user_id}') as stream, conn.cursor() as cur:
+        stream.itersize = page_size
+        stream.execute("""
+            SELECT r.id, r.word_count,
+                   COALESCE(r.category_snapshot, q.category) as category,
+                   f.features, f.lexicon_version,
+                   COUNT(*) OVER () as total
+            FROM responses r
+            LEFT JOIN questions q ON r.question_id = q.id
+            LEFT JOIN reflection_features f ON f.reflection_id = r.id
+            WHERE r.user_id = %s AND r.is_draft = FALSE
+            ORDER BY r.created_at ASC
+        """, (user_id,))
+
+        while True:
+            page = stream.fetchmany(page_size)
+            if not page:
+                break
+            if accumulator is None:
+                accumulator = InsightsAccumulator(page[0]['total'])
+
+            stale = [row['id'] for row in page if not is_current(row['features'], row['lexicon_version'])]
+            backfill = {}
+            if stale:
+                cur.execute("SELECT id, response_text FROM responses WHERE id = ANY(%s)", (stale,))
+                for text_row in cur.fetchall():
+                    backfill[text_row['id']] = save_features(cur, text_row['id'], user_id, text_row['response_text'])
+                backfilled += len(stale)
+
+            for row in page:
+                accumulator.add(row['category'], row['word_count'], backfill.get(row['id'], row['features']))
+
+    if backfilled:
+        logger.info(f"Backfilled insight features for {backfilled} responses of user {user_id}")
+    return accumulator or InsightsAccumulator(0)
@@ -0,0 +1,115 @@
+"""
+Compiled multi-pattern matcher for the insights lexicons
+Counts every pattern of every lexicon in one pass over a text, with the same results as
+summing `text.lower().count(pattern)` per lexicon
+"""
+from collections import Counter, deque
+from typing import Dict, List, Sequence, Tuple
+
+# Distinct tokens remembered between calls before the memo is reset
+MAX_CACHED_TOKENS = 50000
+
+
+class LexiconMatcher:
+    """Aho-Corasick automaton over all lexicon patterns
+
+    Patterns without whitespace can never match across a whitespace boundary, so a text is
+    split into tokens and each distinct token is run through the automaton once (and memoized
+    across texts: reflection vocabularies are small). The few multi-word phrases are counted
+    on the whole text.
+    """
+
+    def __init__(self, lexicons: Dict[str, Sequence[str]]):
+        self.names = list(lexicons)
+
+        # pattern -> feature indices it contributes to (a pattern may sit in several lexicons)
+        targets: Dict[str, List[int]] = {}
+        for index, patterns in enumerate(lexicons.values()):
+            for pattern in patterns:
+                targets.setdefault(pattern.lower(), []).append(index)
+
+        self._phrases: List[Tuple[str, List[int]]] = []
+        self._words: List[Tuple[str, List[int]]] = []
+        for pattern, indices in targets.items():
+            (self._phrases if any(ch.isspace() for ch in pattern) else self._words).append((pattern, indices))
+
+        self._build_automaton([pattern for pattern, _ in self._words])
+        self._token_cache: Dict[str, Tuple[Tuple[int, int], ...]] = {}
+
+    def _build_automaton(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._lengths = [len(pattern) for pattern in patterns]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state].append(pattern_id)
+
+        # Breadth-first failure links; each state's output includes its failure chain's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, token: str) -> Tuple[Tuple[int, int], ...]:
+        """Per-feature counts for one token: ((feature_index, count), ...)"""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        counts: Dict[int, int] = {}
+        # str.count semantics: occurrences of the same pattern may not overlap
+        next_free: Dict[int, int] = {}
+        state = 0
+        for position, ch in enumerate(token):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                start = position - lengths[pattern_id] + 1
+                if start >= next_free.get(pattern_id, 0):
+                    next_free[pattern_id] = position + 1
+                    counts[pattern_id] = counts.get(pattern_id, 0) + 1
+
+        features: Dict[int, int] = {}
+        for pattern_id, count in counts.items():
+            for index in self._words[pattern_id][1]:
+                features[index] = features.get(index, 0) + count
+        return tuple(features.items())
+
+    def count(self, text: str) -> List[int]:
+        """One count per lexicon, in lexicon order"""
+        totals = [0] * len(self.names)
+        if not text:
+            return totals
+        text_lower = text.lower()
+
+        cache = self._token_cache
+        if len(cache) > MAX_CACHED_TOKENS:
+            cache.clear()
+        for token, occurrences in Counter(text_lower.split()).items():
+            hits = cache.get(token)
+            if hits is None:
+                hits = cache[token] = self._scan(token)
+            for index, count in hits:
+                totals[index] += count * occurrences
+
+        for phrase, indices in self._phrases:
+            count = text_lower.count(phrase)
+            if count:
+                for index in indices:
+                    totals[index] += count
+        return totals
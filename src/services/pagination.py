@@ -0,0 +1,139 @@
+"""
+Keyset (cursor) pagination for the reflection, admin and chat listings
+Each listing is ordered by a unique sort key - (created_at, id) or id - and a page continues
+from the last row it showed (WHERE (created_at, id) < cursor) instead of skipping OFFSET rows,
+so deep pages cost the same as the first and don't shift when rows are inserted. Cursors are
+opaque (see cursors.py); previous-page cursors walk the index the other way. The same keyset
+renders as SQL for the local database and as PostgREST filters for Supabase
+"""
+import re
+import logging
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Tuple
+
+from .cursors import InvalidCursor, encode_cursor, decode_cursor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Set on cursors that page backwards
+DIRECTION_FIELD = 'dir'
+PREVIOUS = 'prev'
+
+# Composite indexes matching the local listings' sort keys
+CREATE_LISTING_INDEXES_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_responses_user_created_id ON responses(user_id, created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS idx_responses_created_id ON responses(created_at DESC, id DESC);
+    -- Per-question usage counts for one admin page of questions
+    CREATE INDEX IF NOT EXISTS idx_responses_question ON responses(question_id);
+"""
+
+_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}(:?\d{2})?)?$')
+
+# A decoded cursor: (sort key, paging backwards)
+Position = Tuple[Dict[str, Any], bool]
+
+
+def ensure_listing_indexes(conn):
+    """Create the listing indexes if they do not exist"""
+    with conn.cursor() as cur:
+        cur.execute(CREATE_LISTING_INDEXES_SQL)
+    conn.commit()
+
+
+def _cursor_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+def _valid_value(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    return isinstance(value, str) and bool(_TIMESTAMP_RE.match(value))
+
+
+class Keyset:
+    """A listing's unique sort key: `fields` as named in result rows, `columns` as written in
+    SQL (default: the same), compared as one row value"""
+
+    def __init__(self, fields: Tuple[str, ...], columns: Optional[Tuple[str, ...]] = None,
+                 descending: bool = True):
+        self.fields = fields
+        self.columns = columns or fields
+        self.descending = descending
+
+    def decode(self, cursor: Optional[str]) -> Optional[Position]:
+        """(sort key, backwards) from a cursor, None for no cursor; InvalidCursor if it isn't ours"""
+        key = decode_cursor(cursor, self.fields, optional=(DIRECTION_FIELD,))
+        if key is None:
+            return None
+        backwards = key.pop(DIRECTION_FIELD, None) == PREVIOUS
+        if not all(_valid_value(key[field]) for field in self.fields):
+            raise InvalidCursor("Malformed cursor")
+        return key, backwards
+
+    def _descending(self, position: Optional[Position]) -> bool:
+        # Walking backwards reverses the order; the page is flipped back afterwards
+        return self.descending != bool(position and position[1])
+
+    # Local PostgreSQL
+    def sql(self, position: Optional[Position]) -> Tuple[Optional[str], List[Any], str]:
+        """(WHERE condition or None, its parameters, ORDER BY list) for a page"""
+        direction = 'DESC' if self._descending(position) else 'ASC'
+        order_by = ', '.join(f"{column} {direction}" for column in self.columns)
+        if position is None:
+            return None, [], order_by
+        operator = '<' if self._descending(position) else '>'
+        placeholders = ', '.join(['%s'] * len(self.columns))
+        condition = f"({', '.join(self.columns)}) {operator} ({placeholders})"
+        return condition, [position[0][field] for field in self.fields], order_by
+
+    # Supabase (PostgREST has no row comparison, so it is spelled out with or/and)
+    def postgrest(self, query, position: Optional[Position]):
+        """The query with the page's keyset filter and order applied"""
+        descending = self._descending(position)
+        if position is not None:
+            operator = 'lt' if descending else 'gt'
+            key = position[0]
+            if len(self.fields) == 1:
+                query = query.filter(self.fields[0], operator, key[self.fields[0]])
+            else:
+                alternatives = []
+                for i, field in enumerate(self.fields):
+                    equal = [f'{earlier}.eq."{key[earlier]}"' for earlier in self.fields[:i]]
+                    comparison = f'{field}.{operator}."{key[field]}"'
+                    alternatives.append(f"and({','.join(equal + [comparison])})" if equal else comparison)
+                query = query.or_(','.join(alternatives))
+        for field in self.fields:
+            query = query.order(field, desc=descending)
+        return query
+
+    def page(self, rows: List[Dict[str, Any]], limit: int, position: Optional[Position],
+             offset: int = 0) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """(rows in listing order, next cursor, previous cursor) from rows fetched with
+        LIMIT limit + 1 (offset pages get cursors too, so clients can switch)"""
+        backwards = bool(position and position[1])
+        more = len(rows) > limit
+        rows = list(rows[:limit])
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return rows, None, None
+
+        has_next = True if backwards else more
+        has_previous = more if backwards else (position is not None or offset > 0)
+        next_cursor = encode_cursor(self.key(rows[-1])) if has_next else None
+        previous_cursor = encode_cursor({**self.key(rows[0]), DIRECTION_FIELD: PREVIOUS}) if has_previous else None
+        return rows, next_cursor, previous_cursor
+
+    def key(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: _cursor_value(row[field]) for field in self.fields}
+
+
+# Sort keys of the paginated listings
+REFLECTIONS_KEYSET = Keyset(('created_at', 'id'), ('r.created_at', 'r.id'))
+CHAT_HISTORY_KEYSET = Keyset(('created_at', 'id'))
+# Local admin question listing (oldest first) and the Supabase one (newest first)
+QUESTIONS_KEYSET = Keyset(('id',), ('q.id',), descending=False)
+NEWEST_QUESTIONS_KEYSET = Keyset(('id',))
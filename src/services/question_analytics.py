@@ -0,0 +1,186 @@
+"""
+Question catalog analytics
+One pass over the catalog (questions table rows or questions.json entries) groups questions by
+category; each category report (counts, duplicate groups, length distribution, keyword
+coverage) is then computed independently, in-process or across a process pool. No database
+imports, so it runs on rows from either source
+"""
+import re
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from statistics import mean, median
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Word-count buckets for the length distribution: (label, lowest, highest)
+LENGTH_BUCKETS = [('1-5', 1, 5), ('6-10', 6, 10), ('11-15', 11, 15), ('16-20', 16, 20), ('21+', 21, None)]
+
+TOP_KEYWORDS = 15
+NEWEST_QUESTIONS = 10
+
+# Words too common in questions to say anything about a category's themes
+STOPWORDS = frozenset("""
+    a about after all am an and any are as at be been before being but by can could did do does
+    doing done for from had has have having how i if in into is it its just me more most my no
+    not of on one or other our out over own so some than that the their them then there these
+    they this those to too up very was we were what when where which who why will with would
+    you your yourself ever what's you've you're you'd you'll don't didn't it's that's who's
+""".split())
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+# (id, text, is_active, response_count) - plain tuples so they pickle cheaply
+QuestionRecord = Tuple[int, str, bool, int]
+
+
+def _keywords(text: str) -> set:
+    return {word.strip("'") for word in _WORD_RE.findall(text.lower())
+            if len(word.strip("'")) > 2 and word.strip("'") not in STOPWORDS}
+
+
+def _length_distribution(word_counts: List[int]) -> Dict[str, Any]:
+    if not word_counts:
+        return {'min': 0, 'max': 0, 'mean': 0, 'median': 0, 'buckets': {label: 0 for label, _, _ in LENGTH_BUCKETS}}
+    buckets = {label: 0 for label, _, _ in LENGTH_BUCKETS}
+    for count in word_counts:
+        for label, lowest, highest in LENGTH_BUCKETS:
+            if count >= lowest and (highest is None or count <= highest):
+                buckets[label] += 1
+                break
+    return {
+        'min': min(word_counts),
+        'max': max(word_counts),
+        'mean': round(mean(word_counts), 1),
+        'median': median(word_counts),
+        'buckets': buckets,
+    }
+
+
+def analyze_category(category: str, records: List[QuestionRecord]) -> Dict[str, Any]:
+    """Report for one category's questions"""
+    by_text: Dict[str, List[int]] = {}
+    keyword_counts: Counter = Counter()
+    word_counts = []
+    inactive = 0
+    for question_id, text, is_active, _ in records:
+        by_text.setdefault(text, []).append(question_id)
+        keyword_counts.update(_keywords(text))
+        word_counts.append(len(text.split()))
+        if not is_active:
+            inactive += 1
+
+    responses = {record[0]: record[3] for record in records}
+    duplicate_groups = []
+    for text, ids in by_text.items():
+        if len(ids) > 1:
+            ids = sorted(ids)
+            duplicate_groups.append({
+                'question_text': text,
+                'count': len(ids),
+                'ids': ids,
+                # Responses on the copies the curation would merge away (all but the lowest id)
+                'responses_on_duplicates': sum(responses[i] for i in ids[1:]),
+            })
+    duplicate_groups.sort(key=lambda group: (-group['count'], group['ids'][0]))
+    duplicate_entries = sum(group['count'] - 1 for group in duplicate_groups)
+
+    total = len(records)
+    newest = sorted(records, key=lambda record: record[0], reverse=True)[:NEWEST_QUESTIONS]
+    return {
+        'category': category,
+        'total': total,
+        'unique': len(by_text),
+        'inactive': inactive,
+        'id_range': [min(r[0] for r in records), max(r[0] for r in records)] if records else None,
+        'duplicate_groups': duplicate_groups,
+        'duplicate_entries': duplicate_entries,
+        'duplication_rate': round(duplicate_entries / total * 100, 1) if total else 0.0,
+        'responses': sum(record[3] for record in records),
+        'responses_on_duplicates': sum(group['responses_on_duplicates'] for group in duplicate_groups),
+        'length_words': _length_distribution(word_counts),
+        'keywords': {
+            'vocabulary': len(keyword_counts),
+            'top': [{'keyword': keyword, 'questions': count, 'coverage': round(count / total, 3)}
+                    for keyword, count in keyword_counts.most_common(TOP_KEYWORDS)],
+        },
+        'newest': [{'id': record[0], 'question_text': record[1]} for record in newest],
+    }
+
+
+def _analyze_category_args(args: Tuple[str, List[QuestionRecord]]) -> Dict[str, Any]:
+    return analyze_category(*args)
+
+
+def group_records(rows: Iterable[Dict[str, Any]],
+                  response_counts: Optional[Dict[int, int]] = None) -> Dict[str, List[QuestionRecord]]:
+    """The single pass: category -> records, from questions table rows
+    ({'id', 'question_text', 'category', 'is_active'?})"""
+    response_counts = response_counts or {}
+    grouped: Dict[str, List[QuestionRecord]] = {}
+    for row in rows:
+        grouped.setdefault(row.get('category') or 'uncategorized', []).append(
+            (row['id'], row.get('question_text') or '', row.get('is_active') is not False, response_counts.get(row['id'], 0))
+        )
+    return grouped
+
+
+def json_rows(questions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """questions.json entries as questions table rows"""
+    return [{'id': q['id'], 'question_text': q.get('question'), 'category': q.get('category')} for q in questions]
+
+
+def build_report(rows: Iterable[Dict[str, Any]], source: str, categories: Optional[List[str]] = None,
+                 response_counts: Optional[Dict[int, int]] = None,
+                 workers: int = 1) -> Dict[str, Any]:
+    """Every category report plus a catalog summary, as one JSON-serializable dict
+
+    response_counts maps question id -> number of responses when the source has them.
+    workers > 1 spreads the categories over a process pool.
+    """
+    grouped = group_records(rows, response_counts)
+    if categories:
+        wanted = set(categories)
+        grouped = {category: records for category, records in grouped.items() if category in wanted}
+
+    jobs = sorted(grouped.items())
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(_analyze_category_args, jobs))
+    else:
+        reports = [analyze_category(category, records) for category, records in jobs]
+
+    # Same text filed under more than one category (invisible to the per-category reports)
+    text_categories: Dict[str, set] = {}
+    for category, records in jobs:
+        for _, text, _, _ in records:
+            text_categories.setdefault(text, set()).add(category)
+    cross_category = [{'question_text': text, 'categories': sorted(cats)}
+                      for text, cats in text_categories.items() if len(cats) > 1]
+
+    top_duplicates = sorted(
+        ({'category': report['category'], 'question_text': group['question_text'], 'count': group['count']}
+         for report in reports for group in report['duplicate_groups']),
+        key=lambda group: -group['count']
+    )[:10]
+
+    total = sum(report['total'] for report in reports)
+    return {
+        'source': source,
+        'generated_at': datetime.now().isoformat(),
+        'summary': {
+            'questions': total,
+            'categories': len(reports),
+            'unique': sum(report['unique'] for report in reports),
+            'duplicate_entries': sum(report['duplicate_entries'] for report in reports),
+            'duplication_rate': round(sum(report['duplicate_entries'] for report in reports) / total * 100, 1)
+            if total else 0.0,
+            'cross_category_duplicates': len(cross_category),
+            'top_duplicates': top_duplicates,
+        },
+        'categories': {report['category']: report for report in reports},
+        'cross_category_duplicates': cross_category,
+    }
@@ -0,0 +1,161 @@
+"""
+Process-wide in-memory question catalog
+The ~1,600-row questions table is loaded once and kept as an immutable snapshot with
+per-category indexes and an id map, so question reads never touch the database. Admin
+writes refresh it explicitly; a periodic version check picks up changes made elsewhere.
+No database imports - each API supplies its own loader
+"""
+import os
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable, Callable, Awaitable
+
+from .question_merkle import QuestionTree
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Server-side catalog fingerprint (see question_catalog_version.sql)
+QUESTION_CATALOG_VERSION_RPC = 'question_catalog_version'
+
+# Rows per request when loading the catalog through PostgREST (its default max-rows is 1000)
+CATALOG_PAGE_SIZE = 1000
+
+
+def _id_mask(questions: Iterable[Dict[str, Any]]) -> int:
+    mask = 0
+    for question in questions:
+        mask |= 1 << question['id']
+    return mask
+
+
+class QuestionSnapshot:
+    """One immutable load of the questions table
+
+    `questions` holds every row ordered by id; `active` and `by_category` hold only active
+    rows (also ordered by id), which is what the public question endpoints serve.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], version: Optional[str] = None):
+        self.version = version
+        self.loaded_at = datetime.now()
+        self.questions = tuple(sorted((dict(row) for row in rows), key=lambda q: q['id']))
+        self.by_id = {q['id']: q for q in self.questions}
+        # Rows loaded without is_active (older schemas) count as active
+        self.active = tuple(q for q in self.questions if q.get('is_active', True) is not False)
+
+        by_category: Dict[str, list] = {}
+        for question in self.active:
+            by_category.setdefault(question['category'], []).append(question)
+        self.by_category = {category: tuple(questions) for category, questions in by_category.items()}
+
+        # Bit n set for active question id n, per category and overall; ANDed with a user's
+        # answered bitmap (see question_deck) to count coverage without touching responses
+        self.category_masks = {category: _id_mask(questions) for category, questions in self.by_category.items()}
+        self.active_mask = _id_mask(self.active)
+
+        # Admin screens list every category, including ones whose questions are all inactive
+        self.categories = sorted({q['category'] for q in self.questions if q.get('category')})
+
+        # Per-category content hashes of every row, compared against questions.json by /sync-status
+        self.tree = QuestionTree.from_rows(self.questions)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+
+class QuestionCatalog:
+    """Holds the current QuestionSnapshot; loads swap the whole snapshot in one assignment,
+    so readers never see a half-built index and need no lock"""
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self.check_interval = check_interval if check_interval is not None else \
+            float(os.getenv("QUESTION_CATALOG_CHECK_SECONDS", "60"))
+        self.snapshot = QuestionSnapshot([])
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'checks': 0, 'unchanged': 0, 'failures': 0}
+
+    # Loading
+    def load(self, rows: Iterable[Dict[str, Any]], version: Optional[str] = None) -> QuestionSnapshot:
+        """Replace the catalog with freshly loaded rows"""
+        snapshot = QuestionSnapshot(rows, version)
+        with self._lock:
+            self.snapshot = snapshot
+            self.loaded = True
+            self._stats['loads'] += 1
+        logger.info(f"📚 Question catalog loaded: {len(snapshot.active)} active of {len(snapshot)} questions, "
+                    f"{len(snapshot.by_category)} categories")
+        return snapshot
+
+    def is_current(self, version: Optional[str]) -> bool:
+        """True if the loaded snapshot was built from this database version
+        (unknown versions are never current, so they always reload)"""
+        with self._lock:
+            self._stats['checks'] += 1
+            current = self.loaded and version is not None and self.snapshot.version == version
+            if current:
+                self._stats['unchanged'] += 1
+        return current
+
+    def record_failure(self):
+        with self._lock:
+            self._stats['failures'] += 1
+
+    async def watch(self, refresh: Callable[[], Awaitable[Any]]):
+        """Run `refresh()` (a version check that reloads on change) every check_interval seconds"""
+        if self.check_interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.record_failure()
+                logger.warning(f"Question catalog version check failed, keeping current snapshot: {e}")
+
+    # Reads
+    def get_question(self, question_id: int) -> Optional[Dict[str, Any]]:
+        """Get a question (active or not) by id"""
+        question = self.snapshot.by_id.get(question_id)
+        return dict(question) if question else None
+
+    def get_questions(self, category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Active questions ordered by id, optionally from one category"""
+        snapshot = self.snapshot
+        questions = snapshot.by_category.get(category, ()) if category else snapshot.active
+        return [dict(q) for q in questions[:limit]]
+
+    def get_categories(self) -> List[str]:
+        """Every category, including ones without active questions"""
+        return list(self.snapshot.categories)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot size and load/check counters"""
+        snapshot = self.snapshot
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'loaded': self.loaded,
+            'questions': len(snapshot),
+            'active': len(snapshot.active),
+            'categories': len(snapshot.categories),
+            'version': snapshot.version,
+            'loaded_at': snapshot.loaded_at.isoformat() if self.loaded else None,
+            'check_interval': self.check_interval,
+            **stats,
+        }
+
+# Create singleton instance
+_question_catalog = None
+
+def get_question_catalog() -> QuestionCatalog:
+    """Get singleton question catalog"""
+    global _question_catalog
+    if _question_catalog is None:
+        _question_catalog = QuestionCatalog()
+    return _question_catalog
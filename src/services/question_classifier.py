@@ -0,0 +1,328 @@
+"""
+Keyword-pattern question classifier (with optional TF-IDF centroid blending)
+The per-category regex lists are compiled once into a single scanner: plain word and phrase
+patterns become one token -> categories table filled by a single tokenizing pass, and only the
+few patterns with lookaheads or gaps still run as regexes, and only when their leading literal
+occurs in the text. Scores match evaluating every regex one by one
+"""
+import re
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from .question_analytics import STOPWORDS
+from .question_catalog import QuestionSnapshot, get_question_catalog
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Keyword patterns per category (matched against the lowercased question)
+CATEGORY_PATTERNS = {
+    'romantic_love': [
+        r'\bromantic\b', r'\bromance\b', r'\blove\b', r'\blover\b', r'\bdating\b', r'\bdate\b',
+        r'\battraction\b', r'\bintimacy\b', r'\bintimate\b', r'\bpassion\b', r'\baffection\b',
+        r'\brelationship.*romantic\b', r'\bpartner.*romantic\b', r'\bheart\b.*\blove\b',
+        r'\bfalling in love\b', r'\bfell in love\b', r'\bin love\b', r'\blove language\b'
+    ],
+
+    'marriage_partnerships': [
+        r'\bmarriage\b', r'\bmarried\b', r'\bspouse\b', r'\bhusband\b', r'\bwife\b',
+        r'\bpartnership\b', r'\bpartner\b(?!.*business)', r'\bwedding\b', r'\bengagement\b',
+        r'\blong[- ]?term relationship\b', r'\bcommitted relationship\b', r'\blife partner\b'
+    ],
+
+    'family_parenting': [
+        r'\bfamily\b', r'\bparent\b', r'\bparenting\b', r'\bmother\b', r'\bfather\b', r'\bmom\b', r'\bdad\b',
+        r'\bchild\b', r'\bchildren\b', r'\bkids?\b', r'\bson\b', r'\bdaughter\b', r'\bsibling\b',
+        r'\bbrother\b', r'\bsister\b', r'\bgrandparent\b', r'\bgrandchild\b', r'\bgeneration\b'
+    ],
+
+    'friendships_social': [
+        r'\bfriend\b', r'\bfriendship\b', r'\bbuddy\b', r'\bcompanion\b', r'\bpeer\b',
+        r'\bsocial\b', r'\bsocializing\b', r'\bsocial.*group\b', r'\bcommunity.*social\b'
+    ],
+
+    'relationships': [
+        r'\brelationship\b(?!.*romantic)', r'\bconnection\b', r'\bbond\b', r'\brelate to\b',
+        r'\brelating\b', r'\binterpersonal\b', r'\bhuman connection\b'
+    ],
+
+    'career': [
+        r'\bcareer\b', r'\bjob\b', r'\bwork\b(?!.*home)', r'\bemployment\b', r'\bprofession\b',
+        r'\boccupation\b', r'\bindustry\b', r'\bbusiness\b', r'\bcompany\b', r'\borganization\b',
+        r'\bmanagement\b', r'\bleadership\b', r'\bteam\b', r'\bcolleague\b', r'\bboss\b', r'\bsupervisor\b'
+    ],
+
+    'professional': [
+        r'\bprofessional\b', r'\bworkplace\b', r'\bcorporate\b', r'\boffice\b',
+        r'\bprofessional development\b', r'\bprofessional growth\b', r'\bnetworking\b'
+    ],
+
+    'creative_expression': [
+        r'\bcreative\b', r'\bcreativity\b', r'\bart\b', r'\bartist\b', r'\bartistic\b',
+        r'\bmusic\b', r'\bpainting\b', r'\bdrawing\b', r'\bwriting\b', r'\bdesign\b',
+        r'\bcraft\b', r'\bperform\b', r'\bperformance\b', r'\bexpress\b.*creativ',
+        r'\bimagination\b', r'\bimagine\b.*creat', r'\bcreate\b', r'\bcreating\b'
+    ],
+
+    'hobbies': [
+        r'\bhobby\b', r'\bhobbies\b', r'\bleisure\b', r'\bfun\b', r'\bpastime\b',
+        r'\brecreation\b', r'\bentertainment\b', r'\bplay\b', r'\benjoying\b',
+        r'\bfree time\b', r'\bspare time\b', r'\brelaxation\b'
+    ],
+
+    'education': [
+        r'\beducation\b', r'\bschool\b', r'\bcollege\b', r'\buniversity\b', r'\bstudent\b',
+        r'\bteacher\b', r'\bteaching\b', r'\blearn\b', r'\blearning\b', r'\bstudy\b',
+        r'\bstudying\b', r'\bacademic\b', r'\bclass\b', r'\bcourse\b', r'\bknowledge\b'
+    ],
+
+    'personal': [
+        r'\byourself\b', r'\byou feel\b', r'\bpersonal\b(?!.*history)', r'\bidentity\b',
+        r'\bpersonality\b', r'\bself\b', r'\bindividual\b', r'\bwho you are\b',
+        r'\byour.*nature\b', r'\byour.*character\b', r'\byour.*traits\b'
+    ],
+
+    'personal_history': [
+        r'\bchildhood\b', r'\bgrew up\b', r'\bgrowing up\b', r'\bwhen you were\b',
+        r'\bpast\b', r'\bmemory\b', r'\bmemories\b', r'\bremember\b', r'\bhistory\b',
+        r'\bexperience\b.*past', r'\bfirst time\b', r'\byounger\b', r'\byears ago\b',
+        r'\bback then\b', r'\bused to\b', r'\bonce\b.*time'
+    ],
+
+    'philosophy_values': [
+        r'\bphilosophy\b', r'\bphilosophical\b', r'\bvalues?\b', r'\bethics?\b', r'\bethical\b',
+        r'\bmoral\b', r'\bmorality\b', r'\bbelief\b', r'\bbeliefs\b', r'\bmeaning\b',
+        r'\bpurpose\b', r'\bprinciple\b', r'\bvirtue\b', r'\bwisdom\b', r'\bmeaningful\b'
+    ],
+
+    'daily_life': [
+        r'\bdaily\b', r'\beveryday\b', r'\broutine\b', r'\bregular\b', r'\bhabit\b',
+        r'\bmorning\b', r'\bevening\b', r'\bhome\b', r'\bhousehold\b', r'\bchore\b',
+        r'\bliving space\b', r'\bdaily life\b'
+    ],
+
+    'hypotheticals': [
+        r'\bif you could\b', r'\bwould you rather\b', r'\bwhat if\b', r'\bimagine if\b',
+        r'\bsuppose\b', r'\bhypothetical\b', r'\bwould you\b.*choose'
+    ]
+}
+
+PATTERN_WEIGHT = 10
+
+# (all of, any of, categories, bonus): substring context nudges on top of the pattern scores
+CONTEXT_BONUSES = [
+    (('work',), ('professional', 'career', 'job'), ('career', 'professional'), 5),
+    (('relationship',), ('romantic', 'love', 'partner'), ('romantic_love',), 8),
+    (('family',), ('parent', 'child'), ('family_parenting',), 8),
+]
+
+# Categories the recategorization never moves questions out of
+PINNED_CATEGORIES = ('journal',)
+
+_TOKEN_RE = re.compile(r'\w+')
+_LITERAL_RE = re.compile(r'^\\b((?:[a-z]+ )*[a-z]+)(s\?)?\\b$')
+_LEADING_LITERAL_RE = re.compile(r'^\\b([a-z]+)')
+
+
+class PatternScanner:
+    """All category patterns compiled into one token table plus a few guarded regexes"""
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.categories = list(patterns)
+        # word -> categories (one entry per pattern)
+        self.words: Dict[str, List[str]] = {}
+        # first word -> [(phrase words, phrase, category)]
+        self.phrases: Dict[str, List[Tuple[Tuple[str, ...], str, str]]] = {}
+        # (category, literal that must occur, regex) for patterns with gaps or lookaheads
+        self.regexes: List[Tuple[str, str, Any]] = []
+
+        for category, category_patterns in patterns.items():
+            for pattern in category_patterns:
+                literal = _LITERAL_RE.match(pattern)
+                if literal:
+                    forms = [literal.group(1)] + ([literal.group(1) + 's'] if literal.group(2) else [])
+                    for form in forms:
+                        words = tuple(form.split(' '))
+                        if len(words) == 1:
+                            self.words.setdefault(form, []).append(category)
+                        else:
+                            self.phrases.setdefault(words[0], []).append((words, form, category))
+                else:
+                    leading = _LEADING_LITERAL_RE.match(pattern)
+                    self.regexes.append((category, leading.group(1) if leading else '', re.compile(pattern)))
+
+    def counts(self, text: str) -> Counter:
+        """Pattern match counts per category for lowercased text"""
+        counts: Counter = Counter()
+        tokens = [(m.group(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+        for i, (token, start, _) in enumerate(tokens):
+            for category in self.words.get(token, ()):
+                counts[category] += 1
+            for words, phrase, category in self.phrases.get(token, ()):
+                last = i + len(words) - 1
+                # Same words separated by exactly one space, as the regex requires
+                if last < len(tokens) and text[start:tokens[last][2]] == phrase:
+                    counts[category] += 1
+        for category, literal, regex in self.regexes:
+            if literal in text:
+                counts[category] += len(regex.findall(text))
+        return counts
+
+
+def pattern_scores(scanner: PatternScanner, text: str) -> Dict[str, int]:
+    """Weighted pattern scores in category order, plus the context bonuses"""
+    counts = scanner.counts(text)
+    scores = {category: counts[category] * PATTERN_WEIGHT for category in scanner.categories if counts[category]}
+    for required, any_of, categories, bonus in CONTEXT_BONUSES:
+        if all(word in text for word in required) and any(word in text for word in any_of):
+            for category in categories:
+                scores[category] = scores.get(category, 0) + bonus
+    return scores
+
+
+class TfidfCentroids:
+    """Per-category TF-IDF centroids fitted on already-categorized questions"""
+
+    def __init__(self, labelled: Iterable[Tuple[str, str]], categories: Optional[Iterable[str]] = None):
+        allowed = set(categories) if categories is not None else None
+        documents = [(Counter(self.terms(text)), category) for text, category in labelled
+                     if allowed is None or category in allowed]
+        document_frequency: Counter = Counter()
+        for terms, _ in documents:
+            document_frequency.update(terms.keys())
+        total = len(documents) or 1
+        self.idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        sums: Dict[str, Counter] = {}
+        for terms, category in documents:
+            vector = self._vector(terms)
+            centroid = sums.setdefault(category, Counter())
+            for term, weight in vector.items():
+                centroid[term] += weight
+        self.centroids = {category: self._normalize(centroid) for category, centroid in sums.items()}
+
+    @staticmethod
+    def terms(text: str) -> List[str]:
+        return [token for token in _TOKEN_RE.findall(text.lower()) if len(token) > 2 and token not in STOPWORDS]
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    def _vector(self, terms: Counter) -> Dict[str, float]:
+        return self._normalize({term: count * self.idf[term] for term, count in terms.items() if term in self.idf})
+
+    def similarities(self, text: str) -> Dict[str, float]:
+        """Cosine similarity of the text to every category centroid"""
+        vector = self._vector(Counter(self.terms(text)))
+        return {category: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+                for category, centroid in self.centroids.items()}
+
+
+class QuestionClassifier:
+    """Suggests a category for question text
+
+    centroid_weight 0 reproduces the keyword patterns exactly; above 0 the normalized pattern
+    scores are blended with TF-IDF similarity to each category's current questions (fit()).
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]] = CATEGORY_PATTERNS, centroid_weight: float = 0.0):
+        self.scanner = PatternScanner(patterns)
+        self.centroid_weight = centroid_weight
+        self.centroids: Optional[TfidfCentroids] = None
+
+    def fit(self, labelled: Iterable[Tuple[str, str]]) -> 'QuestionClassifier':
+        """Fit TF-IDF centroids on (text, category) pairs"""
+        self.centroids = TfidfCentroids(labelled, self.scanner.categories)
+        return self
+
+    def classify(self, question_text: str) -> Dict[str, Any]:
+        """{'category' (None if nothing matched), 'confidence' (0-1 margin over the runner-up), 'scores'}"""
+        text = (question_text or '').lower()
+        scores: Dict[str, float] = pattern_scores(self.scanner, text)
+
+        if self.centroid_weight > 0 and self.centroids is not None:
+            top = max(scores.values(), default=0) or 1
+            similarities = self.centroids.similarities(text)
+            blended = {category: (1 - self.centroid_weight) * score / top for category, score in scores.items()}
+            for category, similarity in similarities.items():
+                if similarity > 0:
+                    blended[category] = blended.get(category, 0.0) + self.centroid_weight * similarity
+            scores = blended
+
+        if not scores:
+            return {'category': None, 'confidence': 0.0, 'scores': {}}
+        # max() keeps the first of equal scores, i.e. pattern order, as the original loop did
+        category, best = max(scores.items(), key=lambda item: item[1])
+        runner_up = max((score for other, score in scores.items() if other != category), default=0)
+        confidence = (best - runner_up) / best if best > 0 else 0.0
+        return {
+            'category': category,
+            'confidence': round(confidence, 3),
+            'scores': {other: round(score, 3) for other, score in scores.items()},
+        }
+
+    def classify_batch(self, question_texts: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.classify(text) for text in question_texts]
+
+    def propose_moves(self, questions: Iterable[Dict[str, Any]], min_confidence: float = 0.0,
+                      pinned: Iterable[str] = PINNED_CATEGORIES) -> Dict[str, Any]:
+        """Questions ({'id', 'question' or 'question_text', 'category'}) whose suggested category
+        differs from the current one, most confident first"""
+        pinned = set(pinned)
+        questions = list(questions)
+        moves = []
+        for question in questions:
+            text = question.get('question_text') or question.get('question') or ''
+            result = self.classify(text)
+            current = question.get('category')
+            if not result['category'] or result['category'] == current or current in pinned:
+                continue
+            if result['confidence'] < min_confidence:
+                continue
+            moves.append({
+                'id': question.get('id'),
+                'question_text': text,
+                'from': current,
+                'to': result['category'],
+                'confidence': result['confidence'],
+                'scores': result['scores'],
+            })
+        moves.sort(key=lambda move: (-move['confidence'], move['id'] if move['id'] is not None else 0))
+        return {
+            'questions': len(questions),
+            'moves': moves,
+            'by_transition': dict(Counter(f"{move['from']} -> {move['to']}" for move in moves).most_common()),
+        }
+
+
+class _CatalogClassifier:
+    """Classifier whose centroids follow the question catalog (refitted on a new snapshot)"""
+
+    def __init__(self, centroid_weight: float):
+        self.classifier = QuestionClassifier(centroid_weight=centroid_weight)
+        self._snapshot: Optional[QuestionSnapshot] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> QuestionClassifier:
+        snapshot = get_question_catalog().snapshot
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    self.classifier.fit((q['question_text'], q.get('category')) for q in snapshot.active)
+                    self._snapshot = snapshot
+        return self.classifier
+
+# Create singleton instance
+_catalog_classifier = None
+
+def get_question_classifier(centroid_weight: float = 0.3) -> QuestionClassifier:
+    """Get the shared classifier, its TF-IDF centroids fitted on the current question catalog"""
+    global _catalog_classifier
+    if _catalog_classifier is None:
+        _catalog_classifier = _CatalogClassifier(centroid_weight)
+    return _catalog_classifier.get()
@@ -0,0 +1,213 @@
+"""
+Set-based question curation for the local PostgreSQL database
+Computes duplicate -> canonical mappings for the whole catalog (or some categories) once and
+applies them with a handful of statements in one transaction: responses are moved with
+UPDATE ... FROM a temporary mapping table, duplicates are deleted in bulk and new questions are
+inserted in bulk. A dry run executes the same statements and rolls back
+"""
+import io
+import csv
+import time
+import logging
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from . import reflection_stats
+from .duplicate_guard import DuplicateGuard
+from .duplicate_index import DuplicateIndex
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Responses on a duplicate move to its canonical question unless the user already answered that
+# one; DISTINCT ON keeps a single response per (user, canonical) when several duplicates were
+# answered by the same user. What can't move is deleted afterwards, as the clean_* scripts did
+MOVE_RESPONSES_SQL = """
+    WITH movable AS (
+        SELECT DISTINCT ON (r.user_id, m.canonical_id) r.id, m.canonical_id
+        FROM responses r
+        JOIN question_merge m ON m.duplicate_id = r.question_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM responses r2
+            WHERE r2.user_id = r.user_id AND r2.question_id = m.canonical_id
+        )
+        ORDER BY r.user_id, m.canonical_id, r.id
+    )
+    UPDATE responses r
+    SET question_id = movable.canonical_id
+    FROM movable
+    WHERE r.id = movable.id
+    RETURNING r.user_id
+"""
+
+DELETE_RESPONSES_SQL = """
+    DELETE FROM responses r
+    USING question_merge m
+    WHERE r.question_id = m.duplicate_id
+    RETURNING r.user_id
+"""
+
+DELETE_QUESTIONS_SQL = """
+    DELETE FROM questions q
+    USING question_merge m
+    WHERE q.id = m.duplicate_id
+"""
+
+INSERT_NEW_QUESTIONS_SQL = """
+    INSERT INTO questions (id, question_text, category)
+    SELECT (SELECT COALESCE(MAX(id), 0) FROM questions) + n.ord, n.question_text, n.category
+    FROM question_curation_new n
+    ORDER BY n.ord
+    RETURNING id, question_text, category
+"""
+
+
+def _copy_rows(cur, table: str, columns: Tuple[str, ...], rows: Iterable[Tuple]):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def plan_merges(rows: List[Dict[str, Any]], near_duplicates: bool = False) -> List[Dict[str, Any]]:
+    """Groups of duplicate questions, each kept as its lowest id
+
+    Exact text matches by default (what the clean_* scripts merged); near_duplicates groups
+    the MinHash clusters instead, which include the exact matches.
+    """
+    if near_duplicates:
+        index = DuplicateIndex()
+        index.sync(rows)
+        groups = [[question['id'] for question in cluster['questions']] for cluster in index.clusters()]
+    else:
+        by_text: Dict[str, List[int]] = {}
+        for row in rows:
+            by_text.setdefault(row['question_text'], []).append(row['id'])
+        groups = [ids for ids in by_text.values() if len(ids) > 1]
+
+    by_id = {row['id']: row for row in rows}
+    merges = []
+    for ids in groups:
+        ids = sorted(ids)
+        canonical = by_id[ids[0]]
+        merges.append({
+            'canonical': {'id': canonical['id'], 'question_text': canonical['question_text'],
+                          'category': canonical.get('category')},
+            'duplicates': [{'id': i, 'question_text': by_id[i]['question_text'],
+                            'category': by_id[i].get('category')} for i in ids[1:]],
+        })
+    merges.sort(key=lambda merge: merge['canonical']['id'])
+    return merges
+
+
+def plan_new_questions(guard: DuplicateGuard,
+                       new_questions: Dict[str, List[str]]) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
+    """(category, text) pairs to insert and the rejected candidates, from one batch check"""
+    candidates = [(category, text) for category, texts in new_questions.items() for text in texts]
+    verdict = guard.check_batch(text for _, text in candidates)
+    remaining = list(verdict['accepted'])
+    inserts = []
+    for category, text in candidates:
+        # accepted keeps the candidates' order, so walk both lists together
+        if remaining and remaining[0] == text:
+            inserts.append((category, remaining.pop(0)))
+    return inserts, verdict['rejected']
+
+
+def curate(conn, categories: Optional[List[str]] = None, new_questions: Optional[Dict[str, List[str]]] = None,
+           near_duplicates: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """Merge duplicate questions (in the given categories, or all) and add new ones in one
+    transaction; returns the diff and row counts. dry_run rolls everything back.
+
+    new_questions maps category -> candidate texts; candidates that near-duplicate an existing
+    question or an earlier candidate are skipped.
+    """
+    started = time.perf_counter()
+    reflection_stats.ensure_stats_table(conn)
+
+    try:
+        with conn.cursor() as cur:
+            # Writers wait until we're done, so the plan matches what gets applied
+            cur.execute("LOCK TABLE questions IN SHARE ROW EXCLUSIVE MODE")
+            cur.execute("SELECT id, question_text, category FROM questions ORDER BY id")
+            all_rows = cur.fetchall()
+            wanted = set(categories) if categories else None
+            rows = [row for row in all_rows if wanted is None or row['category'] in wanted]
+
+            merges = plan_merges(rows, near_duplicates)
+            mappings = [(duplicate['id'], merge['canonical']['id'])
+                        for merge in merges for duplicate in merge['duplicates']]
+            duplicate_ids = {duplicate_id for duplicate_id, _ in mappings}
+
+            inserts, rejected = [], []
+            if new_questions:
+                guard = DuplicateGuard.from_rows(row for row in all_rows if row['id'] not in duplicate_ids)
+                inserts, rejected = plan_new_questions(guard, new_questions)
+
+            responses_moved = responses_deleted = questions_deleted = 0
+            affected_users = set()
+            if mappings:
+                cur.execute("""
+                    CREATE TEMP TABLE question_merge (
+                        duplicate_id INTEGER PRIMARY KEY,
+                        canonical_id INTEGER NOT NULL
+                    ) ON COMMIT DROP
+                """)
+                _copy_rows(cur, 'question_merge', ('duplicate_id', 'canonical_id'), mappings)
+
+                cur.execute(MOVE_RESPONSES_SQL)
+                moved = cur.fetchall()
+                responses_moved = len(moved)
+                cur.execute(DELETE_RESPONSES_SQL)
+                deleted = cur.fetchall()
+                responses_deleted = len(deleted)
+                affected_users = {row['user_id'] for row in moved + deleted}
+
+                cur.execute(DELETE_QUESTIONS_SQL)
+                questions_deleted = cur.rowcount
+
+            added = []
+            if inserts:
+                cur.execute("""
+                    CREATE TEMP TABLE question_curation_new (
+                        ord INTEGER NOT NULL,
+                        question_text TEXT NOT NULL,
+                        category VARCHAR NOT NULL
+                    ) ON COMMIT DROP
+                """)
+                _copy_rows(cur, 'question_curation_new', ('ord', 'question_text', 'category'),
+                           ((position, text, category) for position, (category, text) in enumerate(inserts, 1)))
+                cur.execute(INSERT_NEW_QUESTIONS_SQL)
+                added = cur.fetchall()
+                # Keep a serial id sequence (if there is one) ahead of the ids we assigned
+                cur.execute("SELECT setval(pg_get_serial_sequence('questions', 'id'), (SELECT MAX(id) FROM questions))")
+
+            # Moved/deleted responses change counts and answered bitmaps
+            for user_id in affected_users:
+                reflection_stats.rebuild_user_stats(cur, user_id)
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {
+        'dry_run': dry_run,
+        'categories': sorted(wanted) if wanted else None,
+        'questions_scanned': len(rows),
+        'merges': merges,
+        'added': [dict(row) for row in added],
+        'rejected': rejected,
+        'counts': {
+            'duplicate_groups': len(merges),
+            'questions_deleted': questions_deleted,
+            'responses_moved': responses_moved,
+            'responses_deleted': responses_deleted,
+            'questions_added': len(added),
+            'questions_rejected': len(rejected),
+            'users_rebuilt': len(affected_users),
+        },
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,71 @@
+"""
+Per-user answered-question bitmaps and the "next questions" deck
+Bit n of an answered bitmap is set while the user has a non-draft reflection on question id n.
+ANDed with the catalog's per-category id masks it gives coverage and the unanswered pool
+without reading responses; no database imports, so both APIs use it
+"""
+from typing import Optional, Dict, Any, Iterable
+
+from .activity_calendar import decode_bitmap
+from .question_catalog import QuestionSnapshot
+from .question_sampler import get_question_sampler
+
+# Bits are numbered like the activity bitmap: bit n is bit n % 8 of byte n // 8, so
+# int.from_bytes(bitmap, 'little') has bit n set exactly when question n is answered.
+
+
+def set_answered(bitmap: bytearray, question_id: int, answered: bool = True):
+    """Mark a question answered/unanswered, growing the bitmap as needed"""
+    if question_id is None or question_id < 0:
+        return
+    byte, bit = divmod(question_id, 8)
+    if byte >= len(bitmap):
+        if not answered:
+            return
+        bitmap.extend(b'\x00' * (byte + 1 - len(bitmap)))
+    if answered:
+        bitmap[byte] |= 1 << bit
+    else:
+        bitmap[byte] &= ~(1 << bit) & 0xFF
+
+
+def bitmap_from_ids(question_ids: Iterable[int]) -> bytes:
+    """Answered bitmap with the given question ids set"""
+    bitmap = bytearray()
+    for question_id in question_ids:
+        set_answered(bitmap, question_id)
+    return bytes(bitmap)
+
+
+def answered_mask(bitmap) -> int:
+    """Answered bitmap (bytes, memoryview or PostgREST hex string) as an int bitmask"""
+    return int.from_bytes(decode_bitmap(bitmap), 'little')
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count('1')
+
+
+def category_coverage(snapshot: QuestionSnapshot, answered: int) -> Dict[str, Any]:
+    """Answered/total active questions overall and per category"""
+    categories = {
+        category: {'answered': _popcount(answered & mask), 'total': len(snapshot.by_category[category])}
+        for category, mask in sorted(snapshot.category_masks.items())
+    }
+    return {
+        'answered': _popcount(answered & snapshot.active_mask),
+        'total': len(snapshot.active),
+        'categories': categories,
+    }
+
+
+def next_questions(snapshot: QuestionSnapshot, answered: int, count: int = 5,
+                   category: Optional[str] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Random unanswered questions (from one category or all) plus the user's coverage"""
+    questions = get_question_sampler().sample(count, category, seed, snapshot, exclude=answered)
+    return {
+        'questions': questions,
+        'count': len(questions),
+        'category': category,
+        'coverage': category_coverage(snapshot, answered),
+    }
@@ -0,0 +1,110 @@
+"""
+Shared index of src/data/questions.json
+Parsed once and kept in memory; each access re-stats the file and only re-reads it when the
+mtime or size moved, and only re-parses it when the content hash actually changed
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+from .question_merkle import QuestionTree
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+QUESTIONS_JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'questions.json')
+
+
+def validate_questions(questions_data: Any) -> List[Dict[str, Any]]:
+    """Questions with an id, text and category (others are logged and skipped)"""
+    valid_questions = []
+    for q in questions_data if isinstance(questions_data, list) else []:
+        if isinstance(q, dict) and "id" in q and q.get("id") is not None:
+            # Ensure required fields exist
+            if "question" in q and "category" in q:
+                valid_questions.append(q)
+            else:
+                logger.warning(f"Question {q.get('id')} missing required fields")
+        else:
+            logger.warning(f"Question without valid ID: {q}")
+    return valid_questions
+
+
+class QuestionFileIndex:
+    """questions.json parsed into a validated list, an id map, an id -> category map and
+    per-category content hashes (QuestionTree)
+
+    Treat the returned structures as read-only: they are shared by every caller until the
+    file changes.
+    """
+
+    def __init__(self, path: str = QUESTIONS_JSON_PATH):
+        self.path = os.path.normpath(path)
+        self.questions: List[Dict[str, Any]] = []
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self.id_to_category: Dict[int, str] = {}
+        self.tree = QuestionTree([])
+        self.digest: Optional[str] = None
+
+        self._stat_key: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._stats = {'reloads': 0, 'rehashed_unchanged': 0}
+
+    def refresh(self) -> 'QuestionFileIndex':
+        """Re-read the file if it changed since the last access; returns self
+
+        A missing or unreadable file keeps the last good index (empty before the first load).
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            logger.warning(f"Questions JSON file not found: {self.path}")
+            return self
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if stat_key == self._stat_key:
+            return self
+
+        with self._lock:
+            if stat_key == self._stat_key:
+                return self
+            try:
+                with open(self.path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).hexdigest()
+                if digest == self.digest:
+                    # Touched or rewritten with the same content
+                    self._stat_key = stat_key
+                    self._stats['rehashed_unchanged'] += 1
+                    return self
+
+                questions = validate_questions(json.loads(content.decode('utf-8')))
+            except Exception as e:
+                logger.error(f"Error loading questions from JSON: {e}")
+                return self
+
+            self.questions = questions
+            self.by_id = {q['id']: q for q in questions}
+            self.id_to_category = {q['id']: q['category'] for q in questions}
+            self.tree = QuestionTree.from_json(questions)
+            self.digest = digest
+            self._stat_key = stat_key
+            self._stats['reloads'] += 1
+        logger.info(f"Loaded {len(questions)} valid questions from JSON")
+        return self
+
+    def metrics(self) -> Dict[str, Any]:
+        """Index size, digest and reload counters"""
+        return {'questions': len(self.questions), 'digest': self.digest, **self._stats}
+
+# Create singleton instance
+_question_file_index = None
+
+def get_question_file_index() -> QuestionFileIndex:
+    """Get the singleton questions.json index, refreshed if the file changed"""
+    global _question_file_index
+    if _question_file_index is None:
+        _question_file_index = QuestionFileIndex()
+    return _question_file_index.refresh()
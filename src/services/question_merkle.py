@@ -0,0 +1,95 @@
+"""
+Per-category content hashes for comparing two copies of the questions (questions.json vs. the
+questions table)
+A small Merkle tree: one sha256 leaf per (id, text, category), one node per category over its
+leaves in id order, and a root over the categories. Two copies agree exactly when their roots
+do; otherwise only categories whose hashes differ need a row-level diff
+"""
+import hashlib
+from typing import Iterable, Tuple, Dict, Any, List, Optional
+
+# (id, text, category)
+QuestionLeaf = Tuple[int, str, str]
+
+
+def leaf_hash(question_id: int, text: str, category: str) -> bytes:
+    return hashlib.sha256(f"{question_id}\x1f{text or ''}\x1f{category or ''}".encode('utf-8')).digest()
+
+
+class QuestionTree:
+    """Category hashes for one copy of the questions"""
+
+    def __init__(self, leaves: Iterable[QuestionLeaf]):
+        by_category: Dict[str, List[Tuple[int, bytes]]] = {}
+        for question_id, text, category in leaves:
+            by_category.setdefault(category or '', []).append((question_id, leaf_hash(question_id, text, category)))
+
+        self.categories: Dict[str, Dict[str, Any]] = {}
+        for category, hashed in sorted(by_category.items()):
+            hashed.sort()
+            node = hashlib.sha256(b''.join(digest for _, digest in hashed)).hexdigest()
+            self.categories[category] = {'hash': node, 'count': len(hashed)}
+
+        self.root = hashlib.sha256("".join(
+            f"{category}\x1f{node['hash']}\n" for category, node in self.categories.items()
+        ).encode('utf-8')).hexdigest()
+        self.count = sum(node['count'] for node in self.categories.values())
+
+    @classmethod
+    def from_json(cls, questions: Iterable[Dict[str, Any]]) -> 'QuestionTree':
+        """Tree over questions.json entries ({'id', 'question', 'category'})"""
+        return cls((q['id'], q['question'], q.get('category')) for q in questions)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> 'QuestionTree':
+        """Tree over questions table rows ({'id', 'question_text', 'category'})"""
+        return cls((r['id'], r['question_text'], r.get('category')) for r in rows)
+
+    def mismatched_categories(self, other: 'QuestionTree') -> List[str]:
+        """Categories whose hash differs (or that exist on one side only); O(categories)"""
+        if self.root == other.root:
+            return []
+        categories = set(self.categories) | set(other.categories)
+        return sorted(c for c in categories
+                      if self.categories.get(c, {}).get('hash') != other.categories.get(c, {}).get('hash'))
+
+
+def diff_leaves(source: Iterable[QuestionLeaf], target: Iterable[QuestionLeaf]) -> Dict[str, List]:
+    """Row-level diff of two (id, text, category) collections - call it with the rows of the
+    mismatched categories only
+
+    missing: ids only in source; extra: ids only in target; changed: ids in both whose text or
+    category differ (as {'id', 'source_category', 'target_category', 'text_changed'}).
+    """
+    source_by_id = {leaf[0]: leaf for leaf in source}
+    target_by_id = {leaf[0]: leaf for leaf in target}
+    changed = []
+    for question_id in sorted(source_by_id.keys() & target_by_id.keys()):
+        _, source_text, source_category = source_by_id[question_id]
+        _, target_text, target_category = target_by_id[question_id]
+        if source_text != target_text or source_category != target_category:
+            changed.append({
+                'id': question_id,
+                'source_category': source_category,
+                'target_category': target_category,
+                'text_changed': source_text != target_text,
+            })
+    return {
+        'missing': sorted(source_by_id.keys() - target_by_id.keys()),
+        'extra': sorted(target_by_id.keys() - source_by_id.keys()),
+        'changed': changed,
+    }
+
+
+def json_leaves(questions: Iterable[Dict[str, Any]], categories: Optional[Iterable[str]] = None) -> List[QuestionLeaf]:
+    """(id, text, category) for questions.json entries, optionally only from some categories"""
+    wanted = set(categories) if categories is not None else None
+    return [(q['id'], q['question'], q.get('category')) for q in questions
+            if wanted is None or (q.get('category') or '') in wanted]
+
+
+def row_leaves(rows: Iterable[Dict[str, Any]], categories: Optional[Iterable[str]] = None) -> List[QuestionLeaf]:
+    """(id, text, category) for questions table rows, optionally only from some categories"""
+    wanted = set(categories) if categories is not None else None
+    return [(r['id'], r['question_text'], r.get('category')) for r in rows
+            if wanted is None or (r.get('category') or '') in wanted]
@@ -0,0 +1,77 @@
+"""
+Uniform random question draws over the in-memory question catalog
+Replaces ORDER BY RANDOM() (a sort of every active question per request) and the Supabase
+"sample from the count*3 lowest ids" shortcut with a sparse Fisher-Yates draw: constant time
+per question, no copy of the pool, and reproducible when a seed is given
+"""
+import random
+import threading
+from typing import Optional, List, Dict, Any, Sequence, Iterator
+
+from .question_catalog import QuestionSnapshot, get_question_catalog
+
+
+def shuffled_indices(n: int, rng: random.Random) -> Iterator[int]:
+    """range(n) in uniformly random order, produced lazily in O(1) time per index
+
+    A Fisher-Yates shuffle run one step at a time, with the swaps kept in a dict instead of
+    a shuffled copy of the pool, so taking k indices costs O(k).
+    """
+    swapped: Dict[int, int] = {}
+    for i in range(n):
+        j = rng.randrange(i, n)
+        yield swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+
+
+def draw(pool: Sequence[Dict[str, Any]], count: int, rng: random.Random,
+         exclude: int = 0) -> List[Dict[str, Any]]:
+    """Up to `count` distinct questions from pool, in random order
+
+    Questions whose id bit is set in `exclude` are skipped; the rest are still equally likely,
+    since they are taken in the order of a uniform shuffle.
+    """
+    picks = []
+    if count <= 0:
+        return picks
+    for i in shuffled_indices(len(pool), rng):
+        question = pool[i]
+        if exclude >> question['id'] & 1:
+            continue
+        picks.append(dict(question))
+        if len(picks) == count:
+            break
+    return picks
+
+
+class QuestionSampler:
+    """Random questions from the current catalog snapshot
+
+    Unseeded draws share one generator (seed it in the constructor for reproducible runs);
+    a per-call seed gives the same questions for the same seed and catalog version.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, count: int, category: Optional[str] = None, seed: Optional[int] = None,
+               snapshot: Optional[QuestionSnapshot] = None, exclude: int = 0) -> List[Dict[str, Any]]:
+        """Up to `count` active questions, from one category or the whole catalog,
+        skipping question ids set in the `exclude` bitmask"""
+        snapshot = snapshot or get_question_catalog().snapshot
+        pool = snapshot.by_category.get(category, ()) if category else snapshot.active
+        if seed is not None:
+            return draw(pool, count, random.Random(seed), exclude)
+        with self._lock:
+            return draw(pool, count, self._rng, exclude)
+
+# Create singleton instance
+_question_sampler = None
+
+def get_question_sampler() -> QuestionSampler:
+    """Get singleton question sampler"""
+    global _question_sampler
+    if _question_sampler is None:
+        _question_sampler = QuestionSampler()
+    return _question_sampler
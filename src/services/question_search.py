@@ -0,0 +1,155 @@
+"""
+In-memory full-text search over the question catalog
+An inverted index (word -> postings) is built once per catalog snapshot, so admin question
+search is one ranked lookup instead of a LIKE '%term%' scan run twice (count, then page).
+Every query word must match a question word, the last one as a prefix so search-as-you-type
+works; hits are ranked with BM25 and a numeric query also matches the question id
+"""
+import re
+import math
+import heapq
+import bisect
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+from .question_catalog import QuestionSnapshot, get_question_catalog
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multiplier for words that only match the query word as a prefix
+PREFIX_WEIGHT = 0.8
+
+# Shorter last words only match whole words (a one-letter prefix matches most of the catalog)
+MIN_PREFIX = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric words ("what's" -> what, s)"""
+    return _WORD_RE.findall((text or '').lower())
+
+
+class QuestionSearchIndex:
+    """Immutable inverted index over one catalog snapshot's questions (active or not)"""
+
+    def __init__(self, questions: Tuple[Dict[str, Any], ...]):
+        self.questions = questions
+        self.positions = {question['id']: position for position, question in enumerate(questions)}
+        # word -> {question position: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: List[int] = []
+        for position, question in enumerate(questions):
+            words = tokenize(question.get('question_text'))
+            self.lengths.append(len(words))
+            for word in words:
+                postings = self.postings.setdefault(word, {})
+                postings[position] = postings.get(position, 0) + 1
+        self.vocabulary = sorted(self.postings)
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def _expand(self, word: str, prefix: bool) -> List[Tuple[str, float]]:
+        """(indexed word, weight) pairs a query word matches"""
+        expansions = [(word, 1.0)] if word in self.postings else []
+        if prefix and len(word) >= MIN_PREFIX:
+            start = bisect.bisect_left(self.vocabulary, word)
+            for candidate in self.vocabulary[start:]:
+                if not candidate.startswith(word):
+                    break
+                if candidate != word:
+                    expansions.append((candidate, PREFIX_WEIGHT))
+        return expansions
+
+    def _term_scores(self, word: str, prefix: bool) -> Dict[int, float]:
+        """question position -> BM25 score for one query word (best of its expansions)"""
+        total = len(self.questions)
+        expansions = self._expand(word, prefix)
+        # Prefix matches share the rarity of the prefix, so "fam" doesn't favour "famine" over "family"
+        matched = len(set().union(*(self.postings[candidate] for candidate, _ in expansions))) if expansions else 0
+        scores: Dict[int, float] = {}
+        for candidate, weight in expansions:
+            postings = self.postings[candidate]
+            frequency_of = len(postings) if candidate == word else matched
+            idf = math.log(1 + (total - frequency_of + 0.5) / (frequency_of + 0.5))
+            for position, frequency in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / (self.average_length or 1))
+                score = weight * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+        return scores
+
+    def search(self, query: str, category: Optional[str] = None, active_only: bool = False,
+               limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """{'total': hits, 'results': [{'question', 'score'}]} for one page, best first
+        (ties in id order)"""
+        words = tokenize(query)
+        scores: Optional[Dict[int, float]] = None
+        for i, word in enumerate(words):
+            term_scores = self._term_scores(word, prefix=(i == len(words) - 1))
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {position: score + term_scores[position]
+                          for position, score in scores.items() if position in term_scores}
+            if not scores:
+                break
+        scores = scores or {}
+
+        # A numeric query is also a question id lookup, ranked above the text hits
+        stripped = (query or '').strip()
+        if stripped.isdigit() and int(stripped) in self.positions:
+            top = max(scores.values(), default=0.0)
+            scores[self.positions[int(stripped)]] = top + 1.0
+
+        def wanted(position: int) -> bool:
+            question = self.questions[position]
+            if category and question.get('category') != category:
+                return False
+            return not active_only or question.get('is_active', True) is not False
+
+        hits = [(score, position) for position, score in scores.items() if wanted(position)]
+        page = heapq.nsmallest(offset + limit, hits, key=lambda hit: (-hit[0], hit[1]))[offset:]
+        return {
+            'total': len(hits),
+            'results': [{'question': dict(self.questions[position]), 'score': round(score, 3)}
+                        for score, position in page],
+        }
+
+
+class _CatalogSearch:
+    """Rebuilds the index whenever the question catalog loads a new snapshot"""
+
+    def __init__(self):
+        self.index = QuestionSearchIndex(())
+        self._snapshot: Optional[QuestionSnapshot] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> QuestionSearchIndex:
+        snapshot = get_question_catalog().snapshot
+        if snapshot is not self._snapshot:
+            with self._lock:
+                if snapshot is not self._snapshot:
+                    self.index = QuestionSearchIndex(snapshot.questions)
+                    self._snapshot = snapshot
+                    logger.info(f"🔎 Question search index built: {len(self.index)} questions, "
+                                f"{len(self.index.vocabulary)} words")
+        return self.index
+
+# Create singleton instance
+_catalog_search = None
+
+def get_question_search_index() -> QuestionSearchIndex:
+    """Get the search index for the current question catalog"""
+    global _catalog_search
+    if _catalog_search is None:
+        _catalog_search = _CatalogSearch()
+    return _catalog_search.get()
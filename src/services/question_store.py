@@ -0,0 +1,153 @@
+"""
+Question loading and syncing for the local PostgreSQL database
+Fills the in-memory question catalog, answers its periodic version check and merges
+questions.json into the questions table
+"""
+import io
+import csv
+import logging
+from typing import List, Dict, Any
+
+from .question_catalog import get_question_catalog
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# One digest over every catalog column; any insert, update or delete changes it
+CATALOG_VERSION_SQL = """
+    SELECT md5(COALESCE(string_agg(
+        concat_ws('|', id, question_text, category, subcategory, difficulty_level, question_type, is_active),
+        E'\\n' ORDER BY id
+    ), '')) AS version
+    FROM questions
+"""
+
+
+def catalog_version(cur) -> str:
+    """Current fingerprint of the questions table"""
+    cur.execute(CATALOG_VERSION_SQL)
+    return cur.fetchone()['version']
+
+
+def refresh_catalog(conn, force: bool = False) -> bool:
+    """Reload the question catalog if the table changed (always when forced); True if reloaded"""
+    catalog = get_question_catalog()
+    with conn.cursor() as cur:
+        version = catalog_version(cur)
+        if not force and catalog.is_current(version):
+            conn.commit()
+            return False
+
+        cur.execute("""
+            SELECT id, question_text, category, subcategory, difficulty_level, question_type, is_active
+            FROM questions
+            ORDER BY id
+        """)
+        rows = cur.fetchall()
+    conn.commit()
+
+    catalog.load(rows, version)
+    return True
+
+
+def load_category_rows(cur, categories: List[str]) -> List[Dict[str, Any]]:
+    """Every question (active or not) in the given categories, straight from the table"""
+    cur.execute("""
+        SELECT id, question_text, category
+        FROM questions
+        WHERE COALESCE(category, '') = ANY(%s)
+        ORDER BY id
+    """, (list(categories),))
+    return cur.fetchall()
+
+
+# questions.json -> questions sync
+
+CREATE_SYNC_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS question_sync_state (
+        source TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        questions INTEGER NOT NULL,
+        added INTEGER NOT NULL,
+        synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+"""
+
+JSON_SYNC_SOURCE = 'questions.json'
+
+# New ids are merged in file order; a text already in the table (or earlier in the file) is
+# skipped, as the old row-by-row sync did. Counts come from the pre-insert snapshot.
+MERGE_STAGED_QUESTIONS_SQL = """
+    WITH new_ids AS (
+        SELECT s.ord, s.id, s.question_text, s.category
+        FROM question_sync_staging s
+        WHERE NOT EXISTS (SELECT 1 FROM questions q WHERE q.id = s.id)
+    ), candidates AS (
+        SELECT DISTINCT ON (question_text) ord, id, question_text, category
+        FROM new_ids
+        ORDER BY question_text, ord
+    ), inserted AS (
+        INSERT INTO questions (id, question_text, category, is_active, created_at)
+        SELECT c.id, c.question_text, c.category, true, NOW()
+        FROM candidates c
+        WHERE NOT EXISTS (SELECT 1 FROM questions q WHERE q.question_text = c.question_text)
+        ORDER BY c.ord
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id
+    )
+    SELECT (SELECT COUNT(*) FROM new_ids) AS new_ids,
+           (SELECT COUNT(*) FROM inserted) AS added
+"""
+
+
+def sync_from_json(conn, questions: List[Dict[str, Any]], digest: str, force: bool = False) -> Dict[str, Any]:
+    """Merge questions.json rows into the questions table in one transaction
+
+    The rows are COPYed into a temporary staging table and merged with a single set-based
+    INSERT. The file's digest is recorded, so the next call with an unchanged file returns
+    straight away unless forced.
+    """
+    with conn.cursor() as cur:
+        cur.execute(CREATE_SYNC_STATE_SQL)
+        cur.execute("SELECT digest FROM question_sync_state WHERE source = %s", (JSON_SYNC_SOURCE,))
+        state = cur.fetchone()
+        if not force and state and state['digest'] == digest:
+            conn.commit()
+            return {'skipped': True, 'questions': len(questions), 'added': 0, 'duplicates': 0}
+
+        cur.execute("""
+            CREATE TEMP TABLE question_sync_staging (
+                ord INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                question_text TEXT NOT NULL,
+                category VARCHAR NOT NULL
+            ) ON COMMIT DROP
+        """)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for position, question in enumerate(questions):
+            writer.writerow((position, question['id'], question['question'], question.get('category') or 'general'))
+        buffer.seek(0)
+        cur.copy_expert("COPY question_sync_staging (ord, id, question_text, category) FROM STDIN WITH (FORMAT csv)",
+                        buffer)
+
+        cur.execute(MERGE_STAGED_QUESTIONS_SQL)
+        counts = cur.fetchone()
+
+        cur.execute("""
+            INSERT INTO question_sync_state (source, digest, questions, added, synced_at)
+            VALUES (%s, %s, %s, %s, NOW())
+            ON CONFLICT (source) DO UPDATE SET
+                digest = EXCLUDED.digest,
+                questions = EXCLUDED.questions,
+                added = EXCLUDED.added,
+                synced_at = NOW()
+        """, (JSON_SYNC_SOURCE, digest, len(questions), counts['added']))
+    conn.commit()
+
+    return {
+        'skipped': False,
+        'questions': len(questions),
+        'added': counts['added'],
+        'duplicates': counts['new_ids'] - counts['added'],
+    }
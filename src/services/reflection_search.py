@@ -0,0 +1,160 @@
+"""
+Ranked full-text search over reflections (local PostgreSQL)
+reflection_search keeps one tsvector per response, written by a trigger on responses, so the
+index follows every insert, edit and delete (ON DELETE CASCADE) without rebuilds. Searches
+rank with ts_rank_cd, highlight a snippet with ts_headline for the returned page only and
+continue with a (rank, id) keyset cursor. Supabase runs the same query as the
+search_reflections function in reflection_search.sql
+"""
+import html
+import logging
+from typing import Optional, List, Dict, Any
+
+from .cursors import InvalidCursor, decode_cursor, split_page
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+REFLECTION_SEARCH_RPC = 'search_reflections'
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+# Sort key carried by search cursors
+CURSOR_FIELDS = ('rank', 'id')
+
+# ts_headline options: up to two fragments of the response, matches between control characters
+# that are swapped for <mark> once the rest of the snippet is HTML-escaped
+HIGHLIGHT_START, HIGHLIGHT_STOP = '\x02', '\x03'
+HEADLINE_OPTIONS = (f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, '
+                    'MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" … "')
+
+# Response text weighs more than the question it answers
+CREATE_SEARCH_INDEX_SQL = """
+    CREATE TABLE IF NOT EXISTS reflection_search (
+        reflection_id INTEGER PRIMARY KEY REFERENCES responses(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL,
+        document TSVECTOR NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_reflection_search_document ON reflection_search USING GIN (document);
+    CREATE INDEX IF NOT EXISTS idx_reflection_search_user ON reflection_search(user_id);
+
+    CREATE OR REPLACE FUNCTION index_reflection_search() RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        INSERT INTO reflection_search (reflection_id, user_id, document)
+        VALUES (
+            NEW.id,
+            NEW.user_id,
+            setweight(to_tsvector('english', COALESCE(NEW.response_text, '')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(NEW.question_text_snapshot, '')), 'B')
+        )
+        ON CONFLICT (reflection_id) DO UPDATE SET
+            user_id = EXCLUDED.user_id,
+            document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$;
+
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'reflection_search_index') THEN
+            CREATE TRIGGER reflection_search_index
+                AFTER INSERT OR UPDATE OF response_text, question_text_snapshot, user_id ON responses
+                FOR EACH ROW EXECUTE PROCEDURE index_reflection_search();
+        END IF;
+    END
+    $$;
+
+    -- Responses written before the trigger existed
+    INSERT INTO reflection_search (reflection_id, user_id, document)
+    SELECT r.id, r.user_id,
+           setweight(to_tsvector('english', COALESCE(r.response_text, '')), 'A') ||
+           setweight(to_tsvector('english', COALESCE(r.question_text_snapshot, '')), 'B')
+    FROM responses r
+    WHERE NOT EXISTS (SELECT 1 FROM reflection_search s WHERE s.reflection_id = r.id);
+"""
+
+
+def ensure_search_index(conn):
+    """Create reflection_search and its trigger if they do not exist, indexing older responses"""
+    with conn.cursor() as cur:
+        cur.execute(CREATE_SEARCH_INDEX_SQL)
+    conn.commit()
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_SEARCH_PAGE_SIZE))
+
+
+def decode_search_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    after = decode_cursor(cursor, CURSOR_FIELDS)
+    if after and not (isinstance(after['rank'], (int, float)) and isinstance(after['id'], int)):
+        raise InvalidCursor("Malformed cursor")
+    return after
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-safe snippet with the matches in <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+
+def search_page(rows: List[Dict[str, Any]], limit: int, first_page: bool) -> Dict[str, Any]:
+    """{'results', 'total', 'next_cursor'} from search rows fetched with limit + 1
+    (each row carries rank and the total match count)"""
+    rows = [dict(row) for row in rows]
+    total = rows[0]['total'] if rows else (0 if first_page else None)
+    for row in rows:
+        row.pop('total', None)
+        row['snippet'] = highlight(row.get('snippet'))
+    results, next_cursor = split_page(rows, limit, lambda row: {'rank': row['rank'], 'id': row['id']})
+    return {'results': results, 'total': total, 'next_cursor': next_cursor}
+
+
+def search_reflections(conn, query: str, user_id: Optional[int] = None, limit: int = SEARCH_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Dict[str, Any]:
+    """One page of responses matching a web-style query (words, "phrases", -exclusions, or),
+    best first; one user's responses or everyone's. Raises InvalidCursor for a bad cursor"""
+    after = decode_search_cursor(cursor)
+    limit = clamp_limit(limit)
+
+    conditions = ["s.document @@ query.q"]
+    params: Dict[str, Any] = {'query': query, 'limit': limit + 1, 'headline': HEADLINE_OPTIONS}
+    if user_id is not None:
+        conditions.append("s.user_id = %(user_id)s")
+        params['user_id'] = user_id
+    page_condition = ""
+    if after:
+        # rank is REAL; the cursor holds its exact value, so comparing as REAL is stable
+        page_condition = "WHERE (rank, reflection_id) < (%(after_rank)s::REAL, %(after_id)s)"
+        params.update(after_rank=after['rank'], after_id=after['id'])
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            WITH query AS (SELECT websearch_to_tsquery('english', %(query)s) AS q),
+            matches AS (
+                SELECT s.reflection_id, ts_rank_cd(s.document, query.q) AS rank, COUNT(*) OVER () AS total
+                FROM reflection_search s, query
+                WHERE {' AND '.join(conditions)}
+            ),
+            page AS (
+                SELECT * FROM matches
+                {page_condition}
+                ORDER BY rank DESC, reflection_id DESC
+                LIMIT %(limit)s
+            )
+            SELECT r.id, r.user_id, r.question_id, r.response_text, r.word_count, r.is_draft,
+                   r.created_at, r.updated_at, r.question_text_snapshot, r.category_snapshot,
+                   u.email AS user_email, page.rank, page.total,
+                   ts_headline('english', r.response_text, query.q, %(headline)s) AS snippet
+            FROM page
+            JOIN responses r ON r.id = page.reflection_id
+            LEFT JOIN users u ON u.id = r.user_id
+            CROSS JOIN query
+            ORDER BY page.rank DESC, page.reflection_id DESC
+        """, params)
+        rows = cur.fetchall()
+    return search_page(rows, limit, first_page=after is None)
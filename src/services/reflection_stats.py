@@ -0,0 +1,287 @@
+"""
+Per-user reflection stats maintained on every reflection write
+One row per user in user_reflection_stats: totals, per-category counts, latest timestamp,
+a daily-activity bitmap and an answered-questions bitmap, so stats reads never scan a
+user's history
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+
+from psycopg2 import Binary
+from psycopg2.extras import Json
+
+from .activity_calendar import as_date, set_activity
+from .question_deck import set_answered
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Snapshot written when a reflection's question is missing; not counted as a category
+UNKNOWN_CATEGORY = 'unknown'
+
+CREATE_STATS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS user_reflection_stats (
+        user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        total_reflections INTEGER NOT NULL DEFAULT 0,
+        total_words BIGINT NOT NULL DEFAULT 0,
+        category_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+        latest_reflection TIMESTAMP,
+        activity_bitmap BYTEA NOT NULL DEFAULT ''::bytea,
+        answered_bitmap BYTEA,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    -- Rows written before answered_bitmap existed keep NULL until their next rebuild
+    ALTER TABLE user_reflection_stats ADD COLUMN IF NOT EXISTS answered_bitmap BYTEA;
+"""
+
+
+# Stats row access (every function takes a cursor and leaves the commit to the caller,
+# so stats change in the same transaction as the reflection write)
+
+def ensure_stats_table(conn):
+    """Create user_reflection_stats if it does not exist"""
+    with conn.cursor() as cur:
+        cur.execute(CREATE_STATS_TABLE_SQL)
+    conn.commit()
+
+
+def _category_key(category: Optional[str]) -> Optional[str]:
+    return None if not category or category == UNKNOWN_CATEGORY else category
+
+
+def _lock_stats(cur, user_id: int) -> Optional[Dict[str, Any]]:
+    # Claim the row before anything else, so concurrent first writes for a user queue behind
+    # this transaction instead of each rebuilding and applying their delta twice
+    cur.execute("""
+        INSERT INTO user_reflection_stats (user_id) VALUES (%s)
+        ON CONFLICT (user_id) DO NOTHING
+        RETURNING user_id
+    """, (user_id,))
+    if cur.fetchone():
+        # Empty row just created (and locked) by this transaction: the caller rebuilds into it
+        return None
+
+    cur.execute("""
+        SELECT total_reflections, total_words, category_counts, latest_reflection, activity_bitmap, answered_bitmap
+        FROM user_reflection_stats
+        WHERE user_id = %s
+        FOR UPDATE
+    """, (user_id,))
+    row = cur.fetchone()
+    if row['answered_bitmap'] is None:
+        # A row from before answered_bitmap: the caller rebuilds instead (still under the lock)
+        return None
+    stats = dict(row)
+    stats['category_counts'] = dict(stats['category_counts'] or {})
+    stats['activity_bitmap'] = bytearray(stats['activity_bitmap'] or b'')
+    stats['answered_bitmap'] = bytearray(stats['answered_bitmap'])
+    return stats
+
+
+def _save_stats(cur, user_id: int, stats: Dict[str, Any]):
+    cur.execute("""
+        INSERT INTO user_reflection_stats (user_id, total_reflections, total_words, category_counts,
+                                           latest_reflection, activity_bitmap, answered_bitmap, version, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, 1, NOW())
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_reflections = EXCLUDED.total_reflections,
+            total_words = EXCLUDED.total_words,
+            category_counts = EXCLUDED.category_counts,
+            latest_reflection = EXCLUDED.latest_reflection,
+            activity_bitmap = EXCLUDED.activity_bitmap,
+            answered_bitmap = EXCLUDED.answered_bitmap,
+            version = user_reflection_stats.version + 1,
+            updated_at = NOW()
+        RETURNING version
+    """, (
+        user_id,
+        stats['total_reflections'],
+        stats['total_words'],
+        Json(stats['category_counts']),
+        stats['latest_reflection'],
+        Binary(bytes(stats['activity_bitmap'])),
+        Binary(bytes(stats['answered_bitmap']))
+    ))
+    stats['version'] = cur.fetchone()['version']
+
+
+def rebuild_user_stats(cur, user_id: int) -> Dict[str, Any]:
+    """Recompute one user's row from their non-draft responses"""
+    cur.execute("""
+        SELECT NULLIF(COALESCE(r.category_snapshot, q.category), %s) as category,
+               COUNT(*) as reflections,
+               COALESCE(SUM(r.word_count), 0) as words,
+               MAX(r.created_at) as latest
+        FROM responses r
+        LEFT JOIN questions q ON r.question_id = q.id
+        WHERE r.user_id = %s AND r.is_draft = false
+        GROUP BY 1
+    """, (UNKNOWN_CATEGORY, user_id))
+    groups = cur.fetchall()
+
+    cur.execute("""
+        SELECT DISTINCT DATE(created_at) as day
+        FROM responses
+        WHERE user_id = %s AND is_draft = false
+    """, (user_id,))
+    bitmap = bytearray()
+    for row in cur.fetchall():
+        set_activity(bitmap, row['day'])
+
+    cur.execute("""
+        SELECT DISTINCT question_id
+        FROM responses
+        WHERE user_id = %s AND is_draft = false
+    """, (user_id,))
+    answered = bytearray()
+    for row in cur.fetchall():
+        set_answered(answered, row['question_id'])
+
+    latest = [g['latest'] for g in groups if g['latest'] is not None]
+    stats = {
+        'total_reflections': sum(g['reflections'] for g in groups),
+        'total_words': sum(g['words'] for g in groups),
+        'category_counts': {g['category']: g['reflections'] for g in groups if g['category']},
+        'latest_reflection': max(latest) if latest else None,
+        'activity_bitmap': bitmap,
+        'answered_bitmap': answered,
+    }
+    _save_stats(cur, user_id, stats)
+    return stats
+
+
+def rebuild_all_stats(conn) -> int:
+    """Recompute every user's row, one transaction per user; returns the number of users"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM users ORDER BY id")
+        user_ids = [row['id'] for row in cur.fetchall()]
+
+    for user_id in user_ids:
+        with conn.cursor() as cur:
+            rebuild_user_stats(cur, user_id)
+        conn.commit()
+    return len(user_ids)
+
+
+def record_insert(cur, user_id: int, category: Optional[str], word_count: int, created_at: datetime,
+                  question_id: Optional[int] = None):
+    """Account for a new non-draft reflection (call after the INSERT)"""
+    stats = _lock_stats(cur, user_id)
+    if stats is None:
+        # First write since the table appeared: the row must include the user's history
+        rebuild_user_stats(cur, user_id)
+        return
+
+    stats['total_reflections'] += 1
+    stats['total_words'] += word_count or 0
+    key = _category_key(category)
+    if key:
+        stats['category_counts'][key] = stats['category_counts'].get(key, 0) + 1
+    if stats['latest_reflection'] is None or created_at > stats['latest_reflection']:
+        stats['latest_reflection'] = created_at
+    set_activity(stats['activity_bitmap'], created_at)
+    set_answered(stats['answered_bitmap'], question_id)
+    _save_stats(cur, user_id, stats)
+
+
+def record_edit(cur, user_id: int, old_word_count: int, new_word_count: int):
+    """Account for an edited non-draft reflection (call after the UPDATE)
+
+    Always saves, even when the word count is unchanged: the version bump is what tells
+    cached insights that the text changed.
+    """
+    stats = _lock_stats(cur, user_id)
+    if stats is None:
+        rebuild_user_stats(cur, user_id)
+        return
+
+    stats['total_words'] += (new_word_count or 0) - (old_word_count or 0)
+    _save_stats(cur, user_id, stats)
+
+
+def record_delete(cur, user_id: int, category: Optional[str], word_count: int, created_at: datetime,
+                  question_id: Optional[int] = None):
+    """Account for a removed non-draft reflection (call after the DELETE)"""
+    stats = _lock_stats(cur, user_id)
+    if stats is None:
+        rebuild_user_stats(cur, user_id)
+        return
+
+    stats['total_reflections'] = max(stats['total_reflections'] - 1, 0)
+    stats['total_words'] = max(stats['total_words'] - (word_count or 0), 0)
+    key = _category_key(category)
+    if key and key in stats['category_counts']:
+        stats['category_counts'][key] -= 1
+        if stats['category_counts'][key] <= 0:
+            del stats['category_counts'][key]
+
+    # Only the day, the question and the latest timestamp can need a look at other rows;
+    # all are indexed lookups
+    day = as_date(created_at)
+    cur.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM responses
+            WHERE user_id = %s AND is_draft = false
+              AND created_at >= %s AND created_at < %s
+        ) as active
+    """, (user_id, day, day + timedelta(days=1)))
+    if not cur.fetchone()['active']:
+        set_activity(stats['activity_bitmap'], day, active=False)
+
+    if question_id is not None:
+        cur.execute("""
+            SELECT EXISTS (
+                SELECT 1 FROM responses
+                WHERE user_id = %s AND is_draft = false AND question_id = %s
+            ) as answered
+        """, (user_id, question_id))
+        if not cur.fetchone()['answered']:
+            set_answered(stats['answered_bitmap'], question_id, answered=False)
+
+    if stats['latest_reflection'] is not None and created_at >= stats['latest_reflection']:
+        cur.execute("""
+            SELECT MAX(created_at) as latest FROM responses
+            WHERE user_id = %s AND is_draft = false
+        """, (user_id,))
+        stats['latest_reflection'] = cur.fetchone()['latest']
+
+    _save_stats(cur, user_id, stats)
+
+
+def get_version(cur, user_id: int) -> int:
+    """A user's reflections version counter: bumped by every non-draft reflection write"""
+    cur.execute("SELECT version FROM user_reflection_stats WHERE user_id = %s", (user_id,))
+    row = cur.fetchone()
+    if row:
+        return row['version']
+    return rebuild_user_stats(cur, user_id)['version']
+
+
+def get_stats(cur, user_id: int) -> Dict[str, Any]:
+    """Read a user's stats row, building it on first access"""
+    cur.execute("""
+        SELECT total_reflections, total_words, category_counts, latest_reflection, activity_bitmap, version
+        FROM user_reflection_stats
+        WHERE user_id = %s
+    """, (user_id,))
+    row = cur.fetchone()
+    if row:
+        stats = dict(row)
+        stats['category_counts'] = dict(stats['category_counts'] or {})
+        stats['activity_bitmap'] = bytes(stats['activity_bitmap'] or b'')
+        return stats
+
+    stats = rebuild_user_stats(cur, user_id)
+    stats['activity_bitmap'] = bytes(stats['activity_bitmap'])
+    return stats
+
+
+def get_answered(cur, user_id: int) -> bytes:
+    """A user's answered-questions bitmap (see question_deck), building it on first access"""
+    cur.execute("SELECT answered_bitmap FROM user_reflection_stats WHERE user_id = %s", (user_id,))
+    row = cur.fetchone()
+    if row and row['answered_bitmap'] is not None:
+        return bytes(row['answered_bitmap'])
+    return bytes(rebuild_user_stats(cur, user_id)['answered_bitmap'])
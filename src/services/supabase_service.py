@@ -8,11 +8,65 @@ from dotenv import load_dotenv
 from typing import Optional, List, Dict, Any
 import logging
 
+from .question_catalog import QUESTION_CATALOG_VERSION_RPC, CATALOG_PAGE_SIZE, get_question_catalog
+from .question_sampler import get_question_sampler
+
 load_dotenv()
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Server-side aggregate behind get_user_stats (see user_stats_function.sql)
+USER_STATS_RPC = 'get_user_reflection_stats'
+# PostgREST / Postgres error codes meaning the function isn't deployed
+MISSING_FUNCTION_CODES = ('PGRST202', '42883')
+
+def empty_user_stats() -> Dict[str, Any]:
+    """Stats for a user with no reflections (also returned on errors)"""
+    return {
+        'total_reflections': 0,
+        'total_words': 0,
+        'categories_covered': 0,
+        'weekly_reflections': 0,
+        'categories_list': []
+    }
+
+def normalize_user_stats(data: Any) -> Dict[str, Any]:
+    """Coerce the RPC's JSON result into the get_user_stats shape"""
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    stats = empty_user_stats()
+    for key in ('total_reflections', 'total_words', 'categories_covered', 'weekly_reflections'):
+        stats[key] = int(data.get(key) or 0)
+    stats['categories_list'] = sorted(data.get('categories_list') or [])
+    # Present when user_reflection_stats.sql is installed
+    for key in ('category_counts', 'latest_reflection'):
+        if key in data:
+            stats[key] = data[key]
+    return stats
+
+def summarize_user_stats(rows: List[Dict[str, Any]], total_reflections: int) -> Dict[str, Any]:
+    """Client-side stats from reflection rows (fallback when the RPC is missing)"""
+    from datetime import datetime, timedelta
+    # created_at comes back as ISO text, so a string comparison is enough
+    seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
+
+    category_counts = {}
+    for r in rows:
+        if r.get('questions') and r['questions'].get('category'):
+            category = r['questions']['category']
+            category_counts[category] = category_counts.get(category, 0) + 1
+
+    return {
+        'total_reflections': total_reflections,
+        'total_words': sum(r.get('word_count') or 0 for r in rows),
+        'categories_covered': len(category_counts),
+        'weekly_reflections': sum(1 for r in rows if (r.get('created_at') or '') >= seven_days_ago),
+        'categories_list': sorted(category_counts),
+        'category_counts': category_counts,
+        'latest_reflection': max((r['created_at'] for r in rows if r.get('created_at')), default=None)
+    }
+
 class SupabaseService:
     """Service class for Supabase database operations"""
 
@@ -27,6 +81,9 @@ class SupabaseService:
             )
 
         self.client: Client = create_client(self.supabase_url, self.supabase_service_key)
+        # Flipped off the first time the stats / catalog version RPCs turn out not to exist
+        self.stats_rpc_available = True
+        self.catalog_version_rpc_available = True
         logger.info("✅ Supabase service initialized")
 
     # User Management
@@ -161,16 +218,50 @@ class SupabaseService:
             return {}
 
     # Question Management
+    def refresh_question_catalog(self, force: bool = False) -> bool:
+        """Reload the in-memory question catalog if the questions table changed; True if reloaded"""
+        catalog = get_question_catalog()
+        version = self._question_catalog_version()
+        if not force and catalog.is_current(version):
+            return False
+
+        rows = []
+        while True:
+            result = self.client.table('questions')\
+                .select('*')\
+                .order('id')\
+                .range(len(rows), len(rows) + CATALOG_PAGE_SIZE - 1)\
+                .execute()
+            rows.extend(result.data)
+            if len(result.data) < CATALOG_PAGE_SIZE:
+                break
+
+        catalog.load(rows, version)
+        return True
+
+    def _question_catalog_version(self) -> Optional[str]:
+        """Fingerprint of the questions table, or None if question_catalog_version.sql isn't installed"""
+        if not self.catalog_version_rpc_available:
+            return None
+        try:
+            return self.client.rpc(QUESTION_CATALOG_VERSION_RPC, {}).execute().data
+        except Exception as e:
+            if getattr(e, 'code', None) in MISSING_FUNCTION_CODES:
+                logger.info(f"{QUESTION_CATALOG_VERSION_RPC} function not available, catalog checks will reload: {e}")
+                self.catalog_version_rpc_available = False
+                return None
+            raise
+
+    def _question_catalog(self):
+        catalog = get_question_catalog()
+        if not catalog.loaded:
+            self.refresh_question_catalog(force=True)
+        return catalog
+
     def get_questions(self, category: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
         """Get questions, optionally filtered by category"""
         try:
-            query = self.client.table('questions').select('*').eq('is_active', True)
-
-            if category:
-                query = query.eq('category', category)
-
-            result = query.order('id').limit(limit).execute()
-            return result.data
+            return self._question_catalog().get_questions(category, limit)
         except Exception as e:
             logger.error(f"Error getting questions: {e}")
             return []
@@ -179,29 +270,17 @@ class SupabaseService:
         """Get all unique question categories"""
         try:
             # For admin purposes, show ALL categories regardless of active status
-            result = self.client.table('questions')\
-                .select('category')\
-                .execute()
-
-            categories = list(set(row['category'] for row in result.data if row['category']))
-            return sorted(categories)
+            return self._question_catalog().get_categories()
         except Exception as e:
             logger.error(f"Error getting question categories: {e}")
             return []
 
-    def get_random_questions(self, count: int = 5, category: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get random questions for daily prompts"""
+    def get_random_questions(self, count: int = 5, category: Optional[str] = None,
+                              seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get random questions for daily prompts (uniform over the whole category; seed for a repeatable draw)"""
         try:
-            # Note: Supabase doesn't have RANDOM() function like PostgreSQL
-            # We'll get questions and randomize client-side for now
-            # In production, consider using a stored procedure or function
-            questions = self.get_questions(category, limit=count * 3)  # Get more to randomize
-
-            import random
-            if len(questions) <= count:
-                return questions
-
-            return random.sample(questions, count)
+            catalog = self._question_catalog()
+            return get_question_sampler().sample(count, category, seed, catalog.snapshot)
         except Exception as e:
             logger.error(f"Error getting random questions: {e}")
             return []
@@ -209,57 +288,31 @@ class SupabaseService:
     # User Statistics
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get comprehensive user statistics"""
-        try:
-            # Total reflections with count
-            reflections_result = self.client.table('reflections')\
-                .select('*', count='exact')\
-                .eq('user_id', user_id)\
-                .execute()
-
-            total_reflections = reflections_result.count or 0
+        if self.stats_rpc_available:
+            try:
+                result = self.client.rpc(USER_STATS_RPC, {'p_user_id': user_id}).execute()
+                if result.data:
+                    return normalize_user_stats(result.data)
+            except Exception as e:
+                if getattr(e, 'code', None) in MISSING_FUNCTION_CODES:
+                    logger.info(f"{USER_STATS_RPC} function not available, using fallback: {e}")
+                    self.stats_rpc_available = False
+                else:
+                    logger.warning(f"{USER_STATS_RPC} failed for {user_id}, using fallback: {e}")
 
-            # Get reflections for word count and categories
-            reflections_data = self.client.table('reflections')\
-                .select('word_count, questions(category)')\
-                .eq('user_id', user_id)\
-                .execute()
-
-            total_words = sum(r.get('word_count', 0) for r in reflections_data.data)
-
-            # Categories covered
-            categories = set()
-            for r in reflections_data.data:
-                if r.get('questions') and r['questions'].get('category'):
-                    categories.add(r['questions']['category'])
-
-            # Streak calculation (simplified - last 7 days)
-            from datetime import datetime, timedelta
-            seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-
-            recent_result = self.client.table('reflections')\
-                .select('created_at', count='exact')\
+        try:
+            # Fallback: one request for the rows, with the exact total in the same response
+            result = self.client.table('reflections')\
+                .select('word_count, created_at, questions(category)', count='exact')\
                 .eq('user_id', user_id)\
-                .gte('created_at', seven_days_ago)\
+                .eq('is_draft', False)\
+                .order('created_at', desc=True)\
                 .execute()
 
-            weekly_reflections = recent_result.count or 0
-
-            return {
-                'total_reflections': total_reflections,
-                'total_words': total_words,
-                'categories_covered': len(categories),
-                'weekly_reflections': weekly_reflections,
-                'categories_list': sorted(list(categories))
-            }
+            return summarize_user_stats(result.data, result.count or len(result.data))
         except Exception as e:
             logger.error(f"Error getting user stats for {user_id}: {e}")
-            return {
-                'total_reflections': 0,
-                'total_words': 0,
-                'categories_covered': 0,
-                'weekly_reflections': 0,
-                'categories_list': []
-            }
+            return empty_user_stats()
 
     # User Profile Management
     def get_user_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -6,25 +6,48 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import jwt
 import logging
-from datetime import datetime, timedelta
-from collections import Counter, defaultdict
+from datetime import datetime
 import re
-from dateutil import parser as date_parser
+import asyncio
 
 # Import Supabase service
 try:
-    from src.services.supabase_service import get_supabase_service
+    from src.services.async_supabase_service import get_async_supabase_service, close_async_supabase_service
+    from src.services.auth_cache import get_auth_user_cache
+    from src.services.question_catalog import get_question_catalog
+    from src.services.duplicate_index import get_duplicate_index
+    from src.services.duplicate_guard import get_duplicate_guard
+    from src.services.question_classifier import get_question_classifier
+    from src.services.question_search import get_question_search_index
+    from src.services.cursors import InvalidCursor
+    from src.services.pagination import REFLECTIONS_KEYSET, NEWEST_QUESTIONS_KEYSET
+    from src.services.activity_calendar import build_streak_calendar, compact_insights_calendar
+    from src.services.insights_cache import (
+        get_insights_cache, insights_etag, etag_matches, INSIGHTS_CACHE_CONTROL
+    )
 except ImportError:
     # Fallback for Railway deployment
     sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-    from services.supabase_service import get_supabase_service
+    from services.async_supabase_service import get_async_supabase_service, close_async_supabase_service
+    from services.auth_cache import get_auth_user_cache
+    from services.question_catalog import get_question_catalog
+    from services.duplicate_index import get_duplicate_index
+    from services.duplicate_guard import get_duplicate_guard
+    from services.question_classifier import get_question_classifier
+    from services.question_search import get_question_search_index
+    from services.cursors import InvalidCursor
+    from services.pagination import REFLECTIONS_KEYSET, NEWEST_QUESTIONS_KEYSET
+    from services.activity_calendar import build_streak_calendar, compact_insights_calendar
+    from services.insights_cache import (
+        get_insights_cache, insights_etag, etag_matches, INSIGHTS_CACHE_CONTROL
+    )
 
 # Keep Eleanor LLM integration from original API
 import torch
@@ -124,16 +147,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
         logger.info(f"JWT payload decoded successfully. Subject: {payload.get('sub')}, Email: {payload.get('email')}")
 
+        # Serve repeat requests for the same token from the in-process cache
+        auth_user_cache = get_auth_user_cache()
+        user = auth_user_cache.get(payload.get('sub'))
+        if user:
+            return user
+
         # Get user from database using auth ID
-        supabase = get_supabase_service()
-        user = supabase.get_user_by_auth_id(payload.get('sub'))
+        supabase = get_async_supabase_service()
+        user = await supabase.get_user_by_auth_id(payload.get('sub'))
 
         if not user:
             logger.warning(f"User not found in database for auth_id: {payload.get('sub')}")
             # Create user if not exists using email from JWT
             if payload.get('email'):
                 logger.info(f"Creating new user for email: {payload.get('email')}")
-                user = supabase.create_user(payload.get('email'), payload.get('sub'))
+                user = await supabase.create_user(payload.get('sub'), payload.get('email'))
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -141,6 +170,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 )
 
         logger.info(f"Authentication successful for user: {user.get('email')}")
+        auth_user_cache.set(payload.get('sub'), user, payload.get('exp'))
         return user
 
     except jwt.ExpiredSignatureError:
@@ -178,8 +208,8 @@ async def get_admin_user(current_user: dict = Depends(get_current_user)):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    supabase = get_supabase_service()
-    is_healthy = supabase.health_check()
+    supabase = get_async_supabase_service()
+    is_healthy = await supabase.health_check()
 
     return {
         "status": "healthy" if is_healthy else "unhealthy",
@@ -187,33 +217,66 @@ async def health_check():
         "supabase": "connected" if is_healthy else "disconnected"
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process cache statistics"""
+    return {
+        "auth_user_cache": get_auth_user_cache().metrics(),
+        "insights_cache": get_insights_cache().metrics(),
+        "question_catalog": get_question_catalog().metrics()
+    }
+
 # Reflection Endpoints
 @app.get("/reflections")
 async def get_user_reflections(
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get reflections for authenticated user"""
-    supabase = get_supabase_service()
-    reflections = supabase.get_user_reflections(current_user['id'], limit, offset)
+    """Get reflections for authenticated user, newest first; pass next_cursor / prev_cursor
+    back as cursor for the neighbouring pages (takes precedence over offset)"""
+    supabase = get_async_supabase_service()
+    try:
+        page = await supabase.get_user_reflections(current_user['id'], limit, offset, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "reflections": reflections,
-        "total": len(reflections),
+        "reflections": page['reflections'],
+        "total": len(page['reflections']),
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": page['next_cursor'],
+        "prev_cursor": page['prev_cursor']
     }
 
+@app.get("/reflections/search")
+async def search_reflections(
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Search the authenticated user's reflections: ranked hits with highlighted snippets;
+    pass next_cursor back as cursor for the next page"""
+    try:
+        return await get_async_supabase_service().search_reflections(q, current_user['id'], limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Reflection search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/reflections", response_model=ReflectionResponse)
 async def create_reflection(
     reflection: ReflectionRequest,
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new reflection"""
-    supabase = get_supabase_service()
+    supabase = get_async_supabase_service()
 
-    result = supabase.create_reflection(
+    result = await supabase.create_reflection(
         user_id=current_user['id'],
         question_id=reflection.question_id,
         response_text=reflection.response_text,
@@ -228,6 +291,7 @@ async def create_reflection(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create reflection"
         )
+    get_insights_cache().invalidate(current_user['id'])
 
     return result
 
@@ -238,7 +302,7 @@ async def update_reflection(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a reflection"""
-    supabase = get_supabase_service()
+    supabase = get_async_supabase_service()
 
     # Convert to dict and remove None values
     update_data = {k: v for k, v in updates.dict().items() if v is not None}
@@ -249,13 +313,14 @@ async def update_reflection(
             detail="No valid updates provided"
         )
 
-    result = supabase.update_reflection(reflection_id, update_data)
+    result = await supabase.update_reflection(reflection_id, update_data)
 
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Reflection not found or update failed"
         )
+    get_insights_cache().invalidate(result['user_id'])
 
     return result
 
@@ -265,15 +330,16 @@ async def delete_reflection(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a reflection"""
-    supabase = get_supabase_service()
+    supabase = get_async_supabase_service()
 
-    success = supabase.delete_reflection(reflection_id, current_user['id'])
+    success = await supabase.delete_reflection(reflection_id, current_user['id'])
 
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Reflection not found or delete failed"
         )
+    get_insights_cache().invalidate(current_user['id'])
 
     return {"message": "Reflection deleted successfully"}
 
@@ -281,8 +347,8 @@ async def delete_reflection(
 @app.get("/questions")
 async def get_questions(category: Optional[str] = None):
     """Get questions, optionally filtered by category"""
-    supabase = get_supabase_service()
-    questions = supabase.get_questions(category)
+    supabase = get_async_supabase_service()
+    questions = await supabase.get_questions(category)
 
     return {
         "questions": questions,
@@ -293,19 +359,20 @@ async def get_questions(category: Optional[str] = None):
 @app.get("/questions/categories")
 async def get_question_categories():
     """Get all question categories"""
-    supabase = get_supabase_service()
-    categories = supabase.get_question_categories()
+    supabase = get_async_supabase_service()
+    categories = await supabase.get_question_categories()
 
     return {"categories": categories}
 
 @app.get("/questions/random")
 async def get_random_questions(
     count: int = 5,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    seed: Optional[int] = None
 ):
-    """Get random questions for daily prompts"""
-    supabase = get_supabase_service()
-    questions = supabase.get_random_questions(count, category)
+    """Get random questions for daily prompts (pass a seed for a repeatable draw)"""
+    supabase = get_async_supabase_service()
+    questions = await supabase.get_random_questions(count, category, seed)
 
     return {
         "questions": questions,
@@ -313,12 +380,27 @@ async def get_random_questions(
         "category": category
     }
 
+@app.get("/questions/next")
+async def get_next_questions(
+    count: int = 5,
+    category: Optional[str] = None,
+    seed: Optional[int] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get random questions the user hasn't answered yet, with per-category coverage"""
+    supabase = get_async_supabase_service()
+    try:
+        return await supabase.get_next_questions(current_user['id'], count, category, seed)
+    except Exception as e:
+        logger.error(f"Next questions error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # User Stats
 @app.get("/user-stats")
 async def get_user_stats(current_user: dict = Depends(get_current_user)):
     """Get user statistics"""
-    supabase = get_supabase_service()
-    stats = supabase.get_user_stats(current_user['id'])
+    supabase = get_async_supabase_service()
+    stats = await supabase.get_user_stats(current_user['id'])
 
     return {
         "user_id": current_user['id'],
@@ -329,24 +411,47 @@ async def get_user_stats(current_user: dict = Depends(get_current_user)):
 
 # User Insights
 @app.get("/insights/{user_email}")
-async def get_user_insights(user_email: str):
-    """Generate comprehensive insights from user reflections"""
+async def get_user_insights(user_email: str, response: Response, calendar: Optional[str] = None,
+                            if_none_match: Optional[str] = Header(None)):
+    """Generate comprehensive insights from user reflections (cached per reflections version, served with an ETag)
+
+    `?calendar=compact` returns the heatmap as one intensity digit per day instead of a list of day objects.
+    """
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
 
         # Get user by email
-        user = supabase.get_user_by_email(user_email)
+        user = await supabase.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
 
         user_id = user['id']
 
+        # Read the version before computing, so a concurrent write can only make the entry stale.
+        # Without the stats table there is no version to validate against, so nothing is cached.
+        insights_cache = get_insights_cache()
+        compact = calendar == "compact"
+        today = datetime.now().date()
+        state = await supabase.get_reflections_state(user_id)
+        full_etag = etag = None
+        if state is not None:
+            full_etag = insights_etag(user_id, state['version'], today)
+            etag = insights_etag(user_id, state['version'], today, "compact") if compact else full_etag
+            if etag_matches(if_none_match, etag):
+                insights_cache.record_not_modified()
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": INSIGHTS_CACHE_CONTROL})
+
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = INSIGHTS_CACHE_CONTROL
+            cached = insights_cache.get(user_id, full_etag)
+            if cached is not None:
+                return compact_insights_calendar(cached) if compact else cached
+
         # Get insights data from SupabaseService
-        insights_data = supabase.get_user_insights_data(user_id)
-        reflections = insights_data['reflections']
-        calendar_data = insights_data['calendar_data']
+        insights_data = await supabase.get_user_insights_data(user_id)
+        accumulator = insights_data['insights']
 
-        if not reflections:
+        if not accumulator.total_reflections:
             return {
                 "total_reflections": 0,
                 "insights": {
@@ -354,343 +459,15 @@ async def get_user_insights(user_email: str):
                 }
             }
 
-        # Calculate streak statistics from calendar data
-        current_streak = 0
-        longest_streak = 0
-        temp_streak = 0
-        total_active_days = len([d for d in calendar_data if d["count"] > 0])
+        # Streaks and active days from bit operations over every day of the last 366, not just
+        # the days that have reflections (the bitmap is rebuilt from daily counts if not stored)
+        activity_bitmap = state['activity_bitmap'] if state else None
+        streak_stats = build_streak_calendar(activity_bitmap, insights_data['daily_counts'], today)
 
-        # Calculate current streak (working backwards from today)
-        for day in reversed(calendar_data):
-            if day["count"] > 0:
-                current_streak += 1
-            else:
-                break
-
-        # Calculate longest streak
-        for day in calendar_data:
-            if day["count"] > 0:
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                temp_streak = 0
-
-        # Generate full calendar data for past 365 days (filling missing dates)
-        today = datetime.now().date()
-        year_ago = today - timedelta(days=365)
-
-        daily_counts = {d['date']: d['count'] for d in calendar_data}
-        full_calendar_data = []
-        current_date = year_ago
-        while current_date <= today:
-            date_str = str(current_date)
-            count = daily_counts.get(date_str, 0)
-            full_calendar_data.append({
-                "date": date_str,
-                "count": count,
-                "intensity": min(count, 4)  # Cap at 4 for color intensity
-            })
-            current_date += timedelta(days=1)
-
-        streak_stats = {
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "total_active_days": total_active_days,
-            "calendar_data": full_calendar_data
-        }
-
-        # Process reflections for meaningful analysis
-        total_reflections = len(reflections)
-        categories = Counter()
-        category_depths = defaultdict(list)  # word count by category
-        all_text = ""
-        category_texts = defaultdict(str)  # text by category for deeper analysis
-        reflection_timeline = []  # for growth analysis
-
-        # Value indicators - words that suggest personal values
-        value_indicators = {
-            'family': ['family', 'parent', 'child', 'kids', 'mom', 'dad', 'son', 'daughter', 'siblings', 'spouse', 'wife', 'husband', 'marriage', 'children'],
-            'growth': ['learn', 'grow', 'improve', 'develop', 'progress', 'change', 'evolve', 'better', 'overcome', 'challenge'],
-            'purpose': ['purpose', 'meaning', 'goals', 'dreams', 'vision', 'mission', 'calling', 'passion', 'fulfillment'],
-            'balance': ['balance', 'harmony', 'peace', 'calm', 'stress', 'overwhelmed', 'busy', 'priorities'],
-            'relationships': ['friends', 'friendship', 'trust', 'love', 'connection', 'community', 'support', 'together'],
-            'gratitude': ['grateful', 'thankful', 'appreciate', 'blessed', 'fortunate', 'lucky', 'joy', 'happy'],
-            'authenticity': ['authentic', 'genuine', 'honest', 'true', 'real', 'myself', 'identity', 'values'],
-            'resilience': ['strong', 'strength', 'overcome', 'survive', 'persevere', 'endure', 'tough', 'difficult']
-        }
-
-        # Emotional tone indicators
-        positive_emotions = ['happy', 'joy', 'excited', 'grateful', 'proud', 'love', 'amazing', 'wonderful', 'great', 'good', 'content', 'peaceful']
-        challenging_emotions = ['sad', 'worried', 'stressed', 'anxious', 'frustrated', 'angry', 'difficult', 'hard', 'struggle', 'pain']
-        reflective_words = ['realize', 'understand', 'learned', 'discovered', 'insight', 'wisdom', 'perspective', 'reflection']
-
-        # Counters for meaningful insights
-        value_scores = {value: 0 for value in value_indicators.keys()}
-        category_emotional_profiles = defaultdict(lambda: {'positive': 0, 'challenging': 0, 'reflective': 0})
-
-        for reflection in reflections:
-            # Access Supabase data structure
-            reflection_id = reflection['id']
-            text = reflection['response_text']
-            word_count = reflection['word_count'] or 0
-            created_at = date_parser.parse(reflection['created_at'])
-
-            # Get category and question from nested questions object
-            category = None
-            question = None
-            if reflection.get('questions'):
-                category = reflection['questions'].get('category')
-                question = reflection['questions'].get('question_text')
-
-            if not text:
-                continue
-
-            text_lower = text.lower()
-
-            # Category and depth tracking
-            if category:
-                categories[category] += 1
-                category_depths[category].append(word_count)
-                category_texts[category] += " " + text_lower
-
-            # Timeline for growth analysis
-            reflection_timeline.append({
-                'date': str(created_at),
-                'category': category,
-                'word_count': word_count,
-                'text_length': len(text),
-                'quarter': f"Q{((created_at.month - 1) // 3) + 1}" if created_at else None
-            })
-
-            # Value detection - count mentions of value-related words
-            for value, indicators in value_indicators.items():
-                for indicator in indicators:
-                    value_scores[value] += text_lower.count(indicator)
-
-            # Emotional profiling by category
-            if category:
-                pos_count = sum(text_lower.count(word) for word in positive_emotions)
-                challenging_count = sum(text_lower.count(word) for word in challenging_emotions)
-                reflective_count = sum(text_lower.count(word) for word in reflective_words)
-
-                category_emotional_profiles[category]['positive'] += pos_count
-                category_emotional_profiles[category]['challenging'] += challenging_count
-                category_emotional_profiles[category]['reflective'] += reflective_count
-
-            all_text += " " + text_lower
-
-        # Analyze core values (top values mentioned)
-        value_descriptions = {
-            'family': "The bonds and relationships that shape your identity",
-            'growth': "Your commitment to continuous learning and improvement",
-            'purpose': "Finding meaning and direction in life's journey",
-            'balance': "Seeking harmony between life's competing demands",
-            'relationships': "Building meaningful connections with others",
-            'gratitude': "Appreciating life's blessings and moments",
-            'authenticity': "Being true to yourself and your values",
-            'resilience': "Your strength in facing life's challenges"
-        }
-
-        top_values = sorted(value_scores.items(), key=lambda x: x[1], reverse=True)[:5]
-        core_values = [{"value": value.replace('_', ' ').title(),
-                       "strength": score,
-                       "description": value_descriptions.get(value, "A meaningful aspect of your life journey")}
-                      for value, score in top_values if score > 0]
-
-        # Category depth analysis
-        category_insights = {}
-        for category, depths in category_depths.items():
-            avg_depth = sum(depths) / len(depths) if depths else 0
-            total_depth = sum(depths)
-            emotional_profile = category_emotional_profiles[category]
-
-            # Determine emotional tone for this category
-            total_emotional = emotional_profile['positive'] + emotional_profile['challenging']
-            if total_emotional > 0:
-                positivity_ratio = emotional_profile['positive'] / total_emotional
-            else:
-                positivity_ratio = 0.5
-
-            category_insights[category] = {
-                'count': len(depths),
-                'avg_depth': round(avg_depth, 1),
-                'total_investment': total_depth,  # how much mental energy they put here
-                'emotional_tone': 'positive' if positivity_ratio > 0.6 else 'challenging' if positivity_ratio < 0.4 else 'balanced',
-                'reflection_level': emotional_profile['reflective'],
-                'percentage': round((len(depths) / total_reflections) * 100, 1)
-            }
-
-        # Growth analysis - compare early vs recent periods
-        if len(reflections) >= 10:
-            early_quarter = reflections[:len(reflections)//3]
-            recent_quarter = reflections[-len(reflections)//3:]
-
-            early_avg_depth = sum(r['word_count'] or 0 for r in early_quarter) / len(early_quarter)
-            recent_avg_depth = sum(r['word_count'] or 0 for r in recent_quarter) / len(recent_quarter)
-
-            depth_growth = round(((recent_avg_depth - early_avg_depth) / early_avg_depth * 100), 1) if early_avg_depth > 0 else 0
-
-            # Analyze category evolution
-            early_categories = Counter()
-            recent_categories = Counter()
-
-            for r in early_quarter:
-                if r.get('questions') and r['questions'].get('category'):
-                    early_categories[r['questions']['category']] += 1
-
-            for r in recent_quarter:
-                if r.get('questions') and r['questions'].get('category'):
-                    recent_categories[r['questions']['category']] += 1
-
-            growth_insights = {
-                'depth_change': depth_growth,
-                'depth_trend': 'growing' if depth_growth > 15 else 'stable' if abs(depth_growth) <= 15 else 'varying',
-                'focus_shift': None
-            }
-
-            # Find biggest focus shift
-            early_top = early_categories.most_common(1)[0][0] if early_categories else None
-            recent_top = recent_categories.most_common(1)[0][0] if recent_categories else None
-
-            if early_top and recent_top and early_top != recent_top:
-                growth_insights['focus_shift'] = f"Shifted focus from {early_top.replace('_', ' ')} to {recent_top.replace('_', ' ')}"
-        else:
-            growth_insights = {'depth_change': 0, 'depth_trend': 'early', 'focus_shift': None}
-
-        # Find the most meaningful category (highest total investment)
-        most_invested_category = max(category_insights.items(), key=lambda x: x[1]['total_investment']) if category_insights else None
-
-        # Generate Reflection DNA - deeply personal insights
-        reflection_dna = []
-
-        # Pattern 1: Energy Detection - what topics get the most detailed responses
-        category_avg_lengths = {cat: sum(depths) / len(depths) for cat, depths in category_depths.items() if depths}
-        if category_avg_lengths:
-            energy_topic = max(category_avg_lengths.items(), key=lambda x: x[1])
-            topic_name = energy_topic[0].replace('_', ' ').title()
-            reflection_dna.append(f"⚡ Your energy peaks when discussing {topic_name}")
-
-        # Pattern 2: Avoidance Detection - what gets brief responses
-        brief_categories = {cat: avg_len for cat, avg_len in category_avg_lengths.items() if avg_len < 50}
-        if brief_categories:
-            avoided_topic = min(brief_categories.items(), key=lambda x: x[1])
-            topic_name = avoided_topic[0].replace('_', ' ').lower()
-            reflection_dna.append(f"🔍 You tend to give brief responses about {topic_name}")
-
-        # Pattern 3: Processing Style Detection
-        question_count = sum(text.lower().count('?') for text in all_text.split())
-        story_indicators = sum(text.lower().count(word) for text in all_text.split() for word in ['story', 'remember', 'once', 'time'])
-        metaphor_count = sum(text.lower().count(word) for text in all_text.split() for word in ['like', 'as if', 'feels like'])
-
-        if question_count > total_reflections * 0.8:
-            reflection_dna.append("🤔 You process life through questioning - always seeking deeper understanding")
-        elif story_count := sum(text.lower().count(word) for text in all_text.split() for word in ['when i', 'i remember', 'there was']):
-            if story_count > total_reflections * 0.5:
-                reflection_dna.append("📖 You make sense of life through storytelling and memories")
-        elif metaphor_count > total_reflections * 0.3:
-            reflection_dna.append("🎨 You process experiences through creative metaphors and comparisons")
-
-        # Pattern 4: Emotional Processing Style
-        gratitude_count = sum(all_text.lower().count(word) for word in ['grateful', 'thankful', 'appreciate', 'blessed'])
-        worry_count = sum(all_text.lower().count(word) for word in ['worry', 'anxious', 'stressed', 'concerned'])
-        hope_count = sum(all_text.lower().count(word) for word in ['hope', 'wish', 'want', 'dream'])
-
-        if gratitude_count > worry_count and gratitude_count > hope_count:
-            reflection_dna.append("🙏 Gratitude is your emotional anchor - you naturally find things to appreciate")
-        elif hope_count > gratitude_count and hope_count > worry_count:
-            reflection_dna.append("✨ You're a natural optimist - future possibilities energize you")
-        elif worry_count > gratitude_count:
-            reflection_dna.append("🛡️ You process challenges by anticipating and preparing for difficulties")
-
-        # Pattern 5: Self-Reference Patterns - how they talk about themselves
-        should_statements = sum(all_text.lower().count(phrase) for phrase in ['i should', 'i need to', 'i must'])
-        self_compassion = sum(all_text.lower().count(phrase) for phrase in ['i\'m learning', 'it\'s okay', 'i forgive'])
-
-        if should_statements > self_compassion * 2:
-            reflection_dna.append("⚖️ Your inner critic is active - you often focus on what you 'should' do")
-        elif self_compassion > should_statements:
-            reflection_dna.append("💝 You practice self-compassion - treating yourself with kindness")
-
-        # Pattern 6: Growth Edge Detection
-        change_words = sum(all_text.lower().count(word) for word in ['change', 'different', 'new', 'grow', 'learn'])
-        stuck_words = sum(all_text.lower().count(word) for word in ['same', 'always', 'never', 'stuck', 'can\'t'])
-
-        if change_words > stuck_words:
-            reflection_dna.append("🌱 You're in an active growth phase - embracing change and new perspectives")
-        elif stuck_words > change_words:
-            reflection_dna.append("🔄 You're noticing patterns you want to break - awareness is the first step")
-
-        # Pattern 7: Connection Style
-        others_focus = sum(all_text.lower().count(word) for word in ['family', 'friends', 'people', 'others', 'relationships'])
-        self_focus = sum(all_text.lower().count(word) for word in ['i feel', 'i think', 'i want', 'my', 'myself'])
-
-        if others_focus > self_focus:
-            reflection_dna.append("🤝 You understand yourself through relationships and connections with others")
-        else:
-            reflection_dna.append("🔍 You're developing a strong sense of self through introspection")
-
-        # Limit to top 6 most insightful patterns
-        reflection_dna = reflection_dna[:6]
-
-        # Calculate reflection style metrics
-        total_word_count = sum(r['word_count'] or 0 for r in reflections)
-        avg_word_count = round(total_word_count / total_reflections) if total_reflections > 0 else 0
-
-        # Determine depth level based on average word count
-        if avg_word_count > 150:
-            depth_level = "deeply reflective"
-        elif avg_word_count > 100:
-            depth_level = "moderately reflective"
-        else:
-            depth_level = "concise reflector"
-
-        # Calculate consistency based on reflection frequency (simplified)
-        consistency = "highly consistent" if total_reflections > 100 else "moderately consistent" if total_reflections > 50 else "developing consistency"
-
-        # Personal reflection insights - generate meaningful insights
-        personal_insights = []
-
-        # Core values insight
-        if core_values:
-            top_value = core_values[0]
-            personal_insights.append(f"Your reflections reveal '{top_value['value']}' as a central theme in your life")
-
-        # Category depth insight
-        if most_invested_category:
-            cat_name, cat_data = most_invested_category
-            cat_display = cat_name.replace('_', ' ').title()
-            emotional_tone = cat_data['emotional_tone']
-            personal_insights.append(f"You invest the most reflection energy in {cat_display}, approaching it with a {emotional_tone} mindset")
-
-        # Growth insight
-        if growth_insights['depth_trend'] == 'growing':
-            personal_insights.append(f"Your reflection depth has grown {growth_insights['depth_change']}% - you're becoming more introspective")
-        elif growth_insights['focus_shift']:
-            personal_insights.append(growth_insights['focus_shift'])
-
-        # Balance insight
-        if 'balance' in [v['value'].lower() for v in core_values[:3]]:
-            personal_insights.append("Balance appears to be important to you - mentioned across multiple life areas")
-
-        return {
-            "total_reflections": total_reflections,
-            "insights": {
-                "personal_summary": ". ".join(personal_insights) if personal_insights else "Continue reflecting to discover meaningful insights about yourself.",
-                "core_values": core_values,
-                "reflection_dna": reflection_dna,
-                "streak_calendar": streak_stats,
-                "growth_journey": {
-                    "reflection_depth_change": f"Your reflection depth has {growth_insights['depth_trend']} over time",
-                    "focus_evolution": growth_insights['focus_shift'] or "Your reflection focus has remained consistent",
-                    "emotional_growth": "Growing in self-awareness through consistent reflection"
-                },
-                "reflection_style": {
-                    "avg_word_count": avg_word_count,
-                    "depth_level": depth_level,
-                    "consistency": consistency
-                }
-            }
-        }
+        insights = accumulator.build(streak_stats)
+        if full_etag:
+            insights_cache.set(user_id, full_etag, insights)
+        return compact_insights_calendar(insights) if compact else insights
 
     except Exception as e:
         logger.error(f"Error generating insights: {str(e)}")
@@ -700,15 +477,15 @@ async def get_user_insights(user_email: str):
 async def get_user_answered_questions(user_email: str):
     """Get answered question IDs grouped by category for a user"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
 
         # Get user by email
-        user = supabase.get_user_by_email(user_email)
+        user = await supabase.get_user_by_email(user_email)
         if not user:
             raise HTTPException(status_code=404, detail=f"User not found: {user_email}")
 
         # Get answered questions grouped by category
-        answered_by_category = supabase.get_answered_questions_by_category(user['id'])
+        answered_by_category = await supabase.get_answered_questions_by_category(user['id'])
 
         return answered_by_category
 
@@ -722,8 +499,8 @@ async def get_user_answered_questions(user_email: str):
 @app.get("/profile")
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
     """Get user profile"""
-    supabase = get_supabase_service()
-    profile = supabase.get_user_profile(current_user['id'])
+    supabase = get_async_supabase_service()
+    profile = await supabase.get_user_profile(current_user['id'])
 
     return {
         "user": current_user,
@@ -736,7 +513,7 @@ async def update_user_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Update user profile"""
-    supabase = get_supabase_service()
+    supabase = get_async_supabase_service()
 
     # Convert to dict and remove None values
     update_data = {k: v for k, v in profile_updates.dict().items() if v is not None}
@@ -747,7 +524,7 @@ async def update_user_profile(
             detail="No valid updates provided"
         )
 
-    result = supabase.upsert_user_profile(current_user['id'], update_data)
+    result = await supabase.upsert_user_profile(current_user['id'], update_data)
 
     if not result:
         raise HTTPException(
@@ -768,10 +545,10 @@ async def echo_chat(
     # TODO: Integrate Eleanor LLM from original database_api.py
     # For now, return a placeholder response
 
-    supabase = get_supabase_service()
+    supabase = get_async_supabase_service()
 
     # Store conversation in database
-    conversation = supabase.create_ai_conversation(
+    conversation = await supabase.create_ai_conversation(
         user_id=current_user['id'],
         message=request.message,
         response="Eleanor chat integration coming soon!",
@@ -787,15 +564,22 @@ async def echo_chat(
 @app.get("/chat/history")
 async def get_chat_history(
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get AI chat history"""
-    supabase = get_supabase_service()
-    history = supabase.get_ai_conversation_history(current_user['id'], limit)
+    """Get AI chat history, newest first; pass next_cursor / prev_cursor back as cursor for
+    the neighbouring pages"""
+    supabase = get_async_supabase_service()
+    try:
+        page = await supabase.get_ai_conversation_history(current_user['id'], limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "conversations": history,
-        "total": len(history)
+        "conversations": page['conversations'],
+        "total": len(page['conversations']),
+        "next_cursor": page['next_cursor'],
+        "prev_cursor": page['prev_cursor']
     }
 
 # Admin Endpoints
@@ -805,29 +589,45 @@ async def get_admin_responses(
     offset: int = 0,
     search: Optional[str] = None,
     user_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
     admin_user: dict = Depends(get_admin_user)
 ):
-    """Get all responses with admin privileges"""
+    """Get all responses with admin privileges, newest first; also pages by cursor
+    (next_cursor / prev_cursor), which takes precedence over offset"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
+        position = REFLECTIONS_KEYSET.decode(cursor)
+
+        # Text searches filter through the reflection_search full-text index (inner-joined);
+        # a number looks up that reflection id
+        search_id = search.strip() if search and search.strip().isdigit() else None
+        text_search = search if search and not search_id else None
+        search_embed = ', reflection_search!inner(reflection_id)' if text_search else ''
+
+        def apply_search(query):
+            if search_id:
+                return query.eq('id', search_id)
+            if text_search:
+                # wfts = websearch_to_tsquery; a plain filter keeps the builder chainable
+                return query.filter('reflection_search.document', 'wfts(english)', text_search)
+            return query
 
         # Build the query
         query = supabase.client.table('reflections').select(
-            '''
+            f'''
             *,
             users(email),
-            questions(question_text, category)
+            questions(question_text, category){search_embed}
             '''
-        ).order('created_at', desc=True)
+        )
 
         # Apply search filter
-        if search:
-            query = query.or_(f'response_text.ilike.%{search}%,id.eq.{search}')
+        query = apply_search(query)
 
         # Apply user filter
         if user_filter and user_filter != 'all':
             # Get user ID by email
-            user_result = supabase.client.table('users').select('id').eq('email', user_filter).single().execute()
+            user_result = await supabase.client.table('users').select('id').eq('email', user_filter).single().execute()
             if user_result.data:
                 query = query.eq('user_id', user_result.data['id'])
             else:
@@ -840,25 +640,25 @@ async def get_admin_responses(
                 }
 
         # Get total count (without pagination)
-        count_query = supabase.client.table('reflections').select('*', count='exact')
-        if search:
-            count_query = count_query.or_(f'response_text.ilike.%{search}%,id.eq.{search}')
+        count_query = apply_search(supabase.client.table('reflections').select(f'id{search_embed}', count='exact'))
         if user_filter and user_filter != 'all':
-            user_result = supabase.client.table('users').select('id').eq('email', user_filter).single().execute()
+            user_result = await supabase.client.table('users').select('id').eq('email', user_filter).single().execute()
             if user_result.data:
                 count_query = count_query.eq('user_id', user_result.data['id'])
 
-        count_result = count_query.execute()
+        count_result = await count_query.execute()
         total_count = count_result.count
 
-        # Apply pagination
-        query = query.range(offset, offset + limit - 1)
+        # Apply pagination (keyset after a cursor; one extra row tells whether there is a next page)
+        query = REFLECTIONS_KEYSET.postgrest(query, position)
+        query = query.limit(limit + 1) if position else query.range(offset, offset + limit)
 
-        result = query.execute()
+        result = await query.execute()
+        rows, next_cursor, prev_cursor = REFLECTIONS_KEYSET.page(result.data, limit, position, offset)
 
         # Transform data to match expected format
         responses = []
-        for response in result.data:
+        for response in rows:
             responses.append({
                 "id": response['id'],
                 "user_id": response['user_id'],
@@ -875,13 +675,44 @@ async def get_admin_responses(
             "responses": responses,
             "total": total_count,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
         }
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Admin responses error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/responses/search")
+async def search_admin_responses(
+    q: str,
+    user_filter: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    admin_user: dict = Depends(get_admin_user)
+):
+    """Search every user's reflections (or one user's): ranked hits with highlighted snippets"""
+    try:
+        supabase = get_async_supabase_service()
+
+        user_id = None
+        if user_filter and user_filter != 'all':
+            user = await supabase.get_user_by_email(user_filter)
+            if not user:
+                return {"results": [], "total": 0, "next_cursor": None}
+            user_id = user['id']
+
+        return await supabase.search_reflections(q, user_id, limit, cursor)
+
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Admin response search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/admin/responses")
 async def delete_admin_response(
     id: int,
@@ -889,9 +720,9 @@ async def delete_admin_response(
 ):
     """Delete a response (admin only)"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
 
-        result = supabase.client.table('reflections').delete().eq('id', id).execute()
+        result = await supabase.client.table('reflections').delete().eq('id', id).execute()
 
         if not result.data:
             raise HTTPException(status_code=404, detail="Response not found")
@@ -908,60 +739,94 @@ async def get_admin_questions(
     offset: int = 0,
     search: Optional[str] = None,
     category: Optional[str] = None,
+    cursor: Optional[str] = None,
     admin_user: dict = Depends(get_admin_user)
 ):
-    """Get all questions with admin privileges"""
+    """Get all questions with admin privileges (searches are ranked, best match first);
+    listings also page by cursor (next_cursor / prev_cursor), which takes precedence over offset"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
+        position = NEWEST_QUESTIONS_KEYSET.decode(cursor)
 
-        # Build the query - only show active questions in admin
-        query = supabase.client.table('questions').select('*').eq('is_active', True).order('id', desc=True)
-
-        # Apply search filter
         if search:
-            query = query.or_(f'question_text.ilike.%{search}%,id.eq.{search}')
+            # Served from the current catalog snapshot; the watcher and admin writes refresh it
+            hits = get_question_search_index().search(
+                search, category=category if category and category != 'all' else None,
+                active_only=True, limit=limit, offset=offset
+            )
+            return {
+                "questions": [{**hit['question'], "score": hit['score']} for hit in hits['results']],
+                "total": hits['total'],
+                "limit": limit,
+                "offset": offset
+            }
+
+        # Build the query - only show active questions in admin
+        query = supabase.client.table('questions').select('*').eq('is_active', True)
 
         # Apply category filter
         if category and category != 'all':
             query = query.eq('category', category)
 
         # Get total count (without pagination) - only active questions
-        count_query = supabase.client.table('questions').select('*', count='exact').eq('is_active', True)
-        if search:
-            count_query = count_query.or_(f'question_text.ilike.%{search}%,id.eq.{search}')
+        count_query = supabase.client.table('questions').select('id', count='exact').eq('is_active', True)
         if category and category != 'all':
             count_query = count_query.eq('category', category)
 
-        count_result = count_query.execute()
+        count_result = await count_query.execute()
         total_count = count_result.count
 
-        # Apply pagination
-        query = query.range(offset, offset + limit - 1)
+        # Apply pagination (keyset after a cursor; one extra row tells whether there is a next page)
+        query = NEWEST_QUESTIONS_KEYSET.postgrest(query, position)
+        query = query.limit(limit + 1) if position else query.range(offset, offset + limit)
 
-        result = query.execute()
+        result = await query.execute()
+        questions, next_cursor, prev_cursor = NEWEST_QUESTIONS_KEYSET.page(result.data, limit, position, offset)
 
         return {
-            "questions": result.data,
+            "questions": questions,
             "total": total_count,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
         }
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Admin questions error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def refresh_question_catalog():
+    """Reload the in-memory question catalog after an admin questions write"""
+    try:
+        await get_async_supabase_service().refresh_question_catalog(force=True)
+    except Exception as e:
+        # The periodic version check picks the change up later
+        logger.warning(f"Question catalog refresh failed: {e}")
+
 @app.post("/admin/questions")
 async def create_admin_question(
     question_text: str,
     category: str,
+    allow_duplicate: bool = False,
     admin_user: dict = Depends(get_admin_user)
 ):
-    """Create a new question (admin only)"""
+    """Create a new question (admin only); near-duplicates of existing questions are rejected
+    with 409 unless allow_duplicate is set"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
+        guard = get_duplicate_guard()
+
+        check = guard.check(question_text)
+        if check['duplicate'] and not allow_duplicate:
+            raise HTTPException(status_code=409, detail={
+                "message": "Question duplicates an existing question",
+                "matches": check['matches']
+            })
 
-        result = supabase.client.table('questions').insert({
+        result = await supabase.client.table('questions').insert({
             'question_text': question_text,
             'category': category,
             'usage_count': 0
@@ -969,9 +834,16 @@ async def create_admin_question(
 
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create question")
+        guard.record(result.data[0])
+        await refresh_question_catalog()
 
+        if check['duplicate']:
+            # Inserted anyway: flag what it duplicates
+            return {**result.data[0], "possible_duplicates": check['matches']}
         return result.data[0]
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Admin create question error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -981,11 +853,21 @@ async def update_admin_question(
     question_id: int,
     question_text: Optional[str] = None,
     category: Optional[str] = None,
+    allow_duplicate: bool = False,
     admin_user: dict = Depends(get_admin_user)
 ):
-    """Update a question (admin only)"""
+    """Update a question (admin only); new text that near-duplicates another question is
+    rejected with 409 unless allow_duplicate is set"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
+
+        if question_text is not None and not allow_duplicate:
+            check = get_duplicate_guard().check(question_text, exclude_id=question_id)
+            if check['duplicate']:
+                raise HTTPException(status_code=409, detail={
+                    "message": "Question duplicates an existing question",
+                    "matches": check['matches']
+                })
 
         update_data = {}
         if question_text is not None:
@@ -996,13 +878,17 @@ async def update_admin_question(
         if not update_data:
             raise HTTPException(status_code=400, detail="No updates provided")
 
-        result = supabase.client.table('questions').update(update_data).eq('id', question_id).execute()
+        result = await supabase.client.table('questions').update(update_data).eq('id', question_id).execute()
 
         if not result.data:
             raise HTTPException(status_code=404, detail="Question not found")
+        get_duplicate_guard().record(result.data[0])
+        await refresh_question_catalog()
 
         return result.data[0]
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Admin update question error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1014,12 +900,13 @@ async def delete_admin_question(
 ):
     """Delete a question (admin only)"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
 
-        result = supabase.client.table('questions').delete().eq('id', question_id).execute()
+        result = await supabase.client.table('questions').delete().eq('id', question_id).execute()
 
         if not result.data:
             raise HTTPException(status_code=404, detail="Question not found")
+        await refresh_question_catalog()
 
         return {"message": "Question deleted successfully"}
 
@@ -1035,11 +922,11 @@ async def get_admin_users(
 ):
     """Get all users with response counts (admin only)"""
     try:
-        supabase = get_supabase_service()
+        supabase = get_async_supabase_service()
 
         # Try to use RPC function first
         try:
-            result = supabase.client.rpc('get_users_with_response_counts', {
+            result = await supabase.client.rpc('get_users_with_response_counts', {
                 'limit_val': limit,
                 'offset_val': offset
             }).execute()
@@ -1056,18 +943,18 @@ async def get_admin_users(
             pass
 
         # Fallback - use regular query with manual joins
-        users_result = supabase.client.table('users').select('*').range(offset, offset + limit - 1).execute()
+        users_result = await supabase.client.table('users').select('*').range(offset, offset + limit - 1).execute()
         users = []
         for user in users_result.data:
             # Get response count for each user
-            responses_result = supabase.client.table('reflections').select('*', count='exact').eq('user_id', user['id']).execute()
+            responses_result = await supabase.client.table('reflections').select('*', count='exact').eq('user_id', user['id']).execute()
             users.append({
                 "email": user['email'],
                 "response_count": responses_result.count or 0
             })
 
         # Get total count
-        count_result = supabase.client.table('users').select('*', count='exact').execute()
+        count_result = await supabase.client.table('users').select('*', count='exact').execute()
 
         return {
             "users": users,
@@ -1086,49 +973,40 @@ async def get_admin_duplicates(
 ):
     """Find duplicate questions using similarity (admin only)"""
     try:
-        supabase = get_supabase_service()
-
-        # Get all questions
-        result = supabase.client.table('questions').select('*').execute()
-        questions = result.data
-
-        duplicates = []
-
-        # Simple similarity check (can be enhanced with Levenshtein distance)
-        for i, q1 in enumerate(questions):
-            for j, q2 in enumerate(questions[i+1:], i+1):
-                text1 = q1['question_text'].lower().strip()
-                text2 = q2['question_text'].lower().strip()
-
-                # Check for exact matches or very similar questions
-                if text1 == text2:
-                    similarity = 1.0
-                elif len(text1) > 10 and len(text2) > 10:
-                    # Simple similarity check based on common words
-                    words1 = set(text1.split())
-                    words2 = set(text2.split())
-                    common = len(words1.intersection(words2))
-                    total = len(words1.union(words2))
-                    similarity = common / total if total > 0 else 0
-                else:
-                    similarity = 0
-
-                if similarity > 0.8:  # 80% similarity threshold
-                    duplicates.append({
-                        "question1": q1,
-                        "question2": q2,
-                        "similarity": round(similarity, 3)
-                    })
+        # The index follows the catalog, which the watcher and admin writes keep current
+        index = get_duplicate_index()
+
+        duplicates = [{
+            "question1": index.question(id1),
+            "question2": index.question(id2),
+            "similarity": similarity
+        } for id1, id2, similarity in index.duplicate_pairs()]
+        clusters = index.clusters()
 
         return {
             "duplicates": duplicates,
-            "total": len(duplicates)
+            "total": len(duplicates),
+            "duplicate_groups": [cluster['questions'] for cluster in clusters],
+            "clusters": clusters
         }
 
     except Exception as e:
         logger.error(f"Admin duplicates error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/questions/classify")
+async def classify_admin_question(
+    question_text: str,
+    admin_user: dict = Depends(get_admin_user)
+):
+    """Suggest a category for question text (admin only)"""
+    try:
+        # Centroids are refitted when the watcher or an admin write loads a new catalog
+        return {"question_text": question_text, **get_question_classifier().classify(question_text)}
+    except Exception as e:
+        logger.error(f"Error classifying question: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # User Management (Admin endpoints)
 @app.post("/admin/users/{auth_id}/link")
 async def link_user_to_auth(
@@ -1139,9 +1017,11 @@ async def link_user_to_auth(
 ):
     """Link existing user to Supabase auth (admin only)"""
     # TODO: Add admin check
-    supabase = get_supabase_service()
+    supabase = get_async_supabase_service()
 
-    user = supabase.create_user(auth_id, email, name)
+    user = await supabase.create_user(auth_id, email, name)
+    # Linking can point this auth id at a different row, so never serve the old one
+    get_auth_user_cache().invalidate(auth_id=auth_id)
 
     if not user:
         raise HTTPException(
@@ -1151,6 +1031,29 @@ async def link_user_to_auth(
 
     return user
 
+# Background task re-checking the question catalog version (started on startup)
+question_catalog_watcher = None
+
+@app.on_event("startup")
+async def startup_event():
+    """Load the question catalog and start its periodic version check"""
+    global question_catalog_watcher
+    supabase = get_async_supabase_service()
+    try:
+        await supabase.refresh_question_catalog(force=True)
+    except Exception as e:
+        logger.error(f"❌ Could not load question catalog: {e}")
+    question_catalog_watcher = asyncio.create_task(
+        get_question_catalog().watch(supabase.refresh_question_catalog)
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the catalog watcher and close the shared Supabase HTTP session"""
+    if question_catalog_watcher:
+        question_catalog_watcher.cancel()
+    await close_async_supabase_service()
+
 if __name__ == "__main__":
     import uvicorn
 
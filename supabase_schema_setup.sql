@@ -413,6 +413,33 @@ BEGIN
 END;
 $$;
 
+-- Create a function to get per-user reflection stats in one round trip (used by SupabaseService.get_user_stats)
+CREATE INDEX IF NOT EXISTS idx_reflections_user_created ON reflections(user_id, created_at);
+
+CREATE OR REPLACE FUNCTION get_user_reflection_stats(p_user_id INTEGER)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    SELECT json_build_object(
+        'total_reflections', COUNT(*),
+        'total_words', COALESCE(SUM(r.word_count), 0),
+        'categories_covered', COUNT(DISTINCT q.category),
+        'weekly_reflections', COUNT(*) FILTER (WHERE r.created_at >= NOW() - INTERVAL '7 days'),
+        'categories_list', COALESCE(
+            array_to_json(array_agg(DISTINCT q.category ORDER BY q.category) FILTER (WHERE q.category IS NOT NULL)),
+            '[]'::json
+        )
+    )
+    FROM reflections r
+    LEFT JOIN questions q ON q.id = r.question_id
+    WHERE r.user_id = p_user_id AND NOT COALESCE(r.is_draft, false);
+$$;
+
+-- Returns any user's stats, so only the backend (service key) may call it
+REVOKE EXECUTE ON FUNCTION get_user_reflection_stats FROM PUBLIC, anon, authenticated;
+
 -- Grant necessary permissions
 GRANT USAGE ON SCHEMA public TO authenticated;
 GRANT ALL ON ALL TABLES IN SCHEMA public TO authenticated;
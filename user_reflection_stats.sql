@@ -0,0 +1,308 @@
+-- Incremental per-user reflection stats for Echoes of Me (Supabase)
+-- Keeps one user_reflection_stats row per user up to date from a trigger on reflections,
+-- so /user-stats reads a single row instead of scanning the user's history.
+-- Run after supabase_schema_setup.sql / user_stats_function.sql, then backfill with:
+--     SELECT rebuild_all_reflection_stats();   (or: python rebuild_reflection_stats.py --supabase)
+
+-- Only non-draft reflections are counted.
+-- Bit n of activity_bitmap marks the day DATE '2020-01-01' + n (same layout as src/services/reflection_stats.py)
+-- Bit n of answered_bitmap marks question id n as answered (src/services/question_deck.py);
+-- NULL until the row is next rebuilt
+CREATE TABLE IF NOT EXISTS user_reflection_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_reflections INTEGER NOT NULL DEFAULT 0,
+    total_words BIGINT NOT NULL DEFAULT 0,
+    category_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    latest_reflection TIMESTAMP,
+    activity_bitmap BYTEA NOT NULL DEFAULT ''::bytea,
+    answered_bitmap BYTEA,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE user_reflection_stats ADD COLUMN IF NOT EXISTS answered_bitmap BYTEA;
+
+ALTER TABLE user_reflection_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own reflection stats" ON user_reflection_stats
+    FOR SELECT USING (auth.uid() = (SELECT auth_id FROM users WHERE id = user_id));
+
+CREATE INDEX IF NOT EXISTS idx_reflections_user_created ON reflections(user_id, created_at);
+
+-- Recompute one user's row from scratch
+CREATE OR REPLACE FUNCTION rebuild_user_reflection_stats(p_user_id INTEGER)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_bitmap BYTEA := ''::bytea;
+    v_answered BYTEA := ''::bytea;
+    v_day INTEGER;
+    v_question_id INTEGER;
+BEGIN
+    FOR v_day IN
+        SELECT DISTINCT (created_at::date - DATE '2020-01-01')
+        FROM reflections
+        WHERE user_id = p_user_id AND NOT COALESCE(is_draft, false)
+          AND created_at >= DATE '2020-01-01'
+        ORDER BY 1
+    LOOP
+        IF length(v_bitmap) <= v_day / 8 THEN
+            v_bitmap := v_bitmap || decode(repeat('00', v_day / 8 + 1 - length(v_bitmap)), 'hex');
+        END IF;
+        v_bitmap := set_bit(v_bitmap, v_day, 1);
+    END LOOP;
+
+    FOR v_question_id IN
+        SELECT DISTINCT question_id
+        FROM reflections
+        WHERE user_id = p_user_id AND NOT COALESCE(is_draft, false) AND question_id >= 0
+        ORDER BY 1
+    LOOP
+        IF length(v_answered) <= v_question_id / 8 THEN
+            v_answered := v_answered || decode(repeat('00', v_question_id / 8 + 1 - length(v_answered)), 'hex');
+        END IF;
+        v_answered := set_bit(v_answered, v_question_id, 1);
+    END LOOP;
+
+    INSERT INTO user_reflection_stats (user_id, total_reflections, total_words, category_counts,
+                                       latest_reflection, activity_bitmap, answered_bitmap, version, updated_at)
+    SELECT
+        p_user_id,
+        COUNT(*),
+        COALESCE(SUM(r.word_count), 0),
+        COALESCE((
+            SELECT jsonb_object_agg(c.category, c.n)
+            FROM (
+                SELECT q2.category, COUNT(*) AS n
+                FROM reflections r2
+                JOIN questions q2 ON q2.id = r2.question_id
+                WHERE r2.user_id = p_user_id AND NOT COALESCE(r2.is_draft, false)
+                GROUP BY q2.category
+            ) c
+        ), '{}'::jsonb),
+        MAX(r.created_at),
+        v_bitmap,
+        v_answered,
+        1,
+        NOW()
+    FROM reflections r
+    WHERE r.user_id = p_user_id AND NOT COALESCE(r.is_draft, false)
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_reflections = EXCLUDED.total_reflections,
+        total_words = EXCLUDED.total_words,
+        category_counts = EXCLUDED.category_counts,
+        latest_reflection = EXCLUDED.latest_reflection,
+        activity_bitmap = EXCLUDED.activity_bitmap,
+        answered_bitmap = EXCLUDED.answered_bitmap,
+        version = user_reflection_stats.version + 1,
+        updated_at = NOW();
+END;
+$$;
+
+-- Rebuild command: recompute every user's row, returns the number of users
+CREATE OR REPLACE FUNCTION rebuild_all_reflection_stats()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_user_id INTEGER;
+    v_users INTEGER := 0;
+BEGIN
+    FOR v_user_id IN SELECT id FROM users ORDER BY id LOOP
+        PERFORM rebuild_user_reflection_stats(v_user_id);
+        v_users := v_users + 1;
+    END LOOP;
+    RETURN v_users;
+END;
+$$;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one reflection's contribution.
+-- Returns true when the row was missing and was rebuilt instead (the rebuild already
+-- reflects the current state, so the caller must not apply further deltas for this user).
+CREATE OR REPLACE FUNCTION apply_reflection_stats_delta(
+    p_user_id INTEGER,
+    p_question_id INTEGER,
+    p_word_count INTEGER,
+    p_created_at TIMESTAMP,
+    p_sign INTEGER
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_stats user_reflection_stats%ROWTYPE;
+    v_category VARCHAR;
+    v_count INTEGER;
+    v_day INTEGER := (p_created_at::date - DATE '2020-01-01');
+BEGIN
+    -- Claim the row first so concurrent first writes queue behind this one instead of both rebuilding
+    INSERT INTO user_reflection_stats (user_id) VALUES (p_user_id) ON CONFLICT (user_id) DO NOTHING;
+    IF FOUND THEN
+        PERFORM rebuild_user_reflection_stats(p_user_id);
+        RETURN true;
+    END IF;
+
+    SELECT * INTO v_stats FROM user_reflection_stats WHERE user_id = p_user_id FOR UPDATE;
+    IF v_stats.answered_bitmap IS NULL THEN
+        PERFORM rebuild_user_reflection_stats(p_user_id);
+        RETURN true;
+    END IF;
+
+    SELECT category INTO v_category FROM questions WHERE id = p_question_id;
+
+    v_stats.total_reflections := GREATEST(v_stats.total_reflections + p_sign, 0);
+    v_stats.total_words := GREATEST(v_stats.total_words + p_sign * COALESCE(p_word_count, 0), 0);
+
+    IF v_category IS NOT NULL THEN
+        v_count := COALESCE((v_stats.category_counts ->> v_category)::INTEGER, 0) + p_sign;
+        IF v_count > 0 THEN
+            v_stats.category_counts := jsonb_set(v_stats.category_counts, ARRAY[v_category], to_jsonb(v_count));
+        ELSE
+            v_stats.category_counts := v_stats.category_counts - v_category;
+        END IF;
+    END IF;
+
+    IF p_sign > 0 THEN
+        v_stats.latest_reflection := GREATEST(v_stats.latest_reflection, p_created_at);
+        IF v_day >= 0 THEN
+            IF length(v_stats.activity_bitmap) <= v_day / 8 THEN
+                v_stats.activity_bitmap := v_stats.activity_bitmap
+                    || decode(repeat('00', v_day / 8 + 1 - length(v_stats.activity_bitmap)), 'hex');
+            END IF;
+            v_stats.activity_bitmap := set_bit(v_stats.activity_bitmap, v_day, 1);
+        END IF;
+        IF p_question_id >= 0 THEN
+            IF length(v_stats.answered_bitmap) <= p_question_id / 8 THEN
+                v_stats.answered_bitmap := v_stats.answered_bitmap
+                    || decode(repeat('00', p_question_id / 8 + 1 - length(v_stats.answered_bitmap)), 'hex');
+            END IF;
+            v_stats.answered_bitmap := set_bit(v_stats.answered_bitmap, p_question_id, 1);
+        END IF;
+    ELSE
+        -- Removing a row only needs other rows for the latest timestamp and that one day; both use the index
+        IF p_created_at >= v_stats.latest_reflection THEN
+            SELECT MAX(created_at) INTO v_stats.latest_reflection
+            FROM reflections WHERE user_id = p_user_id AND NOT COALESCE(is_draft, false);
+        END IF;
+        IF v_day >= 0 AND length(v_stats.activity_bitmap) > v_day / 8 AND NOT EXISTS (
+            SELECT 1 FROM reflections
+            WHERE user_id = p_user_id AND NOT COALESCE(is_draft, false)
+              AND created_at >= p_created_at::date AND created_at < p_created_at::date + 1
+        ) THEN
+            v_stats.activity_bitmap := set_bit(v_stats.activity_bitmap, v_day, 0);
+        END IF;
+        IF p_question_id >= 0 AND length(v_stats.answered_bitmap) > p_question_id / 8 AND NOT EXISTS (
+            SELECT 1 FROM reflections
+            WHERE user_id = p_user_id AND NOT COALESCE(is_draft, false) AND question_id = p_question_id
+        ) THEN
+            v_stats.answered_bitmap := set_bit(v_stats.answered_bitmap, p_question_id, 0);
+        END IF;
+    END IF;
+
+    UPDATE user_reflection_stats SET
+        total_reflections = v_stats.total_reflections,
+        total_words = v_stats.total_words,
+        category_counts = v_stats.category_counts,
+        latest_reflection = v_stats.latest_reflection,
+        activity_bitmap = v_stats.activity_bitmap,
+        answered_bitmap = v_stats.answered_bitmap,
+        version = version + 1,
+        updated_at = NOW()
+    WHERE user_id = p_user_id;
+    RETURN false;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION reflections_stats_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_rebuilt BOOLEAN := false;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.user_id = OLD.user_id
+       AND NEW.question_id = OLD.question_id
+       AND NEW.word_count IS NOT DISTINCT FROM OLD.word_count
+       AND NEW.is_draft IS NOT DISTINCT FROM OLD.is_draft
+       AND NEW.created_at IS NOT DISTINCT FROM OLD.created_at THEN
+        -- Text-only edits don't change the totals, but still bump the version so cached insights
+        -- (validated by it) are recomputed; other columns don't matter
+        IF NOT COALESCE(NEW.is_draft, false) AND NEW.response_text IS DISTINCT FROM OLD.response_text THEN
+            UPDATE user_reflection_stats SET version = version + 1, updated_at = NOW()
+            WHERE user_id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT COALESCE(OLD.is_draft, false) THEN
+        v_rebuilt := apply_reflection_stats_delta(OLD.user_id, OLD.question_id, OLD.word_count, OLD.created_at, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NOT COALESCE(NEW.is_draft, false) THEN
+        IF NOT (TG_OP = 'UPDATE' AND v_rebuilt AND NEW.user_id = OLD.user_id) THEN
+            PERFORM apply_reflection_stats_delta(NEW.user_id, NEW.question_id, NEW.word_count, NEW.created_at, 1);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS maintain_user_reflection_stats ON reflections;
+CREATE TRIGGER maintain_user_reflection_stats
+    AFTER INSERT OR UPDATE OR DELETE ON reflections
+    FOR EACH ROW EXECUTE FUNCTION reflections_stats_trigger();
+
+-- /user-stats RPC now reads the maintained row; only the 7-day count touches reflections
+-- (an index range scan over one week, not the whole history)
+CREATE OR REPLACE FUNCTION get_user_reflection_stats(p_user_id INTEGER)
+RETURNS JSON
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_stats user_reflection_stats%ROWTYPE;
+BEGIN
+    SELECT * INTO v_stats FROM user_reflection_stats WHERE user_id = p_user_id;
+    IF NOT FOUND THEN
+        PERFORM rebuild_user_reflection_stats(p_user_id);
+        SELECT * INTO v_stats FROM user_reflection_stats WHERE user_id = p_user_id;
+    END IF;
+
+    RETURN json_build_object(
+        'total_reflections', v_stats.total_reflections,
+        'total_words', v_stats.total_words,
+        'categories_covered', (SELECT COUNT(*) FROM jsonb_object_keys(v_stats.category_counts)),
+        'weekly_reflections', (
+            SELECT COUNT(*) FROM reflections
+            WHERE user_id = p_user_id AND NOT COALESCE(is_draft, false)
+              AND created_at >= NOW() - INTERVAL '7 days'
+        ),
+        'categories_list', COALESCE(
+            (SELECT json_agg(k ORDER BY k) FROM jsonb_object_keys(v_stats.category_counts) k),
+            '[]'::json
+        ),
+        'category_counts', v_stats.category_counts,
+        'latest_reflection', v_stats.latest_reflection,
+        'version', v_stats.version
+    );
+END;
+$$;
+
+-- Grant permissions for the functions
+GRANT SELECT ON user_reflection_stats TO authenticated;
+
+-- They take any user id (and can rebuild every row), so only the backend (service key) may call them
+REVOKE EXECUTE ON FUNCTION rebuild_user_reflection_stats FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_all_reflection_stats FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION apply_reflection_stats_delta FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION get_user_reflection_stats FROM PUBLIC, anon, authenticated;
+
+-- Test the function to make sure it works
+SELECT 'Reflection stats installed successfully!' AS status;
@@ -0,0 +1,31 @@
+-- Single-round-trip user stats for SupabaseService.get_user_stats
+-- Returns totals, categories and the 7-day count from one scan of the user's reflections
+
+CREATE INDEX IF NOT EXISTS idx_reflections_user_created ON reflections(user_id, created_at);
+
+CREATE OR REPLACE FUNCTION get_user_reflection_stats(p_user_id INTEGER)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    SELECT json_build_object(
+        'total_reflections', COUNT(*),
+        'total_words', COALESCE(SUM(r.word_count), 0),
+        'categories_covered', COUNT(DISTINCT q.category),
+        'weekly_reflections', COUNT(*) FILTER (WHERE r.created_at >= NOW() - INTERVAL '7 days'),
+        'categories_list', COALESCE(
+            array_to_json(array_agg(DISTINCT q.category ORDER BY q.category) FILTER (WHERE q.category IS NOT NULL)),
+            '[]'::json
+        )
+    )
+    FROM reflections r
+    LEFT JOIN questions q ON q.id = r.question_id
+    WHERE r.user_id = p_user_id AND NOT COALESCE(r.is_draft, false);
+$$;
+
+-- Returns any user's stats, so only the backend (service key) may call it
+REVOKE EXECUTE ON FUNCTION get_user_reflection_stats FROM PUBLIC, anon, authenticated;
+
+-- Test the function to make sure it works
+SELECT 'Function created successfully!' AS status;